@@ -0,0 +1 @@
+"""AgriVest: farmer crowdfunding and microloans on the XRP Ledger"""
@@ -0,0 +1,316 @@
+import asyncio
+from datetime import datetime
+import xrpl
+from . import wallet  # XRPL wallet functions
+from . import tokens  # Token/currency functions
+from . import escrow_utils  # Comprehensive escrow functions
+from . import xrpl_client  # Shared pooled clients
+from . import portfolio  # Multi-account holdings
+from . import metrics  # Result codes
+from . import records  # Typed records
+from .sequence_manager import SequenceManager
+from .crowdfunding_platform import TOKENS_PER_XRP, CrowdfundingPlatform
+
+
+class AsyncCrowdfundingPlatform(CrowdfundingPlatform):
+    """CrowdfundingPlatform whose ledger operations are coroutines.
+
+    Many investments and microloans can run concurrently on one event loop,
+    e.g. `await asyncio.gather(*(platform.invest_in_campaign(...) for ...))`.
+    Listing and storage methods are inherited unchanged.
+    """
+
+    async def new_wallet_async(self):
+        """A funded wallet, taken from the wallet pool when one is configured"""
+        if self.wallet_pool is not None:
+            # take() may lock the pool file or fall back to the faucet, so keep it off the loop
+            return await asyncio.to_thread(self.wallet_pool.take)
+        return await wallet.get_account_async('')
+
+    async def create_campaign(self, farmer_name, project_title, description, funding_goal):
+        """Create a new farmer campaign"""
+        print(f"\n🚜 Creating campaign for {farmer_name}...")
+
+        farmer_wallet = await self.new_wallet_async()
+
+        campaign = self.storage.insert('campaigns', records.Campaign(
+            farmer_name=farmer_name,
+            project_title=project_title,
+            description=description,
+            funding_goal=funding_goal,
+            farmer_wallet_seed=farmer_wallet.seed,
+            farmer_address=farmer_wallet.address,
+            token_currency=None,
+            status='pending',
+            created_at=datetime.now().isoformat()
+        ))
+
+        print(f"✅ Campaign created with ID: {campaign['id']}")
+        print(f"   Farmer wallet: {farmer_wallet.address}")
+        return campaign['id']
+
+    async def approve_campaign(self, campaign_id):
+        """Approve campaign and mint project token"""
+        campaign = self.storage.get('campaigns', campaign_id)
+        if not campaign:
+            print("❌ Campaign not found")
+            return
+
+        token_currency = campaign['project_title'][:3].upper()
+        await tokens.configure_account_async(campaign['farmer_wallet_seed'], True)
+
+        self.storage.update('campaigns', campaign_id, {
+            'status': 'approved',
+            'token_currency': token_currency
+        })
+        print(f"✅ Campaign #{campaign_id} approved! Token currency: {token_currency}")
+
+    async def invest_in_campaign(self, campaign_id, investor_seed, investment_amount):
+        """Invest XRP in a campaign and receive project tokens.
+
+        The XRP payment and the investor's TrustSet come from the same account,
+        so they are given consecutive sequence numbers and submitted together.
+        """
+        campaign = self.storage.get('campaigns', campaign_id)
+        if not campaign or campaign['status'] != 'approved':
+            print("❌ Campaign not found or not approved")
+            return
+
+        farmer_address = campaign['farmer_address']
+        token_currency = campaign['token_currency']
+        investor_wallet = await wallet.get_account_async(investor_seed)
+
+        print(f"\n💰 Processing investment of {investment_amount} XRP from {investor_wallet.address}...")
+
+        sequence = await xrpl.asyncio.account.get_next_valid_seq_number(
+            investor_wallet.address, xrpl_client.get_async_client())
+        xrp_result, trust_result = await asyncio.gather(
+            wallet.send_xrp_async(investor_seed, investment_amount, farmer_address, sequence=sequence),
+            tokens.create_trust_line_async(investor_seed, farmer_address, token_currency,
+                                           investment_amount * 10, sequence=sequence + 1),
+            return_exceptions=True
+        )
+
+        if isinstance(xrp_result, Exception) or "Submit failed" in str(xrp_result):
+            print(f"❌ XRP transfer failed: {xrp_result}")
+            return
+        if isinstance(trust_result, Exception):
+            print(f"❌ Trust line failed: {trust_result}")
+            return
+
+        token_amount = investment_amount * TOKENS_PER_XRP
+        try:
+            token_result = await tokens.send_currency_async(campaign['farmer_wallet_seed'], investor_wallet.address,
+                                                            token_currency, token_amount)
+        except Exception as e:
+            print(f"❌ Token payment failed: {e}")
+            return
+        if metrics.result_code(token_result) != 'tesSUCCESS':
+            print(f"❌ Token payment failed: {metrics.result_code(token_result)}")
+            return
+
+        self.storage.insert('investments', records.Investment(
+            campaign_id=campaign_id,
+            investor_address=investor_wallet.address,
+            amount=investment_amount,
+            token_id=None,
+            created_at=datetime.now().isoformat()
+        ))
+
+        print(f"✅ Investment successful! {investor_wallet.address} received {token_amount} {token_currency}")
+        self.check_goal(campaign_id)
+
+    async def bulk_invest(self, campaign_id, investments):
+        """Process many (investor_seed, amount) investments in one campaign.
+
+        Investor payments and TrustSets run concurrently across investors. The
+        farmer's token payments use locally reserved sequence numbers so they
+        are all submitted at once instead of one per ledger close. Successful
+        investments are recorded in a single storage transaction.
+        Returns (recorded investments, failures).
+        """
+        campaign = self.storage.get('campaigns', campaign_id)
+        if not campaign or campaign['status'] != 'approved':
+            print("❌ Campaign not found or not approved")
+            return [], []
+
+        farmer_address = campaign['farmer_address']
+        token_currency = campaign['token_currency']
+        sequences = SequenceManager()
+        failures = []
+
+        print(f"\n💰 Processing {len(investments)} investments in campaign #{campaign_id}...")
+
+        async def fund(investor_seed, amount):
+            investor_wallet = wallet.get_account(investor_seed)
+            sequence = await sequences.reserve(investor_wallet.address, 2)
+            xrp_result, trust_result = await asyncio.gather(
+                wallet.send_xrp_async(investor_seed, amount, farmer_address, sequence=sequence),
+                tokens.create_trust_line_async(investor_seed, farmer_address, token_currency,
+                                               amount * 10, sequence=sequence + 1),
+                return_exceptions=True
+            )
+            if (isinstance(xrp_result, Exception) or "Submit failed" in str(xrp_result)
+                    or isinstance(trust_result, Exception) or metrics.result_code(trust_result) != 'tesSUCCESS'):
+                sequences.reset(investor_wallet.address)
+                failures.append((investor_wallet.address, amount, str(xrp_result), str(trust_result)))
+                return None
+            return investor_wallet.address, amount
+
+        funded = [f for f in await asyncio.gather(*(fund(seed, amount) for seed, amount in investments)) if f]
+
+        # Token payments are all signed with consecutive farmer sequences
+        first = await sequences.reserve(farmer_address, len(funded)) if funded else 0
+        token_results = await asyncio.gather(*(
+            tokens.send_currency_async(campaign['farmer_wallet_seed'], address, token_currency,
+                                       amount * TOKENS_PER_XRP, sequence=first + i)
+            for i, (address, amount) in enumerate(funded)
+        ), return_exceptions=True)
+
+        rows = []
+        now = datetime.now().isoformat()
+        for (address, amount), token_result in zip(funded, token_results):
+            if isinstance(token_result, Exception):
+                failures.append((address, amount, 'tokens not sent', str(token_result)))
+                continue
+            if metrics.result_code(token_result) != 'tesSUCCESS':
+                failures.append((address, amount, 'tokens not sent', metrics.result_code(token_result)))
+                continue
+            rows.append(records.Investment(
+                campaign_id=campaign_id,
+                investor_address=address,
+                amount=amount,
+                token_id=None,
+                created_at=now
+            ))
+        recorded = self.storage.insert_many('investments', rows) if rows else []
+
+        print(f"✅ {len(recorded)} investments recorded, {len(failures)} failed")
+        self.check_goal(campaign_id)
+        return recorded, failures
+
+    async def create_microloan(self, farmer_address, investor_seed, loan_amount, repayment_days):
+        """Create an escrow-based microloan"""
+        investor_wallet = await wallet.get_account_async(investor_seed)
+        print(f"\n🏦 Creating microloan of {loan_amount} XRP from {investor_wallet.address}...")
+
+        try:
+            account_info = await wallet.get_account_info_async(investor_wallet.address)
+            xrp_balance = int(account_info['Balance']) / 1000000
+            if xrp_balance < loan_amount + 2:  # +2 XRP for reserves and fees
+                print(f"❌ Insufficient funds. Need at least {loan_amount + 2} XRP")
+                return None
+        except Exception as e:
+            print(f"❌ Investor wallet not found or not funded: {e}")
+            return None
+
+        loan_amount_drops = str(int(loan_amount * 1000000))
+        repayment_seconds = repayment_days * 24 * 60 * 60
+        cancel_seconds = repayment_seconds + (7 * 24 * 60 * 60)  # 7 days grace period
+
+        escrow_result = await escrow_utils.create_time_escrow_async(
+            investor_seed,
+            loan_amount_drops,
+            farmer_address,
+            repayment_seconds,
+            cancel_seconds
+        )
+
+        if "Submit failed" in str(escrow_result):
+            print(f"❌ Escrow creation failed: {escrow_result}")
+            return None
+        escrow_utils.sequence_cache.put(escrow_result.get('hash'), escrow_utils.sequence_from_tx(escrow_result))
+        finish_after, cancel_after = escrow_utils.escrow_times(escrow_result)
+
+        microloan = self.storage.insert('microloans', records.Microloan(
+            farmer_address=farmer_address,
+            investor_address=investor_wallet.address,
+            loan_amount=loan_amount,
+            repayment_days=repayment_days,
+            status='active',
+            escrow_sequence=escrow_utils.sequence_from_tx(escrow_result) or 0,
+            escrow_tx_hash=escrow_result.get('hash'),
+            finish_after=finish_after,
+            cancel_after=cancel_after,
+            created_at=datetime.now().isoformat()
+        ))
+        self._schedule_escrow(microloan)
+
+        print(f"✅ Microloan #{microloan['id']} created! Escrow sequence: {self.escrow_sequence(microloan)}")
+        return microloan['id']
+
+    async def finish_microloan(self, microloan_id, farmer_seed):
+        """Finish microloan escrow (farmer claims funds)"""
+        microloan = self.storage.get('microloans', microloan_id)
+        if not microloan or microloan['status'] != 'active':
+            print("❌ Microloan not found or already completed")
+            return
+
+        finish_result = await escrow_utils.finish_time_escrow_async(
+            farmer_seed,
+            microloan['investor_address'],
+            self.escrow_sequence(microloan)
+        )
+
+        if "Submit failed" in str(finish_result):
+            print(f"❌ Escrow finish failed: {finish_result}")
+            return
+
+        self.storage.update('microloans', microloan_id, {
+            'status': 'completed',
+            'completed_at': datetime.now().isoformat()
+        })
+        print(f"✅ Microloan #{microloan_id} completed! Farmer received {microloan['loan_amount']} XRP")
+
+    async def cancel_microloan(self, microloan_id, investor_seed):
+        """Cancel microloan escrow (investor reclaims funds)"""
+        microloan = self.storage.get('microloans', microloan_id)
+        if not microloan or microloan['status'] != 'active':
+            print("❌ Microloan not found or already completed")
+            return
+
+        cancel_result = await escrow_utils.cancel_escrow_async(
+            investor_seed,
+            microloan['investor_address'],
+            self.escrow_sequence(microloan)
+        )
+
+        if "Submit failed" in str(cancel_result):
+            print(f"❌ Escrow cancel failed: {cancel_result}")
+            return
+
+        self.storage.update('microloans', microloan_id, {
+            'status': 'cancelled',
+            'cancelled_at': datetime.now().isoformat()
+        })
+        print(f"✅ Microloan #{microloan_id} cancelled! Investor reclaimed {microloan['loan_amount']} XRP")
+
+    async def check_balances(self, wallet_seed):
+        """Check wallet balances"""
+        user_wallet = await wallet.get_account_async(wallet_seed)
+        account_info, lines = await asyncio.gather(
+            wallet.get_account_info_async(user_wallet.address),
+            tokens.get_account_lines_async(user_wallet.address)
+        )
+        xrp_balance = int(account_info['Balance']) / 1000000
+        holdings = portfolio.token_holdings(lines)
+        print(f"\n💼 Wallet: {user_wallet.address}")
+        print(f"   XRP Balance: {xrp_balance} XRP")
+        if holdings:
+            print("   Token Balances:")
+            for token in holdings:
+                print(f"     {token['currency']} ({token['issuer']}): {token['balance']}")
+        return {'address': user_wallet.address, 'xrp': xrp_balance,
+                'balances': [dict(token, balance=str(token['balance'])) for token in holdings]}
+
+    async def portfolio(self, addresses=None, max_concurrency=xrpl_client.DEFAULT_POOL_SIZE):
+        """XRP and token holdings of many addresses (default: every farmer and investor in storage)"""
+        campaigns = list(self.storage.scan('campaigns', order_by='id'))
+        if addresses is None:
+            addresses = self.known_addresses(campaigns)
+        holdings = await portfolio.get_holdings_async(addresses, max_concurrency)
+        return portfolio.consolidate(holdings, campaigns)
+
+    async def close(self):
+        """Release the pooled connections used on this event loop"""
+        await xrpl_client.close_async_clients()
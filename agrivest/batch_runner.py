@@ -0,0 +1,240 @@
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from .wallet_cache import get_wallet
+from .crowdfunding_platform import CrowdfundingPlatform
+
+DEFAULT_WORKERS = 4
+
+# Fields parsed as integers (CSV cells are always strings)
+INT_FIELDS = ('campaign_id', 'microloan_id', 'funding_goal', 'amount', 'repayment_days')
+
+
+def _seed_key(seed):
+    return 'account:' + get_wallet(seed).address
+
+
+def _op_create_campaign(platform, args):
+    return platform.create_campaign(args['farmer_name'], args['project_title'],
+                                    args.get('description', ''), args['funding_goal'])
+
+def _op_approve(platform, args):
+    return platform.approve_campaign(args['campaign_id'])
+
+def _op_invest(platform, args):
+    return platform.invest_in_campaign(args['campaign_id'], args['investor_seed'], args['amount'])
+
+def _op_create_microloan(platform, args):
+    return platform.create_microloan(args['farmer_address'], args['investor_seed'],
+                                     args['amount'], args['repayment_days'])
+
+def _op_finish_microloan(platform, args):
+    return platform.finish_microloan(args['microloan_id'], args['farmer_seed'])
+
+def _op_cancel_microloan(platform, args):
+    return platform.cancel_microloan(args['microloan_id'], args['investor_seed'])
+
+def _op_balance(platform, args):
+    return platform.check_balances(args['seed'])
+
+
+# op name -> (handler, function returning the keys the op must be serialized on)
+OPERATIONS = {
+    'create_campaign': (_op_create_campaign, lambda a: []),
+    'approve': (_op_approve, lambda a: ['campaign:%s' % a['campaign_id']]),
+    'invest': (_op_invest, lambda a: ['campaign:%s' % a['campaign_id'], _seed_key(a['investor_seed'])]),
+    'create_microloan': (_op_create_microloan, lambda a: [_seed_key(a['investor_seed'])]),
+    'finish_microloan': (_op_finish_microloan, lambda a: ['microloan:%s' % a['microloan_id'], _seed_key(a['farmer_seed'])]),
+    'cancel_microloan': (_op_cancel_microloan, lambda a: ['microloan:%s' % a['microloan_id'], _seed_key(a['investor_seed'])]),
+    'balance': (_op_balance, lambda a: []),
+}
+OPERATIONS['approve_campaign'] = OPERATIONS['approve']
+
+
+def read_operations(path):
+    """Yield (line_number, op) from a JSONL or CSV file; CSV needs an `op` column"""
+    with open(path, 'r', newline='') as f:
+        if path.lower().endswith('.csv'):
+            # Header is line 1, so data rows start at line 2
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield line_number, {k: v for k, v in row.items() if v not in (None, '')}
+            return
+        for line_number, line in enumerate(f, start=1):
+            if line.strip() and not line.lstrip().startswith('#'):
+                yield line_number, json.loads(line)
+
+
+def read_completed(output_path, retry_failed=False):
+    """line_number -> result record for lines already in the output file"""
+    completed = {}
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn last line from an interrupted run
+            if record.get('ok') or not retry_failed:
+                completed[record['line']] = record
+    return completed
+
+
+class BatchRunner:
+    """Runs operations from a batch file on a pool of worker threads.
+
+    Operations that share a campaign, microloan or signing account run in
+    file order; everything else runs concurrently. A value of "$N" refers to
+    the result of line N (e.g. the id returned by create_campaign), which
+    also makes the operation wait for that line. Scheduling never blocks: a
+    reference to a line still running is keyed as a placeholder (e.g.
+    'campaign:$1'), later literal ids of the same kind queue behind pending
+    placeholders, and each operation also holds a lock on its resolved keys
+    while it runs, so "$1" and the literal id of one campaign never overlap.
+    Each result is appended to the output file as soon as it is known, so
+    `resume=True` skips every line that already has one.
+    """
+
+    def __init__(self, platform, output_path, workers=DEFAULT_WORKERS, resume=False, retry_failed=False):
+        self.platform = platform
+        self.output_path = output_path
+        self.workers = workers
+        self.completed = read_completed(output_path, retry_failed) if resume else {}
+        self._write_lock = threading.Lock()
+        self._futures = {}
+        self._last_by_key = {}
+        self._placeholders = set()
+        self._key_locks = {}
+        self._key_locks_lock = threading.Lock()
+        self.counts = {'ok': 0, 'failed': 0, 'skipped': 0}
+
+    def run(self, operations):
+        """Run every operation; returns the ok/failed/skipped counts"""
+        mode = 'a' if self.completed else 'w'
+        with open(self.output_path, mode) as self._output, \
+                ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for line_number, op in operations:
+                if line_number in self.completed:
+                    self.counts['skipped'] += 1
+                    continue
+                self._schedule(pool, line_number, op)
+        return self.counts
+
+    def _schedule(self, pool, line_number, op):
+        waits = [self._futures[n] for n in self._references(op) if n in self._futures]
+        try:
+            keys = OPERATIONS[op['op']][1](self._resolve(op, finished_only=True))
+        except Exception:
+            keys = []  # reported when the op itself runs
+        self._placeholders = {key for key in self._placeholders if not self._last_by_key[key].done()}
+        for key in keys:
+            if key in self._last_by_key:
+                waits.append(self._last_by_key[key])
+            if ':$' not in key:
+                # A pending "$N" of the same kind may turn out to be this id
+                kind = key.split(':', 1)[0] + ':$'
+                waits.extend(self._last_by_key[p] for p in self._placeholders if p.startswith(kind))
+        # Earlier lines are always queued first, so waiting on them cannot deadlock the pool
+        future = pool.submit(self._run_one, line_number, op, waits)
+        self._futures[line_number] = future
+        for key in keys:
+            self._last_by_key[key] = future
+            if ':$' in key:
+                self._placeholders.add(key)
+
+    def _references(self, op):
+        return [int(v[1:]) for v in op.values() if isinstance(v, str) and v[:1] == '$' and v[1:].isdigit()]
+
+    def _finished(self, line_number):
+        future = self._futures.get(line_number)
+        return line_number in self.completed or (future is not None and future.done())
+
+    def _result_of(self, line_number):
+        if line_number in self.completed:
+            record = self.completed[line_number]
+        elif line_number in self._futures:
+            record = self._futures[line_number].result()
+        else:
+            raise ValueError(f"line {line_number} has no result")
+        if not record['ok']:
+            raise ValueError(f"line {line_number} failed")
+        return record['result']
+
+    def _resolve(self, op, finished_only=False):
+        """Op arguments with "$N" replaced by line N's result; with `finished_only`, references
+        to lines still running stay as "$N" instead of waiting"""
+        args = {}
+        for field, value in op.items():
+            if isinstance(value, str) and value[:1] == '$' and value[1:].isdigit():
+                if not finished_only or self._finished(int(value[1:])):
+                    value = self._result_of(int(value[1:]))
+            if field in INT_FIELDS and isinstance(value, str) and value[:1] != '$':
+                value = int(value)
+            args[field] = value
+        return args
+
+    def _run_one(self, line_number, op, waits):
+        for future in waits:
+            future.result()
+        record = {'line': line_number, 'op': op.get('op')}
+        try:
+            if op.get('op') not in OPERATIONS:
+                raise ValueError(f"unknown op {op.get('op')!r}")
+            args = self._resolve(op)
+            with self._holding(OPERATIONS[op['op']][1](args)):
+                result = OPERATIONS[op['op']][0](self.platform, args)
+            record['ok'] = result is not None
+            record['result'] = result
+            if result is None:
+                record['error'] = 'operation rejected (see log)'
+        except Exception as e:
+            record['ok'] = False
+            record['error'] = str(e)
+        record['finished_at'] = datetime.now().isoformat()
+        self._write(record)
+        return record
+
+    @contextlib.contextmanager
+    def _holding(self, keys):
+        """Hold a lock per resolved key (in sorted order, so two ops cannot deadlock)"""
+        with self._key_locks_lock:
+            locks = [self._key_locks.setdefault(key, threading.Lock()) for key in sorted(set(keys))]
+        with contextlib.ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+            yield
+
+    def _write(self, record):
+        with self._write_lock:
+            self._output.write(json.dumps(record) + '\n')
+            self._output.flush()
+            self.counts['ok' if record['ok'] else 'failed'] += 1
+
+
+def batch_main(argv):
+    """Entry point for `agrivest run <file>`"""
+    parser = argparse.ArgumentParser(prog='agrivest run', description='Run platform operations from a JSONL or CSV file')
+    parser.add_argument('path', help='operations file (.jsonl or .csv)')
+    parser.add_argument('-o', '--output', help='results file (default: <path>.results.jsonl)')
+    parser.add_argument('-w', '--workers', type=int, default=int(os.environ.get('BATCH_WORKERS', DEFAULT_WORKERS)))
+    parser.add_argument('--resume', action='store_true', help='skip lines already in the results file')
+    parser.add_argument('--retry-failed', action='store_true', help='with --resume, run failed lines again')
+    parser.add_argument('-q', '--quiet', action='store_true', help='hide per-operation output')
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.path)[0] + '.results.jsonl'
+    log = open(os.devnull, 'w') if args.quiet else sys.stdout
+    with contextlib.redirect_stdout(log):
+        platform = CrowdfundingPlatform()
+        runner = BatchRunner(platform, output, workers=args.workers,
+                             resume=args.resume, retry_failed=args.retry_failed)
+        counts = runner.run(read_operations(args.path))
+    print(f"✅ Batch finished: {counts['ok']} ok, {counts['failed']} failed, "
+          f"{counts['skipped']} skipped -> {output}")
+    return 1 if counts['failed'] else 0
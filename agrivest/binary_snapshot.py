@@ -0,0 +1,459 @@
+"""Binary snapshot files, read lazily through mmap.
+
+Layout (native byte order, sections 8-byte aligned):
+
+    MAGIC | uint32 header length | JSON header | sections
+
+The header holds the id counters and, per table, the row count and where each
+section starts:
+
+    columns   one fixed-width array per slot field, rows in id order: int64
+              for ints, drops and microseconds, or uint32 string-table ids.
+              The 'id' column is ascending and doubles as the id -> row index.
+    extra     int64 offsets into a JSON blob with whatever does not fit a
+              column (nested values, mixed types, fields outside the slots)
+    postings  per indexed field, the column values sorted plus the row
+              numbers in that order, so `field == value` is a binary search
+    totals    per totalled field, the sorted group values with their count
+              and sum, and the same per breakdown value (see TOTALS)
+
+Strings are kept once, sorted, as int64 offsets into a UTF-8 blob; a string
+id is its position, so finding one is a binary search too.
+
+Opening a snapshot reads the header only. Records are decoded on access and
+only the pages a lookup or scan touches are read.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from . import records
+
+MAGIC = b'AGRISNAP'
+VERSION = 1
+_PREFIX = struct.Struct('=8sI')
+# int64 cells for a field that is not set / set to None
+MISSING = -2 ** 63
+NONE = MISSING + 1
+# string-table ids 0 and 1 mean the same; real strings start at FIRST_STRING
+STRING_MISSING, STRING_NONE, FIRST_STRING = 0, 1, 2
+_UNSET = object()
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _column_kind(values):
+    """'q' for int64, 'I' for strings, or None when the field goes to the JSON overflow"""
+    kind = None
+    for value in values:
+        if value is None or value is _UNSET:
+            continue
+        if type(value) is int and NONE < value < 2 ** 63:
+            value_kind = 'q'
+        elif type(value) is str:
+            value_kind = 'I'
+        else:
+            return None
+        if kind is None:
+            kind = value_kind
+        elif kind != value_kind:
+            return None
+    return kind or 'q'
+
+
+class _Sections:
+    """Accumulates aligned sections; offsets are relative to the first one"""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def add(self, blob):
+        offset = self.size
+        self.parts.append(blob)
+        self.size += len(blob)
+        padding = _align(self.size) - self.size
+        if padding:
+            self.parts.append(bytes(padding))
+            self.size += padding
+        return offset
+
+
+def _totals_section(cells, field, summed, breakdown, sections):
+    """Per-group count and sum of `summed`, with the same per `breakdown` value, or None if they do not fit int64"""
+    if field not in cells or breakdown not in cells or cells.get(summed, (None,))[0] != 'q':
+        return None
+    (key_kind, keys), (part_kind, parts), (_, amounts) = cells[field], cells[breakdown], cells[summed]
+    # unset and None count as one group, as record.get() returns None for both
+    key_none = NONE if key_kind == 'q' else STRING_NONE
+    part_none = NONE if part_kind == 'q' else STRING_NONE
+    groups = {}
+    for key, part, amount in zip(keys, parts, amounts):
+        if key <= key_none:
+            key = key_none
+        if part <= part_none:
+            part = part_none
+        if amount <= NONE:
+            amount = 0
+        by = groups.get(key)
+        if by is None:
+            by = groups[key] = {}
+        entry = by.get(part)
+        if entry is None:
+            by[part] = [1, amount]
+        else:
+            entry[0] += 1
+            entry[1] += amount
+    columns = {name: array('q') for name in ('counts', 'sums', 'starts', 'part_counts', 'part_totals')}
+    group_keys, part_keys = array(key_kind, sorted(groups)), array(part_kind)
+    columns['starts'].append(0)
+    try:
+        for key in group_keys:
+            by = groups[key]
+            columns['counts'].append(sum(entry[0] for entry in by.values()))
+            columns['sums'].append(sum(entry[1] for entry in by.values()))
+            for part in sorted(by):
+                part_keys.append(part)
+                columns['part_counts'].append(by[part][0])
+                columns['part_totals'].append(by[part][1])
+            columns['starts'].append(len(part_keys))
+    except OverflowError:
+        return None
+    section = {'summed': summed, 'breakdown': breakdown, 'kinds': [key_kind, part_kind],
+               'groups': len(group_keys), 'parts': len(part_keys),
+               'keys': sections.add(group_keys.tobytes()), 'part_keys': sections.add(part_keys.tobytes())}
+    section.update({name: sections.add(column.tobytes()) for name, column in columns.items()})
+    return section
+
+
+def write(path, data, indexed=None, totals=None):
+    """Write `data` (load() layout: table -> records, plus the id counters) to `path`.
+
+    `indexed` maps table -> fields to build posting lists for, and `totals`
+    table -> {field: (summed field, breakdown field)} to precompute sums for.
+    The file is fsynced but written in place; callers write to a temp file
+    and replace.
+    """
+    indexed = indexed or {}
+    totals = totals or {}
+    plans = {}
+    strings = set()
+    for table, cls in records.RECORD_TYPES.items():
+        rows = [r if type(r) is cls else records.from_dict(table, r) for r in data.get(table, ())]
+        if any(type(getattr(r, 'id', None)) is not int for r in rows):
+            raise ValueError(f"Snapshot ids must be integers ({table})")
+        rows.sort(key=lambda r: r.id)
+        columns = {}
+        for field in cls._fields:
+            values = [getattr(r, field, _UNSET) for r in rows]
+            kind = _column_kind(values)
+            if kind == 'I':
+                strings.update(v for v in values if type(v) is str)
+            columns[field] = (kind, values)
+        plans[table] = (rows, columns)
+
+    ordered = sorted(strings)
+    string_ids = {s: i + FIRST_STRING for i, s in enumerate(ordered)}
+    sections = _Sections()
+    encoded = [s.encode('utf-8', 'surrogatepass') for s in ordered]
+    offsets = array('q', [0])
+    for blob in encoded:
+        offsets.append(offsets[-1] + len(blob))
+    header = {
+        'version': VERSION,
+        'byteorder': sys.byteorder,
+        'counters': {k: v for k, v in data.items() if k not in records.RECORD_TYPES},
+        'strings': {'count': len(ordered), 'offsets': sections.add(offsets.tobytes()),
+                    'blob': sections.add(b''.join(encoded))},
+        'tables': {},
+    }
+
+    for table, (rows, columns) in plans.items():
+        spec = {'count': len(rows), 'columns': {}, 'postings': {}, 'totals': {}}
+        overflow = [field for field, (kind, _) in columns.items() if kind is None]
+        cells = {}
+        for field, (kind, values) in columns.items():
+            if kind == 'q':
+                column = array('q', [MISSING if v is _UNSET else NONE if v is None else v for v in values])
+            elif kind == 'I':
+                column = array('I', [STRING_MISSING if v is _UNSET else STRING_NONE if v is None else string_ids[v]
+                                     for v in values])
+            else:
+                continue
+            spec['columns'][field] = [kind, sections.add(column.tobytes())]
+            cells[field] = (kind, column)
+            if field in indexed.get(table, ()):
+                # sorted() is stable, so rows (and ids) stay ascending within a value
+                order = sorted(range(len(column)), key=column.__getitem__)
+                keys = array(kind, [column[i] for i in order])
+                spec['postings'][field] = [sections.add(keys.tobytes()),
+                                           sections.add(array('I', order).tobytes())]
+
+        for field, (summed, breakdown) in totals.get(table, {}).items():
+            section = _totals_section(cells, field, summed, breakdown, sections)
+            if section is not None:
+                spec['totals'][field] = section
+
+        offsets = array('q', [0])
+        chunks = []
+        for row, record in enumerate(rows):
+            extra = {f: columns[f][1][row] for f in overflow if columns[f][1][row] is not _UNSET}
+            if record._extra:
+                extra.update(record._extra)
+            if extra:
+                chunk = json.dumps(extra, separators=(',', ':'), default=records.json_default).encode()
+                chunks.append(chunk)
+                offsets.append(offsets[-1] + len(chunk))
+            else:
+                offsets.append(offsets[-1])
+        spec['extra'] = [sections.add(offsets.tobytes()), sections.add(b''.join(chunks))]
+        header['tables'][table] = spec
+
+    header = json.dumps(header, separators=(',', ':')).encode()
+    start = _align(_PREFIX.size + len(header))
+    with open(path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, len(header)))
+        f.write(header)
+        f.write(bytes(start - _PREFIX.size - len(header)))
+        for part in sections.parts:
+            f.write(part)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class _Gather:
+    """Read-only sequence of column[rows[i]], e.g. the ids of a posting list"""
+    __slots__ = ('column', 'rows')
+
+    def __init__(self, column, rows):
+        self.column = column
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        return self.column[self.rows[i]]
+
+
+class _Table:
+    __slots__ = ('count', 'ids', 'columns', 'postings', 'totals', 'extra_offsets', 'extra_blob')
+
+
+class _Totals:
+    __slots__ = ('summed', 'breakdown', 'kinds', 'keys', 'counts', 'sums', 'starts',
+                 'part_keys', 'part_counts', 'part_totals')
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    get() and record() decode one row into a fresh record; ids() and
+    ids_where() return sequences that bisect works on without copying.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, length = _PREFIX.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a snapshot file")
+        header = json.loads(self._map[_PREFIX.size:_PREFIX.size + length])
+        if header['version'] != VERSION or header['byteorder'] != sys.byteorder:
+            self._map.close()
+            raise ValueError(f"{path}: unsupported snapshot version or byte order")
+        self._base = _align(_PREFIX.size + length)
+        self._views = []
+        self.counters = header['counters']
+
+        strings = header['strings']
+        self._string_offsets = self._section(strings['offsets'], 'q', strings['count'] + 1)
+        self._string_blob = self._base + strings['blob']
+        self._strings = {}
+
+        self._tables = {}
+        for name, spec in header['tables'].items():
+            table = _Table()
+            table.count = count = spec['count']
+            columns = {field: (kind, self._section(offset, kind, count))
+                       for field, (kind, offset) in spec['columns'].items()}
+            table.ids = columns['id'][1]
+            table.columns = [(field, kind, column) for field, (kind, column) in columns.items()]
+            table.postings = {field: (columns[field][0], self._section(keys, columns[field][0], count),
+                                      self._section(rows, 'I', count))
+                              for field, (keys, rows) in spec['postings'].items()}
+            table.totals = {}
+            for field, section in spec['totals'].items():
+                totals = _Totals()
+                totals.summed, totals.breakdown = section['summed'], section['breakdown']
+                totals.kinds = key_kind, part_kind = section['kinds']
+                groups, parts = section['groups'], section['parts']
+                totals.keys = self._section(section['keys'], key_kind, groups)
+                totals.counts = self._section(section['counts'], 'q', groups)
+                totals.sums = self._section(section['sums'], 'q', groups)
+                totals.starts = self._section(section['starts'], 'q', groups + 1)
+                totals.part_keys = self._section(section['part_keys'], part_kind, parts)
+                totals.part_counts = self._section(section['part_counts'], 'q', parts)
+                totals.part_totals = self._section(section['part_totals'], 'q', parts)
+                table.totals[field] = totals
+            table.extra_offsets = self._section(spec['extra'][0], 'q', count + 1)
+            table.extra_blob = self._base + spec['extra'][1]
+            self._tables[name] = table
+
+    def _section(self, offset, kind, count):
+        start = self._base + offset
+        view = memoryview(self._map)[start:start + count * array(kind).itemsize].cast(kind)
+        self._views.append(view)
+        return view
+
+    def close(self):
+        """Unmap the file; records already decoded stay usable"""
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._map.close()
+
+    # -- strings ----------------------------------------------------------
+
+    def string(self, string_id):
+        value = self._strings.get(string_id)
+        if value is None:
+            i = string_id - FIRST_STRING
+            start = self._string_blob + self._string_offsets[i]
+            end = self._string_blob + self._string_offsets[i + 1]
+            value = sys.intern(self._map[start:end].decode('utf-8', 'surrogatepass'))
+            self._strings[string_id] = value
+        return value
+
+    def string_id(self, value):
+        """Id of `value` in the string table, or None when no record uses it"""
+        target = value.encode('utf-8', 'surrogatepass')
+        offsets, blob = self._string_offsets, self._string_blob
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            mid = (low + high) // 2
+            if self._map[blob + offsets[mid]:blob + offsets[mid + 1]] < target:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(offsets) - 1 and self._map[blob + offsets[low]:blob + offsets[low + 1]] == target:
+            return low + FIRST_STRING
+        return None
+
+    # -- records ----------------------------------------------------------
+
+    def count(self, table):
+        return self._tables[table].count if table in self._tables else 0
+
+    def ids(self, table):
+        """Ascending ids of `table`; position = row number"""
+        return self._tables[table].ids if table in self._tables else ()
+
+    def ids_where(self, table, field, value):
+        """Ascending ids whose `field` equals `value`, or None when `field` has no posting list"""
+        posting = self._tables[table].postings.get(field) if table in self._tables else None
+        if posting is None:
+            return None
+        kind, keys, rows = posting
+        if kind == 'q' and type(value) is int:
+            key = value
+        elif kind == 'I' and type(value) is str:
+            key = self.string_id(value)
+            if key is None:
+                return ()
+        else:
+            # None also matches unset fields, and 1 == 1.0 == True; let the caller filter
+            return None
+        start, end = bisect_left(keys, key), bisect_right(keys, key)
+        return _Gather(self._tables[table].ids, rows[start:end])
+
+    def row(self, table, record_id):
+        """Row number of a record id, or None"""
+        ids = self.ids(table)
+        row = bisect_left(ids, record_id)
+        return row if row < len(ids) and ids[row] == record_id else None
+
+    def get(self, table, record_id):
+        row = self.row(table, record_id) if type(record_id) is int else None
+        return None if row is None else self.record(table, row)
+
+    def record(self, table, row):
+        """Decode one row into a fresh record"""
+        spec = self._tables[table]
+        cls = records.RECORD_TYPES[table]
+        record = cls.__new__(cls)
+        record._extra = None
+        for field, kind, column in spec.columns:
+            value = column[row]
+            if kind == 'q':
+                if value <= NONE:
+                    if value == MISSING:
+                        continue
+                    value = None
+            elif value < FIRST_STRING:
+                if value == STRING_MISSING:
+                    continue
+                value = None
+            else:
+                value = self.string(value)
+            setattr(record, field, value)
+        start, end = spec.extra_offsets[row], spec.extra_offsets[row + 1]
+        if end > start:
+            blob = spec.extra_blob
+            for key, value in json.loads(self._map[blob + start:blob + end]).items():
+                if key in cls._kinds:
+                    setattr(record, key, value)
+                else:
+                    if record._extra is None:
+                        record._extra = {}
+                    record._extra[key] = value
+        return record
+
+    def _decoder(self, kind, codec):
+        """Stored cell -> public value for a column of `kind` whose record field uses `codec`"""
+        if kind == 'I':
+            string = self.string
+            return lambda v: None if v < FIRST_STRING else string(v)
+        if type(codec) is tuple:
+            decode = codec[1]
+            return lambda v: None if v <= NONE else decode(v)
+        return lambda v: None if v <= NONE else v
+
+    def totals(self, table, field, value):
+        """(count, sum, {breakdown value: [count, sum]}) of the rows whose `field` is `value`.
+
+        Read from the precomputed totals section; None when the snapshot has none for `field`.
+        """
+        spec = self._tables[table].totals.get(field) if table in self._tables else None
+        if spec is None:
+            return None
+        if value is None:
+            key = NONE if spec.kinds[0] == 'q' else STRING_NONE
+        elif spec.kinds[0] == 'q' and type(value) is int:
+            key = value
+        elif spec.kinds[0] == 'I' and type(value) is str:
+            key = self.string_id(value)
+        else:
+            key = None
+        i = bisect_left(spec.keys, key) if key is not None else len(spec.keys)
+        if i == len(spec.keys) or spec.keys[i] != key:
+            return 0, 0, {}
+        kinds = records.RECORD_TYPES[table]._kinds
+        part = self._decoder(spec.kinds[1], kinds.get(spec.breakdown))
+        amount = records.from_drops if type(kinds.get(spec.summed)) is tuple else int
+        by = {part(spec.part_keys[j]): [spec.part_counts[j], amount(spec.part_totals[j])]
+              for j in range(spec.starts[i], spec.starts[i + 1])}
+        return spec.counts[i], amount(spec.sums[i]), by
+
+    def records(self, table):
+        """Every record of `table`, decoded one at a time in id order"""
+        for row in range(self.count(table)):
+            yield self.record(table, row)
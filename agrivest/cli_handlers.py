@@ -0,0 +1,315 @@
+import argparse
+import os
+import sys
+import time
+from .crowdfunding_platform import CrowdfundingPlatform
+
+def display_menu():
+    """Display the main menu"""
+    print("\n🌾 FARMER CROWDFUNDING PLATFORM 🌾")
+    print("1. Create Campaign")
+    print("2. List Campaigns") 
+    print("3. Approve Campaign (Admin)")
+    print("4. Invest in Campaign")
+    print("5. Create Microloan")
+    print("6. List Microloans")
+    print("7. Claim Microloan (Farmer)")
+    print("8. Cancel Microloan (Investor)")
+    print("9. Check Wallet Balance")
+    print("10. Check Token Balance")
+    print("11. Clear Storage (Admin)")
+    print("12. Exit")
+
+def handle_create_campaign(platform):
+    """Handle campaign creation"""
+    farmer_name = input("Farmer name: ")
+    project_title = input("Project title: ")
+    description = input("Project description: ")
+    funding_goal = int(input("Funding goal (XRP): "))
+    platform.create_campaign(farmer_name, project_title, description, funding_goal)
+
+PAGE_SIZE = 10
+
+def show_pages(query, print_record, title):
+    """Print a listing one page at a time"""
+    print(f"\n{title}")
+    print("-" * 80)
+    cursor = None
+    shown = 0
+    while True:
+        records, cursor = query(limit=PAGE_SIZE, cursor=cursor)
+        for record in records:
+            print_record(record)
+        shown += len(records)
+        if cursor is None:
+            break
+        if input(f"Showing {shown}. Press Enter for more, or 'q' to stop: ").strip().lower() == 'q':
+            break
+    if not shown:
+        print("No records found.")
+
+def handle_list_campaigns(platform):
+    """Handle paged campaign listing"""
+    status = input("Filter by status (pending/approved/funded, Enter for all): ").strip()
+    show_pages(lambda **page: platform.query_campaigns(status=status or None, **page),
+               platform.print_campaign, "📋 Campaigns:")
+
+def handle_list_microloans(platform):
+    """Handle paged microloan listing"""
+    status = input("Filter by status (active/completed/cancelled, Enter for all): ").strip()
+    show_pages(lambda **page: platform.query_microloans(status=status or None, **page),
+               platform.print_microloan, "🏦 Microloans:")
+
+def handle_approve_campaign(platform):
+    """Handle campaign approval"""
+    campaign_id = int(input("Campaign ID to approve: "))
+    platform.approve_campaign(campaign_id)
+
+def handle_investment(platform):
+    """Handle investment in campaign"""
+    campaign_id = int(input("Campaign ID to invest in: "))
+    investor_seed = input("Your wallet seed (or press Enter for new wallet): ").strip()
+    if not investor_seed:
+        new_wallet = platform.new_wallet()
+        investor_seed = new_wallet.seed
+        print(f"New wallet created: {new_wallet.address}")
+        print(f"Your seed (save this!): {investor_seed}")
+
+    amount = int(input("Investment amount (XRP): "))
+    platform.invest_in_campaign(campaign_id, investor_seed, amount)
+
+def handle_check_balance(platform):
+    """Handle balance checking"""
+    wallet_seed = input("Wallet seed: ")
+    platform.check_balances(wallet_seed)
+
+def handle_check_token_balance():
+    """Handle token balance checking"""
+    from . import tokens
+    account_address = input("Account address: ")
+    issuer_address = input("Token issuer address: ")
+    currency_code = input("Currency code (e.g., TOM): ")
+    
+    balance = tokens.get_token_balance(account_address, issuer_address, currency_code)
+    print(f"\n💰 Token Balance:")
+    print(f"   Account: {account_address}")
+    print(f"   Currency: {currency_code}")
+    print(f"   Issuer: {issuer_address}")
+    print(f"   Balance: {balance}")
+
+def create_wallet_pool():
+    """Start the funded wallet pool unless WALLET_POOL_SIZE=0"""
+    from .wallet_pool import WalletPool
+    pool_size = int(os.environ.get('WALLET_POOL_SIZE', '5'))
+    if pool_size <= 0:
+        return None
+    pool_file = os.path.join('storage', 'wallet_pool.json')
+    return WalletPool(pool_file, target_size=pool_size, refill_threshold=max(1, pool_size // 2)).start()
+
+def create_escrow_scheduler(storage, operator_seed=None):
+    """Start the escrow scheduler when an operator seed is given or ESCROW_OPERATOR_SEED is set"""
+    operator_seed = operator_seed or os.environ.get('ESCROW_OPERATOR_SEED')
+    if not operator_seed:
+        return None
+    from .escrow_scheduler import EscrowScheduler
+    return EscrowScheduler(storage, operator_seed).start()
+
+def list_main(argv):
+    """Entry point for `agrivest list`: print stored campaigns or microloans (no ledger access)"""
+    parser = argparse.ArgumentParser(prog='agrivest list', description='List stored records')
+    parser.add_argument('table', nargs='?', default='campaigns', choices=('campaigns', 'microloans'))
+    parser.add_argument('--status', help='only records with this status')
+    parser.add_argument('--limit', type=int, default=0, help='stop after N records (0 lists all)')
+    args = parser.parse_args(argv)
+    platform = CrowdfundingPlatform()
+    if args.table == 'campaigns':
+        records, print_record, title = platform.iter_campaigns(status=args.status), platform.print_campaign, "📋 Campaigns:"
+    else:
+        records, print_record, title = platform.iter_microloans(status=args.status), platform.print_microloan, "🏦 Microloans:"
+    print(f"\n{title}")
+    print("-" * 80)
+    shown = 0
+    for record in records:
+        print_record(record)
+        shown += 1
+        if shown == args.limit:
+            break
+    if not shown:
+        print("No records found.")
+    platform.storage.close()
+    return 0
+
+def scheduler_main(argv):
+    """Entry point for `agrivest scheduler [operator_seed]`: settle microloans until interrupted"""
+    parser = argparse.ArgumentParser(prog='agrivest scheduler', description='Finish and cancel microloan escrows when due')
+    parser.add_argument('operator_seed', nargs='?', help='account that submits the transactions (default: $ESCROW_OPERATOR_SEED)')
+    parser.add_argument('--retry-failed', action='store_true', help='queue entries given up on earlier again')
+    args = parser.parse_args(argv)
+    platform = CrowdfundingPlatform()
+    scheduler = create_escrow_scheduler(platform.storage, args.operator_seed)
+    if scheduler is None:
+        print("❌ Set ESCROW_OPERATOR_SEED or pass an operator seed")
+        return 1
+    if args.retry_failed:
+        print(f"🔁 Re-queued {scheduler.requeue_failed()} failed escrow actions")
+    print_failed_escrows(scheduler)
+    print("⏰ Escrow scheduler running (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"   {scheduler.queued()} escrow actions queued, {len(scheduler.failed())} failed")
+    except KeyboardInterrupt:
+        scheduler.stop()
+        print_failed_escrows(scheduler)
+        print("👋 Scheduler stopped")
+    return 0
+
+def print_failed_escrows(scheduler):
+    """Warn about escrow actions the scheduler gave up on; their funds stay locked until settled"""
+    failed = scheduler.failed()
+    if not failed:
+        return
+    print(f"⚠️  {len(failed)} escrow actions failed after retries (run with --retry-failed to queue them again):")
+    for entry in failed:
+        print(f"   Microloan #{entry['microloan_id']} {entry['action']}: {entry['error']} ({entry['failed_at']})")
+
+def reconcile_main(argv):
+    """Entry point for `agrivest reconcile`: sync storage with validated ledger history"""
+    from .reconciler import LedgerReconciler
+    platform = CrowdfundingPlatform()
+    print("🔎 Reconciling storage with the ledger...")
+    report = LedgerReconciler(platform.storage).run()
+    print(f"✅ Reconciled {report['accounts']} accounts up to ledger {report['validated_ledger']}: "
+          f"{report['transactions']} transactions, {report['updated']} microloans updated")
+    for discrepancy in report['discrepancies']:
+        details = ', '.join(f"{k}={v}" for k, v in discrepancy.items() if k != 'kind')
+        print(f"⚠️  {discrepancy['kind']}: {details}")
+    platform.storage.close()
+    return 1 if report['discrepancies'] else 0
+
+def portfolio_main(argv):
+    """Entry point for `agrivest portfolio [address ...]`: holdings of every (or the given) account"""
+    platform = CrowdfundingPlatform()
+    addresses = argv or None
+    print("🔎 Reading account holdings...")
+    started = time.perf_counter()
+    report = platform.portfolio(addresses)
+    platform.print_portfolio(report)
+    print(f"\n✅ Read {len(report['accounts'])} accounts in {time.perf_counter() - started:.2f}s")
+    platform.storage.close()
+    return 1 if report['errors'] else 0
+
+def cap_table_main(argv):
+    """Entry point for `agrivest cap-table <campaign_id>`: token holders of one campaign"""
+    if len(argv) != 1 or not argv[0].isdigit():
+        print("Usage: agrivest cap-table <campaign_id>")
+        return 2
+    platform = CrowdfundingPlatform()
+    table = platform.cap_table(int(argv[0]))
+    if table is None:
+        print("❌ Campaign not found or not approved yet!")
+        platform.storage.close()
+        return 1
+    platform.print_cap_table(table)
+    platform.storage.close()
+    return 0
+
+def funding_main(argv):
+    """Entry point for `agrivest funding [address ...]`: close funded campaigns and show investor exposure"""
+    parser = argparse.ArgumentParser(prog='agrivest funding', description='Funding totals (no ledger access)')
+    parser.add_argument('investors', nargs='*', help='show what these addresses have invested')
+    parser.add_argument('--rebuild', action='store_true', help='recompute the running totals from stored investments')
+    args = parser.parse_args(argv)
+    platform = CrowdfundingPlatform()
+    if args.rebuild:
+        platform.storage.rebuild_totals()
+        print("✅ Funding totals rebuilt")
+    funded = platform.check_goals()
+    print(f"✅ {len(funded)} campaigns newly marked funded")
+    for address in args.investors:
+        exposure = platform.investor_exposure(address)
+        print(f"\n💼 {address}: {exposure['invested']} XRP in {exposure['investments']} investments")
+        for campaign_id, amount in sorted(exposure['campaigns'].items()):
+            print(f"   #{campaign_id}: {amount} XRP")
+    platform.storage.close()
+    return 0
+
+def cli_handle():
+    """Main CLI handler"""
+    platform = CrowdfundingPlatform(wallet_pool=create_wallet_pool())
+    platform.escrow_scheduler = create_escrow_scheduler(platform.storage)
+    if platform.escrow_scheduler is not None:
+        print_failed_escrows(platform.escrow_scheduler)
+
+    while True:
+        display_menu()
+        choice = input("\nSelect option (1-12): ").strip()
+
+        if choice == "1":
+            handle_create_campaign(platform)
+        elif choice == "2":
+            handle_list_campaigns(platform)
+        elif choice == "3":
+            handle_approve_campaign(platform)
+        elif choice == "4":
+            handle_investment(platform)
+        elif choice == "5":
+            handle_create_microloan(platform)
+        elif choice == "6":
+            handle_list_microloans(platform)
+        elif choice == "7":
+            handle_claim_microloan(platform)
+        elif choice == "8":
+            handle_cancel_microloan(platform)
+        elif choice == "9":
+            handle_check_balance(platform)
+        elif choice == "10":
+            handle_check_token_balance()
+        elif choice == "11":
+            handle_clear_storage(platform)
+        elif choice == "12":
+            if platform.escrow_scheduler is not None:
+                platform.escrow_scheduler.stop()
+            # Seeds are only cached once a ledger operation has imported the wallet cache
+            wallet_cache = sys.modules.get(__package__ + '.wallet_cache')
+            if wallet_cache is not None:
+                wallet_cache.wipe()
+            print("👋 Goodbye!")
+            break
+        else:
+            print("❌ Invalid option. Please try again.")
+
+def handle_create_microloan(platform):
+    """Handle microloan creation"""
+    farmer_address = input("Farmer wallet address: ")
+    investor_seed = input("Investor wallet seed (or press Enter for new wallet): ").strip()
+    
+    if not investor_seed:
+        new_wallet = platform.new_wallet()
+        investor_seed = new_wallet.seed
+        print(f"New investor wallet created: {new_wallet.address}")
+        print(f"Your seed (save this!): {investor_seed}")
+    
+    amount = int(input("Loan amount (XRP): "))
+    repayment_days = int(input("Repayment period (days): "))
+    platform.create_microloan(farmer_address, investor_seed, amount, repayment_days)
+
+def handle_claim_microloan(platform):
+    """Handle microloan claiming"""
+    microloan_id = int(input("Microloan ID to claim: "))
+    farmer_seed = input("Farmer wallet seed: ")
+    platform.finish_microloan(microloan_id, farmer_seed)
+
+def handle_cancel_microloan(platform):
+    """Handle microloan cancellation"""
+    microloan_id = int(input("Microloan ID to cancel: "))
+    investor_seed = input("Investor wallet seed: ")
+    platform.cancel_microloan(microloan_id, investor_seed)
+
+def handle_clear_storage(platform):
+    """Handle storage clearing"""
+    confirm = input("⚠️  This will delete ALL campaigns, investments, and microloans. Type 'CONFIRM' to proceed: ")
+    if confirm == "CONFIRM":
+        platform.clear_storage()
+    else:
+        print("❌ Storage clear cancelled.")
\ No newline at end of file
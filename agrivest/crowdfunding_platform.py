@@ -0,0 +1,679 @@
+import itertools
+import os
+from datetime import datetime
+from decimal import Decimal
+from . import records, storage_engine  # Typed records, pluggable persistence (journal, json)
+# wallet, tokens, escrow_utils and portfolio pull in xrpl (and asyncio); they are
+# imported inside the methods that reach the ledger so storage-only commands start fast
+
+TOKENS_PER_XRP = 1  # 1:1 ratio for MVP
+
+class CrowdfundingPlatform:
+    def __init__(self, storage=None, submission_engine=None, wallet_pool=None, escrow_scheduler=None):
+        self.storage_file = os.path.join('storage', 'storage.json')
+        self.storage = storage
+        self.wallet_pool = wallet_pool
+        # With a SubmissionEngine, escrow transactions are fire-and-track:
+        # records are saved as pending and finalized when the tracker fires
+        self.submission_engine = submission_engine
+        # An EscrowScheduler settles microloans once their escrow times pass
+        self.escrow_scheduler = escrow_scheduler
+        self.init_storage()
+        if self.submission_engine is not None:
+            self.resume_pending()
+        
+    def init_storage(self):
+        """Open the storage engine for campaigns and investments"""
+        if self.storage is not None:
+            return
+        self.storage = storage_engine.open_storage(self.storage_file)
+        if self.storage.created:
+            print("✅ Storage initialized")
+        else:
+            print("✅ Storage loaded")
+
+    def load_data(self):
+        """Load the whole data set (read-only view)"""
+        return self.storage.load()
+
+    def save_data(self, data):
+        """Replace the whole data set"""
+        self.storage.replace(data)
+
+    def new_wallet(self):
+        """A funded wallet, taken from the wallet pool when one is configured"""
+        from . import wallet
+        if self.wallet_pool is not None:
+            return self.wallet_pool.take()
+        return wallet.get_account('')
+
+    def _pending_tx(self, handle, on_success, on_failure):
+        """Pending-transaction marker persisted on a record until the tracker resolves it"""
+        return {
+            'hash': handle.hash,
+            'last_ledger_sequence': handle.last_ledger_sequence,
+            'on_success': on_success,
+            'on_failure': on_failure
+        }
+
+    def _watch(self, table, record_id, handle):
+        handle.add_done_callback(lambda h: self._finalize_pending(table, record_id, h))
+
+    def _finalize_pending(self, table, record_id, handle):
+        """Apply the success or failure changes recorded with a pending transaction"""
+        while True:
+            record = self.storage.get(table, record_id)
+            pending = record.get('pending_tx') if record else None
+            if not pending or pending['hash'] != handle.hash:
+                return
+            changes = dict(pending['on_success'] if handle.succeeded() else pending['on_failure'])
+            changes['pending_tx'] = None
+            changes['tx_result'] = handle.result_code or handle.status
+            try:
+                # Another process may be finalizing or resubmitting the same record
+                self.storage.update(table, record_id, changes, expected_version=record.get('version', 0))
+                break
+            except storage_engine.VersionConflict:
+                continue
+        print(f"\n🔔 {table[:-1].capitalize()} #{record_id}: {handle.hash[:12]}... {changes['tx_result']}")
+
+    def resume_pending(self):
+        """Re-attach tracking for transactions that were pending when the process stopped"""
+        for table in storage_engine.TABLES:
+            for record in self.storage.query(table):
+                pending = record.get('pending_tx')
+                if pending:
+                    handle = self.submission_engine.track(pending['hash'], pending['last_ledger_sequence'])
+                    self._watch(table, record['id'], handle)
+
+    def create_campaign(self, farmer_name, project_title, description, funding_goal):
+        """Create a new farmer campaign"""
+        print(f"\n🚜 Creating campaign for {farmer_name}...")
+        
+        # Generate XRPL wallet for farmer
+        farmer_wallet = self.new_wallet()
+        
+        campaign = records.Campaign(
+            farmer_name=farmer_name,
+            project_title=project_title,
+            description=description,
+            funding_goal=funding_goal,
+            farmer_wallet_seed=farmer_wallet.seed,
+            farmer_address=farmer_wallet.address,
+            token_currency=None,
+            status='pending',
+            created_at=datetime.now().isoformat()
+        )
+        
+        campaign = self.storage.insert('campaigns', campaign)
+        
+        campaign_id = campaign['id']
+        print(f"✅ Campaign created with ID: {campaign_id}")
+        print(f"   Farmer wallet: {farmer_wallet.address}")
+        print(f"   Seed (keep safe): {farmer_wallet.seed}")
+        
+        return campaign_id
+
+    def approve_campaign(self, campaign_id):
+        """Approve campaign and mint project token"""
+        from . import tokens
+        campaign = self.storage.get('campaigns', campaign_id)
+        
+        if not campaign:
+            print("❌ Campaign not found")
+            return
+            
+        farmer_name = campaign['farmer_name']
+        project_title = campaign['project_title']
+        farmer_seed = campaign['farmer_wallet_seed']
+        
+        print(f"\n🎯 Approving campaign: {project_title}")
+        
+        # Create token currency code (max 3 chars for standard currency)
+        token_currency = project_title[:3].upper()
+        
+        # Configure farmer account for token issuance
+        print("   Setting up farmer account...")
+        tokens.configure_account(farmer_seed, True)
+        
+        # Update campaign status and token info
+        self.storage.update('campaigns', campaign_id, {
+            'status': 'approved',
+            'token_currency': token_currency
+        })
+        
+        print(f"✅ Campaign approved! Token currency: {token_currency}")
+        return token_currency
+
+    def invest_in_campaign(self, campaign_id, investor_seed, investment_amount):
+        """Invest XRP in a campaign and receive project tokens"""
+        from . import tokens, wallet
+        campaign = self.storage.get('campaigns', campaign_id)
+        if campaign and campaign['status'] != 'approved':
+            campaign = None
+        
+        if not campaign:
+            print("❌ Campaign not found or not approved")
+            return
+            
+        farmer_seed = campaign['farmer_wallet_seed']
+        farmer_address = campaign['farmer_address']
+        token_currency = campaign['token_currency']
+        
+        investor_wallet = wallet.get_account(investor_seed)
+        
+        print(f"\n💰 Processing investment of {investment_amount} XRP...")
+        
+        # Step 1: Send XRP to farmer
+        print("   Sending XRP to farmer...")
+        xrp_result = wallet.send_xrp(investor_seed, investment_amount, farmer_address)
+        
+        if "Submit failed" in str(xrp_result):
+            print(f"❌ XRP transfer failed: {xrp_result}")
+            return
+            
+        # Step 2: Create trust line for investor to receive tokens
+        print("   Creating trust line for tokens...")
+        trust_result = tokens.create_trust_line(investor_seed, farmer_address, token_currency, investment_amount * 10)
+        
+        # Step 3: Send project tokens to investor
+        print("   Sending project tokens...")
+        token_amount = investment_amount * TOKENS_PER_XRP
+        token_result = tokens.send_currency(farmer_seed, investor_wallet.address, token_currency, token_amount)
+        
+        # Record investment
+        investment = records.Investment(
+            campaign_id=campaign_id,
+            investor_address=investor_wallet.address,
+            amount=investment_amount,
+            token_id=None,
+            created_at=datetime.now().isoformat()
+        )
+        
+        investment = self.storage.insert('investments', investment)
+        
+        print(f"✅ Investment successful!")
+        print(f"   Received {token_amount} {token_currency} tokens")
+        self.check_goal(campaign_id)
+        return investment['id']
+
+    def bulk_invest(self, campaign_id, investments):
+        """Invest on behalf of many (investor_seed, amount) pairs at once"""
+        import asyncio
+        from .async_crowdfunding_platform import AsyncCrowdfundingPlatform
+
+        async def run():
+            platform = AsyncCrowdfundingPlatform(self.storage)
+            try:
+                return await platform.bulk_invest(campaign_id, investments)
+            finally:
+                await platform.close()
+
+        return asyncio.run(run())
+
+    def funding_progress(self, campaign):
+        """Raised XRP, investors, tokens issued and percent of goal, from the storage's running totals"""
+        totals = self.storage.totals('investments', 'campaign_id', campaign['id'])
+        goal = campaign['funding_goal']
+        return {
+            'raised': totals['total'],
+            'investments': totals['count'],
+            'investor_count': totals['distinct'],
+            'tokens_issued': totals['total'] * TOKENS_PER_XRP,
+            'percent_of_goal': round(100 * totals['total'] / goal, 2) if goal else None,
+        }
+
+    def investor_exposure(self, investor_address):
+        """XRP an investor has put in, in total and per campaign"""
+        totals = self.storage.totals('investments', 'investor_address', investor_address, breakdown=True)
+        return {
+            'investor_address': investor_address,
+            'invested': totals['total'],
+            'investments': totals['count'],
+            'campaigns': totals['by'],
+        }
+
+    def check_goal(self, campaign_id):
+        """Move an approved campaign to 'funded' once its raised total reaches the goal"""
+        while True:
+            campaign = self.storage.get('campaigns', campaign_id)
+            if campaign is None or campaign['status'] != 'approved':
+                return False
+            raised = self.storage.totals('investments', 'campaign_id', campaign_id)['total']
+            if raised < campaign['funding_goal']:
+                return False
+            try:
+                # Investments in other threads or processes may race to close the campaign
+                self.storage.update('campaigns', campaign_id, {'status': 'funded', 'funded_at': datetime.now().isoformat()},
+                                    expected_version=campaign.get('version', 0))
+                break
+            except storage_engine.VersionConflict:
+                continue
+        print(f"🎉 Campaign #{campaign_id} reached its goal: {raised}/{campaign['funding_goal']} XRP")
+        return True
+
+    def check_goals(self):
+        """Apply check_goal to every approved campaign; returns the ids that became funded"""
+        approved = [c['id'] for c in self.storage.scan('campaigns', {'status': 'approved'}, order_by='id')]
+        return [campaign_id for campaign_id in approved if self.check_goal(campaign_id)]
+
+    def iter_campaigns(self, status=None, farmer_address=None, farmer_name=None, investor_address=None,
+                       since=None, until=None, order_by='created_at', descending=True, cursor=None):
+        """Lazily iterate campaigns matching the filters, in order, starting after `cursor`"""
+        where = {}
+        if status:
+            where['status'] = status
+        if farmer_address:
+            where['farmer_address'] = farmer_address
+        if farmer_name:
+            where['farmer_name'] = farmer_name
+        if not investor_address:
+            return self.storage.scan('campaigns', where=where, since=since, until=until,
+                                     order_by=order_by, descending=descending, cursor=cursor)
+        # Start from the investor's campaigns, so a page costs O(their campaigns) rather than O(all campaigns)
+        invested = self.storage.totals('investments', 'investor_address', investor_address, breakdown=True)['by']
+        campaigns = [c for c in (self.storage.get('campaigns', campaign_id) for campaign_id in invested) if c]
+        return iter(storage_engine.select_records(campaigns, where, since, until, order_by, descending, cursor))
+
+    def iter_microloans(self, status=None, farmer_address=None, investor_address=None,
+                        since=None, until=None, order_by='created_at', descending=True, cursor=None):
+        """Lazily iterate microloans matching the filters, in order, starting after `cursor`"""
+        where = {}
+        if status:
+            where['status'] = status
+        if farmer_address:
+            where['farmer_address'] = farmer_address
+        if investor_address:
+            where['investor_address'] = investor_address
+        return self.storage.scan('microloans', where=where, since=since, until=until,
+                                 order_by=order_by, descending=descending, cursor=cursor)
+
+    def query_campaigns(self, limit=20, cursor=None, order_by='created_at', **filters):
+        """One page of campaigns plus the cursor for the next page (None on the last page)"""
+        return self._page(self.iter_campaigns(cursor=cursor, order_by=order_by, **filters), limit, order_by)
+
+    def query_microloans(self, limit=20, cursor=None, order_by='created_at', **filters):
+        """One page of microloans plus the cursor for the next page (None on the last page)"""
+        return self._page(self.iter_microloans(cursor=cursor, order_by=order_by, **filters), limit, order_by)
+
+    def _page(self, records, limit, order_by):
+        page = list(itertools.islice(records, limit + 1))
+        if len(page) > limit:
+            return page[:limit], storage_engine.cursor_for(page[limit - 1], order_by)
+        return page, None
+
+    def print_campaign(self, campaign):
+        """Print one campaign listing entry"""
+        campaign_id = campaign['id']
+        farmer_name = campaign['farmer_name']
+        title = campaign['project_title']
+        desc = campaign['description']
+        goal = campaign['funding_goal']
+        token = campaign['token_currency']
+        status = campaign['status']
+        created = campaign['created_at']
+        
+        print(f"ID: {campaign_id} | {title} by {farmer_name}")
+        progress = self.funding_progress(campaign)
+        print(f"   Goal: {goal} XRP | Status: {status} | Token: {token or 'N/A'}")
+        print(f"   Raised: {progress['raised']} XRP ({progress['percent_of_goal']}%) from "
+              f"{progress['investor_count']} investors | Tokens issued: {progress['tokens_issued']}")
+        print(f"   Description: {desc}")
+        print(f"   Created: {created}")
+        print("-" * 80)
+
+    def list_campaigns(self):
+        """List all campaigns"""
+        print("\n📋 All Campaigns:")
+        print("-" * 80)
+        
+        found = False
+        for campaign in self.iter_campaigns():
+            found = True
+            self.print_campaign(campaign)
+        
+        if not found:
+            print("No campaigns found.")
+
+    def create_microloan(self, farmer_address, investor_seed, loan_amount, repayment_days):
+        """Create an escrow-based microloan"""
+        from . import escrow_utils, wallet
+        print(f"\n🏦 Creating microloan of {loan_amount} XRP...")
+        
+        # Verify investor wallet exists and has sufficient funds
+        investor_wallet = wallet.get_account(investor_seed)
+        print(f"   Investor wallet: {investor_wallet.address}")
+        
+        try:
+            account_info = wallet.get_account_info(investor_wallet.address)
+            xrp_balance = int(account_info['Balance']) / 1000000
+            print(f"   Investor XRP balance: {xrp_balance} XRP")
+            
+            if xrp_balance < loan_amount + 2:  # +2 XRP for reserves and fees
+                print(f"❌ Insufficient funds. Need at least {loan_amount + 2} XRP")
+                return None
+        except Exception as e:
+            print(f"❌ Investor wallet not found or not funded: {e}")
+            return None
+        
+        # Convert loan amount to drops (XRP smallest unit)
+        loan_amount_drops = str(int(loan_amount * 1000000))
+        
+        # Calculate time periods (in seconds)
+        repayment_seconds = repayment_days * 24 * 60 * 60
+        cancel_seconds = repayment_seconds + (7 * 24 * 60 * 60)  # 7 days grace period
+        
+        if self.submission_engine is not None:
+            return self._submit_microloan(farmer_address, investor_wallet, investor_seed,
+                                          loan_amount, repayment_days, loan_amount_drops,
+                                          repayment_seconds, cancel_seconds)
+
+        # Create time-based escrow
+        print("   Creating escrow contract...")
+        escrow_result = escrow_utils.create_time_escrow(
+            investor_seed,
+            loan_amount_drops,
+            farmer_address,
+            repayment_seconds,
+            cancel_seconds
+        )
+        
+        if "Submit failed" in str(escrow_result):
+            print(f"❌ Escrow creation failed: {escrow_result}")
+            return None
+        escrow_utils.sequence_cache.put(escrow_result.get('hash'), escrow_utils.sequence_from_tx(escrow_result))
+        finish_after, cancel_after = escrow_utils.escrow_times(escrow_result)
+            
+        # Store microloan data
+        microloan = records.Microloan(
+            farmer_address=farmer_address,
+            investor_address=investor_wallet.address,
+            loan_amount=loan_amount,
+            repayment_days=repayment_days,
+            status='active',
+            escrow_sequence=escrow_utils.sequence_from_tx(escrow_result) or 0,
+            escrow_tx_hash=escrow_result.get('hash'),
+            finish_after=finish_after,
+            cancel_after=cancel_after,
+            created_at=datetime.now().isoformat()
+        )
+        
+        microloan = self.storage.insert('microloans', microloan)
+        self._schedule_escrow(microloan)
+        
+        print(f"✅ Microloan created!")
+        print(f"   Loan ID: {microloan['id']}")
+        print(f"   Amount: {loan_amount} XRP")
+        print(f"   Repayment due: {repayment_days} days")
+        print(f"   Escrow sequence: {self.escrow_sequence(microloan)}")
+        
+        return microloan['id']
+
+    def _submit_microloan(self, farmer_address, investor_wallet, investor_seed, loan_amount,
+                          repayment_days, loan_amount_drops, repayment_seconds, cancel_seconds):
+        """Fire-and-track variant of the escrow step in create_microloan"""
+        from . import escrow_utils
+        print("   Submitting escrow contract...")
+        handle = escrow_utils.submit_time_escrow(
+            self.submission_engine,
+            investor_seed,
+            loan_amount_drops,
+            farmer_address,
+            repayment_seconds,
+            cancel_seconds
+        )
+        if handle.done() and not handle.succeeded():
+            print(f"❌ Escrow creation failed: {handle.result_code or handle.response}")
+            return None
+        escrow_utils.sequence_cache.put(handle.hash, handle.sequence)
+        finish_after, cancel_after = escrow_utils.escrow_times(handle.tx_json or {})
+
+        microloan = self.storage.insert('microloans', records.Microloan(
+            farmer_address=farmer_address,
+            investor_address=investor_wallet.address,
+            loan_amount=loan_amount,
+            repayment_days=repayment_days,
+            status='pending',
+            escrow_sequence=handle.sequence,
+            escrow_tx_hash=handle.hash,
+            finish_after=finish_after,
+            cancel_after=cancel_after,
+            created_at=datetime.now().isoformat(),
+            pending_tx=self._pending_tx(handle, {'status': 'active'}, {'status': 'failed'})
+        ))
+        self._watch('microloans', microloan['id'], handle)
+        self._schedule_escrow(microloan)
+
+        print(f"⏳ Microloan #{microloan['id']} submitted: {handle.hash}")
+        print("   It becomes active once the escrow is validated")
+        return microloan['id']
+
+    def _schedule_escrow(self, microloan):
+        if self.escrow_scheduler is not None:
+            self.escrow_scheduler.schedule(microloan)
+
+    def escrow_sequence(self, microloan):
+        """Escrow sequence of a microloan, filled from the escrow sequence cache when missing"""
+        from . import escrow_utils
+        return microloan.get('escrow_sequence') or escrow_utils.sequence_cache.get(microloan.get('escrow_tx_hash')) or 0
+
+    def finish_microloan(self, microloan_id, farmer_seed):
+        """Finish microloan escrow (farmer claims funds)"""
+        from . import escrow_utils
+        microloan = self.storage.get('microloans', microloan_id)
+        if microloan and microloan['status'] != 'active':
+            microloan = None
+        
+        if not microloan:
+            print("❌ Microloan not found or already completed")
+            return
+            
+        print(f"\n💰 Finishing microloan #{microloan_id}...")
+        
+        if self.submission_engine is not None:
+            handle = escrow_utils.submit_finish_escrow(
+                self.submission_engine, farmer_seed,
+                microloan['investor_address'], self.escrow_sequence(microloan))
+            return self._update_pending('microloans', microloan_id, handle, 'finishing',
+                                        {'status': 'completed', 'completed_at': datetime.now().isoformat()},
+                                        {'status': 'active'})
+        
+        # Farmer claims the escrowed funds
+        finish_result = escrow_utils.finish_time_escrow(
+            farmer_seed,
+            microloan['investor_address'],
+            self.escrow_sequence(microloan)
+        )
+        
+        if "Submit failed" in str(finish_result):
+            print(f"❌ Escrow finish failed: {finish_result}")
+            return
+            
+        # Update microloan status
+        self.storage.update('microloans', microloan_id, {
+            'status': 'completed',
+            'completed_at': datetime.now().isoformat()
+        })
+        
+        print(f"✅ Microloan completed! Farmer received {microloan['loan_amount']} XRP")
+        return finish_result.get('hash')
+
+    def cancel_microloan(self, microloan_id, investor_seed):
+        """Cancel microloan escrow (investor reclaims funds)"""
+        from . import escrow_utils
+        microloan = self.storage.get('microloans', microloan_id)
+        if microloan and microloan['status'] != 'active':
+            microloan = None
+        
+        if not microloan:
+            print("❌ Microloan not found or already completed")
+            return
+            
+        print(f"\n🔄 Canceling microloan #{microloan_id}...")
+        
+        if self.submission_engine is not None:
+            handle = escrow_utils.submit_cancel_escrow(
+                self.submission_engine, investor_seed,
+                microloan['investor_address'], self.escrow_sequence(microloan))
+            return self._update_pending('microloans', microloan_id, handle, 'cancelling',
+                                        {'status': 'cancelled', 'cancelled_at': datetime.now().isoformat()},
+                                        {'status': 'active'})
+        
+        # Investor reclaims the escrowed funds
+        cancel_result = escrow_utils.cancel_escrow(
+            investor_seed,
+            microloan['investor_address'],
+            self.escrow_sequence(microloan)
+        )
+        
+        if "Submit failed" in str(cancel_result):
+            print(f"❌ Escrow cancel failed: {cancel_result}")
+            return
+            
+        # Update microloan status
+        self.storage.update('microloans', microloan_id, {
+            'status': 'cancelled',
+            'cancelled_at': datetime.now().isoformat()
+        })
+        
+        print(f"✅ Microloan cancelled! Investor reclaimed {microloan['loan_amount']} XRP")
+        return cancel_result.get('hash')
+
+    def _update_pending(self, table, record_id, handle, pending_status, on_success, on_failure):
+        """Persist a submitted status change as pending and finalize it when tracked"""
+        if handle.done() and not handle.succeeded():
+            print(f"❌ Submission failed: {handle.result_code or handle.response}")
+            return
+        self.storage.update(table, record_id, {
+            'status': pending_status,
+            'pending_tx': self._pending_tx(handle, on_success, on_failure)
+        })
+        self._watch(table, record_id, handle)
+        print(f"⏳ Submitted {handle.hash}; status will update once validated")
+        return handle.hash
+
+    def print_microloan(self, loan):
+        """Print one microloan listing entry"""
+        loan_id = loan['id']
+        farmer = loan['farmer_address'][:10] + "..."
+        investor = loan['investor_address'][:10] + "..."
+        amount = loan['loan_amount']
+        days = loan['repayment_days']
+        status = loan['status']
+        created = loan['created_at']
+        
+        print(f"ID: {loan_id} | {amount} XRP | {days} days | Status: {status}")
+        print(f"   Farmer: {farmer} | Investor: {investor}")
+        print(f"   Created: {created}")
+        print("-" * 80)
+
+    def list_microloans(self):
+        """List all microloans"""
+        print("\n🏦 All Microloans:")
+        print("-" * 80)
+        
+        found = False
+        for loan in self.iter_microloans():
+            found = True
+            self.print_microloan(loan)
+        
+        if not found:
+            print("No microloans found.")
+
+    def check_balances(self, wallet_seed):
+        """Check wallet balances"""
+        from . import portfolio, tokens, wallet
+        user_wallet = wallet.get_account(wallet_seed)
+        print(f"\n💼 Wallet: {user_wallet.address}")
+        
+        # Get XRP balance
+        account_info = wallet.get_account_info(user_wallet.address)
+        xrp_balance = int(account_info['Balance']) / 1000000  # Convert drops to XRP
+        print(f"   XRP Balance: {xrp_balance} XRP")
+        
+        # Get token balances held on trust lines
+        holdings = portfolio.token_holdings(tokens.get_account_lines(user_wallet.address))
+        if holdings:
+            print("   Token Balances:")
+            for token in holdings:
+                print(f"     {token['currency']} ({token['issuer']}): {token['balance']}")
+        return {'address': user_wallet.address, 'xrp': xrp_balance,
+                'balances': [dict(token, balance=str(token['balance'])) for token in holdings]}
+
+    def portfolio(self, addresses=None, max_concurrency=None):
+        """XRP and token holdings of many addresses (default: every farmer and investor in storage)"""
+        from . import portfolio, xrpl_client
+        campaigns = list(self.storage.scan('campaigns', order_by='id'))
+        if addresses is None:
+            addresses = self.known_addresses(campaigns)
+        holdings = portfolio.get_holdings(addresses, max_concurrency or xrpl_client.DEFAULT_POOL_SIZE)
+        return portfolio.consolidate(holdings, campaigns)
+
+    def cap_table(self, campaign_id):
+        """Token holders of a campaign from one scan of the farmer's trust lines, with recorded investments"""
+        from . import tokens
+        campaign = self.storage.get('campaigns', campaign_id)
+        if campaign is None or not campaign.get('token_currency'):
+            return None
+        currency = campaign['token_currency']
+        balances = tokens.get_issuer_balances(campaign['farmer_address'])
+        invested = self.storage.totals('investments', 'campaign_id', campaign_id, breakdown=True)['by']
+        holders = {holder for holder, line_currency in balances if line_currency == currency}
+        rows = [{'holder': holder, 'balance': balances.get((holder, currency), '0'), 'invested': invested.get(holder, 0)}
+                for holder in holders | set(invested)]
+        rows.sort(key=lambda row: (-Decimal(row['balance']), row['holder']))
+        return {'campaign': campaign, 'holders': rows}
+
+    def print_cap_table(self, table):
+        """Print a cap_table() result"""
+        campaign = table['campaign']
+        print(f"\n🧾 Cap table: #{campaign['id']} {campaign['project_title']} ({campaign['token_currency']})")
+        print("-" * 80)
+        print(f"   {'holder':<36}{'tokens':>16}{'invested XRP':>16}")
+        for row in table['holders']:
+            print(f"   {row['holder']:<36}{row['balance']:>16}{row['invested']:>16}")
+        if not table['holders']:
+            print("   No holders yet.")
+
+    def known_addresses(self, campaigns=None):
+        """Farmer and investor addresses referenced anywhere in storage, in first-seen order"""
+        addresses = {}
+        for campaign in campaigns if campaigns is not None else self.storage.scan('campaigns', order_by='id'):
+            addresses[campaign['farmer_address']] = True
+        for investment in self.storage.scan('investments', order_by='id'):
+            addresses[investment['investor_address']] = True
+        for loan in self.storage.scan('microloans', order_by='id'):
+            addresses[loan['farmer_address']] = True
+            addresses[loan['investor_address']] = True
+        addresses.pop(None, None)
+        return list(addresses)
+
+    def print_portfolio(self, report):
+        """Print a portfolio() report as tables"""
+        print(f"\n📒 Portfolio: {len(report['accounts'])} accounts, {report['total_xrp']} XRP")
+        print("-" * 80)
+        print(f"   {'address':<36}{'XRP':>16}  tokens")
+        for row in report['accounts']:
+            if row.get('error'):
+                print(f"   {row['address']:<36}{'error':>16}  {row['error']}")
+                continue
+            xrp = row['xrp'] if row['exists'] else 'unfunded'
+            held = ', '.join(f"#{cid}: {amount}" for cid, amount in sorted(row['campaign_tokens'].items()))
+            print(f"   {row['address']:<36}{str(xrp):>16}  {held}")
+        if report['campaigns']:
+            print("\n🌱 Campaign tokens:")
+            print(f"   {'campaign':<40}{'token':>8}{'holders':>10}{'total':>16}")
+            for total in report['campaigns']:
+                label = f"#{total['campaign_id']} {total['project_title']}"[:38]
+                print(f"   {label:<40}{total['token_currency']:>8}{total['holders']:>10}{str(total['total']):>16}")
+        if report['errors']:
+            print(f"\n⚠️  {report['errors']} accounts could not be read")
+
+    def clear_storage(self):
+        """Clear all storage data and reinitialize"""
+        print("\n🗑️  Clearing storage...")
+        
+        self.storage.clear()
+        
+        print("✅ Storage cleared successfully!")
+        print("   All campaigns, investments, and microloans have been deleted.")
@@ -0,0 +1,334 @@
+import asyncio
+import contextlib
+import heapq
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from xrpl.utils import datetime_to_ripple_time
+from . import escrow_utils
+from . import xrpl_client
+from .sequence_manager import SequenceManager
+from .storage_engine import ProcessLock
+from .wallet_cache import get_wallet
+
+FINISH = 'finish'
+CANCEL = 'cancel'
+
+DEFAULT_STATE_FILE = os.path.join('storage', 'escrow_schedule.json')
+DEFAULT_BATCH_SIZE = 20
+# Ledger close times trail the wall clock and are rounded, so an escrow is
+# only treated as due this many seconds after its FinishAfter/CancelAfter
+DEFAULT_MARGIN = 10
+DEFAULT_RETRY_DELAY = 60
+DEFAULT_RESCAN_INTERVAL = 60
+MAX_ATTEMPTS = 5
+# Due entries are claimed by pushing them back this long while they settle;
+# if the process dies mid-batch they come due again for any other process
+CLAIM_SECONDS = 5 * 60
+# Matches the grace period create_microloan adds on top of the repayment period
+CANCEL_GRACE_SECONDS = 7 * 24 * 60 * 60
+
+# Statuses a microloan can be settled from; 'pending' waits for its escrow to validate
+SCHEDULABLE = ('active', 'pending')
+
+
+def ripple_now():
+    return datetime_to_ripple_time(datetime.now())
+
+
+def escrow_due_times(microloan):
+    """(finish_after, cancel_after) ripple times for a microloan's escrow.
+
+    Records created before escrow times were stored fall back to created_at
+    plus the repayment period, which is never earlier than the real times.
+    """
+    finish_after = microloan.get('finish_after')
+    cancel_after = microloan.get('cancel_after')
+    if finish_after and cancel_after:
+        return finish_after, cancel_after
+    created = datetime_to_ripple_time(datetime.fromisoformat(microloan['created_at']))
+    finish_after = created + microloan['repayment_days'] * 24 * 60 * 60
+    return finish_after, finish_after + CANCEL_GRACE_SECONDS
+
+
+class EscrowScheduler:
+    """Finishes and cancels microloan escrows as soon as they become actionable.
+
+    Each (due time, microloan, action) entry sits in a heap ordered by ripple
+    time, and the worker sleeps until the earliest one is due. Due entries are
+    settled in batches from an operator account (anyone may finish or cancel
+    a time escrow), with consecutive locally reserved sequences. The heap and
+    the highest microloan id already scanned are persisted, so a restart only
+    scans microloans created since. Entries that fail MAX_ATTEMPTS times are
+    kept in the state file as failed (see failed() and requeue_failed()) so a
+    cancel that was given up on never silently leaves funds locked.
+
+    The CLI, `serve` and the `scheduler` daemon may all run one on the same
+    state file: every change re-reads it under an exclusive flock on
+    `<state_file>.lock`, and due entries are claimed in the file before they
+    are submitted, so no process overwrites another's queue or settles an
+    escrow another one is already settling.
+    """
+
+    def __init__(self, storage, operator_seed, state_file=DEFAULT_STATE_FILE, actions=(FINISH, CANCEL),
+                 batch_size=DEFAULT_BATCH_SIZE, margin=DEFAULT_MARGIN, retry_delay=DEFAULT_RETRY_DELAY,
+                 rescan_interval=DEFAULT_RESCAN_INTERVAL):
+        self.storage = storage
+        self.operator_seed = operator_seed
+        self.state_file = state_file
+        self.actions = actions
+        self.batch_size = batch_size
+        self.margin = margin
+        self.retry_delay = retry_delay
+        self.rescan_interval = rescan_interval
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self._heap = []
+        self._queued = set()
+        self._failed = {}
+        self._scanned_id = 0
+        self._process_lock = ProcessLock(state_file + '.lock')
+        with self._process_lock.hold(exclusive=False):
+            self._load()
+
+    # -- state ----------------------------------------------------------------
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        with open(self.state_file, 'r') as f:
+            state = json.load(f)
+        self._scanned_id = state['scanned_id']
+        self._heap = [tuple(entry) for entry in state['queue']]
+        heapq.heapify(self._heap)
+        self._queued = {(entry[1], entry[2]) for entry in self._heap}
+        self._failed = {(f['microloan_id'], f['action']): f for f in state.get('failed', [])}
+
+    def _state(self):
+        return {'scanned_id': self._scanned_id, 'queue': sorted(self._heap),
+                'failed': sorted(self._failed.values(), key=lambda f: (f['microloan_id'], f['action']))}
+
+    def _save(self, state):
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_file)
+
+    @contextlib.contextmanager
+    def _reading(self):
+        """Catch up with the state file (other processes may have changed it)"""
+        with self._cond, self._process_lock.hold(exclusive=False):
+            self._load()
+            yield
+
+    @contextlib.contextmanager
+    def _updating(self):
+        """Re-read, change and write back the state file under the thread and file locks"""
+        with self._cond, self._process_lock.hold(exclusive=True):
+            self._load()
+            before = self._state()
+            yield
+            state = self._state()
+            if state != before:
+                self._save(state)
+
+    # -- queue ----------------------------------------------------------------
+
+    def _push(self, due, microloan_id, action, attempts=0):
+        if (microloan_id, action) in self._queued:
+            return False
+        heapq.heappush(self._heap, (due, microloan_id, action, attempts))
+        self._queued.add((microloan_id, action))
+        return True
+
+    def _drop(self, keys):
+        self._heap = [entry for entry in self._heap if (entry[1], entry[2]) not in keys]
+        heapq.heapify(self._heap)
+        self._queued -= keys
+
+    def _add(self, microloan):
+        if microloan.get('status') not in SCHEDULABLE:
+            return False
+        finish_after, cancel_after = escrow_due_times(microloan)
+        added = False
+        if FINISH in self.actions:
+            added |= self._push(finish_after, microloan['id'], FINISH)
+        if CANCEL in self.actions:
+            added |= self._push(cancel_after, microloan['id'], CANCEL)
+        return added
+
+    def schedule(self, microloan):
+        """Queue a newly created microloan; wakes the worker if it is now first in line"""
+        with self._updating():
+            self._add(microloan)
+            self._cond.notify()
+
+    def scan_new(self):
+        """Queue microloans created since the last scan (by any process sharing the storage)"""
+        with self._updating():
+            cursor = [self._scanned_id, self._scanned_id] if self._scanned_id else None
+            for microloan in self.storage.scan('microloans', order_by='id', cursor=cursor):
+                self._add(microloan)
+                self._scanned_id = microloan['id']
+            self._cond.notify()
+
+    def next_due(self):
+        """Ripple time at which the earliest queued entry becomes actionable, or None"""
+        with self._reading():
+            return self._heap[0][0] + self.margin if self._heap else None
+
+    def queued(self):
+        with self._reading():
+            return len(self._heap)
+
+    def failed(self):
+        """Entries given up on after MAX_ATTEMPTS, oldest microloan first"""
+        with self._reading():
+            return sorted(self._failed.values(), key=lambda f: (f['microloan_id'], f['action']))
+
+    def requeue_failed(self):
+        """Queue every failed entry again, due now with a fresh attempt count; returns how many"""
+        with self._updating():
+            failed, self._failed = self._failed, {}
+            for microloan_id, action in failed:
+                self._push(ripple_now() - self.margin, microloan_id, action)
+            self._cond.notify()
+        return len(failed)
+
+    def _claim_due(self):
+        """Pop up to batch_size due entries, leaving each queued again CLAIM_SECONDS later"""
+        now = ripple_now()
+        batch = []
+        while self._heap and self._heap[0][0] + self.margin <= now and len(batch) < self.batch_size:
+            batch.append(heapq.heappop(self._heap))
+        for due, microloan_id, action, attempts in batch:
+            heapq.heappush(self._heap, (now + CLAIM_SECONDS - self.margin, microloan_id, action, attempts))
+        return batch
+
+    # -- settling -------------------------------------------------------------
+
+    def run_due(self):
+        """Settle every entry that is due now, batch by batch; returns the number settled"""
+        settled = 0
+        while True:
+            with self._updating():
+                batch = self._claim_due()
+            if not batch:
+                return settled
+            retries = []
+            done = asyncio.run(self._settle(batch, retries))
+            with self._updating():
+                self._drop({(entry[1], entry[2]) for entry in batch})
+                self._drop({key for key in self._queued if key[0] in done})
+                self._failed = {key: f for key, f in self._failed.items() if key[0] not in done}
+                for entry, error in retries:
+                    self._retry(entry, error)
+            settled += len(done)
+
+    async def _settle(self, batch, retries):
+        """Submit a claimed batch; returns the ids of the microloans settled and
+        appends (entry, error) to `retries` for entries to try again"""
+        operator = get_wallet(self.operator_seed)
+        ready = []
+        for entry in batch:
+            due, microloan_id, action, attempts = entry
+            microloan = self.storage.get('microloans', microloan_id)
+            if not microloan or microloan['status'] not in SCHEDULABLE:
+                continue  # settled by hand, by the other action, or failed
+            if microloan['status'] == 'pending':
+                retries.append((entry, 'escrow not validated yet'))
+                continue
+            ready.append((entry, microloan))
+        if not ready:
+            return set()
+
+        try:
+            sequences = SequenceManager()
+            try:
+                first = await sequences.reserve(operator.address, len(ready))
+            except Exception as e:
+                print(f"❌ Escrow scheduler could not fetch the operator sequence: {e}")
+                retries.extend((entry, e) for entry, microloan in ready)
+                return set()
+            results = await asyncio.gather(*(
+                self._submit(action, microloan, first + i)
+                for i, ((due, microloan_id, action, attempts), microloan) in enumerate(ready)
+            ), return_exceptions=True)
+        finally:
+            await xrpl_client.close_async_clients()
+
+        settled = set()
+        for (entry, microloan), result in zip(ready, results):
+            if isinstance(result, dict):
+                self._record(entry[2], microloan, result)
+                settled.add(microloan['id'])
+            else:
+                print(f"❌ Scheduled {entry[2]} of microloan #{entry[1]} failed: {result}")
+                retries.append((entry, result))
+        return settled
+
+    def _submit(self, action, microloan, tx_sequence):
+        owner = microloan['investor_address']
+        sequence = microloan.get('escrow_sequence') or escrow_utils.sequence_cache.get(microloan.get('escrow_tx_hash'))
+        if action == FINISH:
+            return escrow_utils.finish_time_escrow_async(self.operator_seed, owner, sequence, tx_sequence)
+        return escrow_utils.cancel_escrow_async(self.operator_seed, owner, sequence, tx_sequence)
+
+    def _record(self, action, microloan, result):
+        now = datetime.now().isoformat()
+        if action == FINISH:
+            changes = {'status': 'completed', 'completed_at': now}
+        else:
+            changes = {'status': 'cancelled', 'cancelled_at': now}
+        changes['settled_by'] = 'scheduler'
+        changes['settle_tx_hash'] = result.get('hash')
+        self.storage.update('microloans', microloan['id'], changes)
+        print(f"✅ Microloan #{microloan['id']} {changes['status']} by scheduler")
+
+    def _retry(self, entry, error=None):
+        due, microloan_id, action, attempts = entry
+        if attempts + 1 >= MAX_ATTEMPTS:
+            print(f"❌ Giving up on {action} of microloan #{microloan_id} after {MAX_ATTEMPTS} attempts")
+            self._failed[(microloan_id, action)] = {
+                'microloan_id': microloan_id, 'action': action, 'attempts': attempts + 1,
+                'error': None if error is None else str(error), 'failed_at': datetime.now().isoformat()
+            }
+            return
+        self._push(ripple_now() + self.retry_delay - self.margin, microloan_id, action, attempts + 1)
+
+    # -- worker ---------------------------------------------------------------
+
+    def _run(self):
+        last_scan = None
+        while not self._stopped:
+            try:
+                if last_scan is None or time.monotonic() - last_scan >= self.rescan_interval:
+                    self.scan_new()
+                    last_scan = time.monotonic()
+                self.run_due()
+            except Exception as e:
+                print(f"❌ Escrow scheduler error: {e}")
+            with self._cond:
+                if self._stopped:
+                    return
+                due = self._heap[0][0] + self.margin if self._heap else None
+                timeout = self.rescan_interval
+                if due is not None:
+                    timeout = max(0, min(timeout, due - ripple_now()))
+                self._cond.wait(timeout)
+
+    def start(self):
+        """Start the background worker"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
@@ -0,0 +1,344 @@
+
+import asyncio
+import json
+import os
+import threading
+import xrpl
+from xrpl.models.transactions import EscrowCreate, EscrowFinish, EscrowCancel
+from xrpl.models.requests import AccountObjects, Tx
+from xrpl.transaction import submit_and_wait
+from xrpl.utils import datetime_to_ripple_time, xrp_to_drops, drops_to_xrp, ripple_time_to_datetime
+from datetime import datetime, timedelta
+from os import urandom
+from cryptoconditions import PreimageSha256
+from . import xrpl_client
+from .xrpl_client import get_client, get_async_client
+from .wallet_cache import get_wallet
+from . import read_cache
+from . import metrics
+
+ESCROW_SEQUENCE_CACHE_FILE = os.path.join('storage', 'escrow_sequences.jsonl')
+
+class EscrowSequenceCache:
+    """Permanent, append-only map of EscrowCreate tx hash -> escrow sequence.
+
+    Validated transactions never change, so entries never expire. The file
+    is loaded on first use and each new entry is appended as one JSON line.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._sequences = None
+        self._lock = threading.Lock()
+
+    def _loaded(self):
+        if self._sequences is None:
+            self._sequences = {}
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        self._sequences[entry['tx']] = entry['sequence']
+        return self._sequences
+
+    def get(self, tx_hash):
+        """Cached sequence for a transaction hash, or None (never hits the network)"""
+        if not tx_hash:
+            return None
+        with self._lock:
+            return self._loaded().get(tx_hash)
+
+    def put_many(self, sequences):
+        """Remember several tx hash -> sequence pairs"""
+        with self._lock:
+            known = self._loaded()
+            new = {tx: seq for tx, seq in sequences.items() if tx and seq is not None and known.get(tx) != seq}
+            if not new:
+                return
+            known.update(new)
+            with open(self.path, 'a') as f:
+                for tx, seq in new.items():
+                    f.write(json.dumps({'tx': tx, 'sequence': seq}) + '\n')
+
+    def put(self, tx_hash, sequence):
+        self.put_many({tx_hash: sequence})
+
+sequence_cache = EscrowSequenceCache(ESCROW_SEQUENCE_CACHE_FILE)
+
+def sequence_from_tx(result):
+    """The sequence an escrow is referenced by, from a Tx or submit result"""
+    tx = result.get("tx_json", result)
+    if tx.get("TicketSequence"):
+        return tx["TicketSequence"]
+    return tx.get("Sequence")
+
+def escrow_times(result):
+    """(FinishAfter, CancelAfter) ripple times from an EscrowCreate result or tx_json"""
+    tx = result.get("tx_json", result)
+    return tx.get("FinishAfter"), tx.get("CancelAfter")
+
+def generate_condition():
+    """Generate a condition and fulfillment for escrows"""
+    secret = urandom(32)
+    fulfillment = PreimageSha256(preimage=secret)
+    return (fulfillment.condition_binary.hex().upper(),
+            fulfillment.serialize_binary().hex().upper())
+
+def add_seconds(numOfSeconds):
+    """Add seconds to current time and return in Ripple time format"""
+    new_date = datetime.now()
+    if new_date != '':
+        new_date = datetime_to_ripple_time(new_date)
+        new_date = new_date + int(numOfSeconds)
+    return new_date
+
+def _submit(tx, wallet):
+    """Submit and wait, returning the result or a 'Submit failed' message"""
+    try:
+        return metrics.observe_submission(tx, submit_and_wait, tx, get_client(), wallet).result
+    except xrpl.transaction.XRPLReliableSubmissionException as e:
+        return f"Submit failed: {e}"
+    finally:
+        read_cache.invalidate_for(tx)
+
+async def _submit_async(tx, wallet):
+    """Async counterpart of _submit"""
+    try:
+        response = await metrics.observe_submission_async(
+            tx, xrpl.asyncio.transaction.submit_and_wait(tx, get_async_client(), wallet))
+        return response.result
+    except xrpl.asyncio.transaction.XRPLReliableSubmissionException as e:
+        return f"Submit failed: {e}"
+    finally:
+        read_cache.invalidate_for(tx)
+
+def _time_escrow_tx(address, amount, destination, finish, cancel):
+    return EscrowCreate(
+        account=address,
+        amount=amount,
+        destination=destination,
+        finish_after=add_seconds(finish),
+        cancel_after=add_seconds(cancel)
+    )
+
+def _conditional_escrow_tx(address, amount, destination, cancel, condition):
+    return EscrowCreate(
+        account=address,
+        amount=amount,
+        destination=destination,
+        cancel_after=add_seconds(cancel),
+        condition=condition
+    )
+
+def _finish_escrow_tx(address, owner, sequence, condition=None, fulfillment=None, tx_sequence=None):
+    return EscrowFinish(
+        account=address,
+        owner=owner,
+        offer_sequence=int(sequence),
+        condition=condition,
+        fulfillment=fulfillment,
+        sequence=tx_sequence
+    )
+
+def _cancel_escrow_tx(address, owner, sequence, tx_sequence=None):
+    return EscrowCancel(
+        account=address,
+        owner=owner,
+        offer_sequence=int(sequence),
+        sequence=tx_sequence
+    )
+
+def create_time_escrow(seed, amount, destination, finish, cancel):
+    """Create a time-based escrow"""
+    wallet = get_wallet(seed)
+    return _submit(_time_escrow_tx(wallet.address, amount, destination, finish, cancel), wallet)
+
+async def create_time_escrow_async(seed, amount, destination, finish, cancel):
+    """Create a time-based escrow (async)"""
+    wallet = get_wallet(seed)
+    return await _submit_async(_time_escrow_tx(wallet.address, amount, destination, finish, cancel), wallet)
+
+def create_conditional_escrow(seed, amount, destination, cancel, condition):
+    """Create a conditional escrow"""
+    wallet = get_wallet(seed)
+    return _submit(_conditional_escrow_tx(wallet.address, amount, destination, cancel, condition), wallet)
+
+async def create_conditional_escrow_async(seed, amount, destination, cancel, condition):
+    """Create a conditional escrow (async)"""
+    wallet = get_wallet(seed)
+    return await _submit_async(_conditional_escrow_tx(wallet.address, amount, destination, cancel, condition), wallet)
+
+def finish_time_escrow(seed, owner, sequence):
+    """Finish a time-based escrow"""
+    wallet = get_wallet(seed)
+    return _submit(_finish_escrow_tx(wallet.address, owner, sequence), wallet)
+
+async def finish_time_escrow_async(seed, owner, sequence, tx_sequence=None):
+    """Finish a time-based escrow (async); `tx_sequence` is the finisher's own account sequence"""
+    wallet = get_wallet(seed)
+    return await _submit_async(_finish_escrow_tx(wallet.address, owner, sequence, tx_sequence=tx_sequence), wallet)
+
+def finish_conditional_escrow(seed, owner, sequence, condition, fulfillment):
+    """Finish a conditional escrow"""
+    wallet = get_wallet(seed)
+    return _submit(_finish_escrow_tx(wallet.address, owner, sequence, condition, fulfillment), wallet)
+
+async def finish_conditional_escrow_async(seed, owner, sequence, condition, fulfillment):
+    """Finish a conditional escrow (async)"""
+    wallet = get_wallet(seed)
+    return await _submit_async(_finish_escrow_tx(wallet.address, owner, sequence, condition, fulfillment), wallet)
+
+def cancel_escrow(seed, owner, sequence):
+    """Cancel an escrow"""
+    wallet = get_wallet(seed)
+    return _submit(_cancel_escrow_tx(wallet.address, owner, sequence), wallet)
+
+async def cancel_escrow_async(seed, owner, sequence, tx_sequence=None):
+    """Cancel an escrow (async); `tx_sequence` is the canceller's own account sequence"""
+    wallet = get_wallet(seed)
+    return await _submit_async(_cancel_escrow_tx(wallet.address, owner, sequence, tx_sequence), wallet)
+
+def submit_time_escrow(engine, seed, amount, destination, finish, cancel):
+    """Submit a time-based escrow without waiting; returns a SubmissionHandle"""
+    wallet = get_wallet(seed)
+    return engine.submit(_time_escrow_tx(wallet.address, amount, destination, finish, cancel), wallet)
+
+def submit_finish_escrow(engine, seed, owner, sequence):
+    """Submit an EscrowFinish without waiting; returns a SubmissionHandle"""
+    wallet = get_wallet(seed)
+    return engine.submit(_finish_escrow_tx(wallet.address, owner, sequence), wallet)
+
+def submit_cancel_escrow(engine, seed, owner, sequence):
+    """Submit an EscrowCancel without waiting; returns a SubmissionHandle"""
+    wallet = get_wallet(seed)
+    return engine.submit(_cancel_escrow_tx(wallet.address, owner, sequence), wallet)
+
+ESCROW_DIRECTIONS = ('all', 'sent', 'received')
+
+def _parse_escrow(escrow):
+    """Format one Escrow ledger object"""
+    escrow_data = {}
+    escrow_data["escrow_id"] = escrow["index"]
+    escrow_data["sender"] = escrow["Account"]
+    escrow_data["receiver"] = escrow["Destination"]
+    escrow_data["amount"] = str(drops_to_xrp(escrow["Amount"]))
+    if "PreviousTxnID" in escrow:
+        escrow_data["prev_txn_id"] = escrow["PreviousTxnID"]
+        sequence = sequence_cache.get(escrow["PreviousTxnID"])
+        if sequence is not None:
+            escrow_data["sequence"] = sequence
+    if "FinishAfter" in escrow:
+        escrow_data["redeem_date"] = str(ripple_time_to_datetime(escrow["FinishAfter"]))
+    if "CancelAfter" in escrow:
+        escrow_data["expiry_date"] = str(ripple_time_to_datetime(escrow["CancelAfter"]))
+    if "Condition" in escrow:
+        escrow_data["condition"] = escrow["Condition"]
+    return escrow_data
+
+def iter_escrows(account, direction='all', page_size=200, object_type="escrow"):
+    """Yield an account's XRP escrows page by page, following markers.
+
+    The node filters by ledger object type; `direction` ('all', 'sent' or
+    'received') is applied as pages arrive. Every page is read from the
+    same validated ledger so markers stay consistent.
+    """
+    if direction not in ESCROW_DIRECTIONS:
+        raise ValueError(f"direction must be one of {ESCROW_DIRECTIONS}")
+    client = get_client()
+    ledger_index = "validated"
+    marker = None
+
+    while True:
+        req = AccountObjects(
+            account=account,
+            ledger_index=ledger_index,
+            type=object_type,
+            limit=page_size,
+            marker=marker
+        )
+        result = client.request(req).result
+        ledger_index = result.get("ledger_index", ledger_index)
+
+        for escrow in result["account_objects"]:
+            if not isinstance(escrow["Amount"], str):
+                continue
+            sent = escrow["Account"] == account
+            if (direction == 'sent' and not sent) or (direction == 'received' and sent):
+                continue
+            yield _parse_escrow(escrow)
+
+        marker = result.get("marker")
+        if marker is None:
+            return
+
+def get_escrows(account):
+    """Get all escrows for an account, formatted"""
+    all_escrows_dict = {"sent": [], "received": []}
+    for escrow_data in iter_escrows(account):
+        # Sort escrows
+        if escrow_data["sender"] == account:
+            all_escrows_dict["sent"].append(escrow_data)
+        else:
+            all_escrows_dict["received"].append(escrow_data)
+    return all_escrows_dict
+
+def get_escrow_sequence(prev_txn_id):
+    """Get escrow sequence from transaction ID"""
+    sequence = sequence_cache.get(prev_txn_id)
+    if sequence is not None:
+        return sequence
+    client = get_client()
+    req = Tx(transaction=prev_txn_id) 
+    response = client.request(req)
+    result = response.result
+    
+    sequence = sequence_from_tx(result)
+    if result.get("validated"):
+        sequence_cache.put(prev_txn_id, sequence)
+    return sequence
+
+async def get_escrow_sequence_async(prev_txn_id):
+    """Get escrow sequence from transaction ID (async)"""
+    sequence = sequence_cache.get(prev_txn_id)
+    if sequence is not None:
+        return sequence
+    client = get_async_client()
+    response = await client.request(Tx(transaction=prev_txn_id))
+    result = response.result
+
+    sequence = sequence_from_tx(result)
+    if result.get("validated"):
+        sequence_cache.put(prev_txn_id, sequence)
+    return sequence
+
+async def resolve_escrow_sequences_async(prev_txn_ids, max_concurrency=8):
+    """Resolve many escrow sequences, fetching only uncached ones with bounded parallelism"""
+    sequences = {tx: sequence_cache.get(tx) for tx in set(prev_txn_ids)}
+    missing = [tx for tx, seq in sequences.items() if seq is None]
+    semaphore = asyncio.Semaphore(max_concurrency)
+    client = get_async_client()
+
+    async def fetch(tx_hash):
+        async with semaphore:
+            response = await client.request(Tx(transaction=tx_hash))
+        return tx_hash, response.result
+
+    validated = {}
+    for tx_hash, result in await asyncio.gather(*(fetch(tx) for tx in missing)):
+        sequences[tx_hash] = sequence_from_tx(result)
+        if result.get("validated"):
+            validated[tx_hash] = sequences[tx_hash]
+    sequence_cache.put_many(validated)
+    return sequences
+
+def resolve_escrow_sequences(prev_txn_ids, max_concurrency=8):
+    """Blocking wrapper for resolve_escrow_sequences_async; returns {prev_txn_id: sequence}"""
+    async def run():
+        try:
+            return await resolve_escrow_sequences_async(prev_txn_ids, max_concurrency)
+        finally:
+            await xrpl_client.close_async_clients()
+    return asyncio.run(run())
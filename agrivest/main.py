@@ -0,0 +1,28 @@
+import importlib
+import sys
+
+# Subcommand -> (module, entry point). Modules are imported only when their
+# command runs, so e.g. `agrivest list` never loads the xrpl network stack.
+COMMANDS = {
+    'run': ('batch_runner', 'batch_main'),
+    'list': ('cli_handlers', 'list_main'),
+    'reconcile': ('cli_handlers', 'reconcile_main'),
+    'portfolio': ('cli_handlers', 'portfolio_main'),
+    'cap-table': ('cli_handlers', 'cap_table_main'),
+    'funding': ('cli_handlers', 'funding_main'),
+    'scheduler': ('cli_handlers', 'scheduler_main'),
+    'serve': ('service', 'serve_main'),
+}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        module_name, entry = COMMANDS[argv[0]]
+        module = importlib.import_module(f"{__package__}.{module_name}")
+        return getattr(module, entry)(argv[1:])
+    from .cli_handlers import cli_handle
+    cli_handle()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+import atexit
+import functools
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Result codes such as tecNO_PERMISSION inside submission error messages
+RESULT_CODE = re.compile(r'\b(te[cfms][A-Z_]+|ter[A-Z_]+|tesSUCCESS)\b')
+
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) -> [count, sum, errors, bucket counts...]
+_counters = {}  # (name, labels) -> value
+_trace = None
+enabled = os.environ.get('METRICS_DISABLED', '') not in ('1', 'true', 'yes')
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, error=False, **labels):
+    """Record one timed operation in the `name` histogram"""
+    if not enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0, 0.0, 0] + [0] * (len(BUCKETS) + 1)
+        series[0] += 1
+        series[1] += seconds
+        if error:
+            series[2] += 1
+        series[3 + bisect_left(BUCKETS, seconds)] += 1
+    if _trace is not None:
+        _trace.write(name, labels, seconds, error)
+
+
+def count(name, value=1, **labels):
+    """Add to the `name` counter"""
+    if not enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class timed:
+    """Context manager and decorator timing a block into `name`; exceptions count as errors"""
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.started, exc_type is not None, **self.labels)
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            error = True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                observe(self.name, time.perf_counter() - started, error, **self.labels)
+        return wrapper
+
+
+def storage_timed(operation):
+    """Decorator for storage engine methods; labels by engine class and operation"""
+    def decorate(func):
+        name = 'storage_operation_seconds'
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            error = True
+            try:
+                result = func(self, *args, **kwargs)
+                error = False
+                return result
+            finally:
+                observe(name, time.perf_counter() - started, error,
+                        engine=type(self).__name__, operation=operation)
+        return wrapper
+    return decorate
+
+
+# -- submissions ------------------------------------------------------------
+
+def result_code(response=None, error=None):
+    """Transaction result code from a submit_and_wait response or its exception"""
+    if response is not None:
+        result = getattr(response, 'result', response)
+        if isinstance(result, dict):
+            meta = result.get('meta') or {}
+            return meta.get('TransactionResult') or result.get('engine_result')
+    if error is not None:
+        match = RESULT_CODE.search(str(error))
+        return match.group(1) if match else type(error).__name__
+    return None
+
+
+def _record_submission(tx, started, response, error):
+    tx_type = tx.transaction_type.value if hasattr(tx.transaction_type, 'value') else str(tx.transaction_type)
+    code = result_code(response, error) or 'unknown'
+    observe('xrpl_submission_seconds', time.perf_counter() - started, code != 'tesSUCCESS', tx_type=tx_type)
+    count('xrpl_transaction_results_total', tx_type=tx_type, result=code)
+
+
+def observe_submission(tx, submit, *args, **kwargs):
+    """Call `submit(*args, **kwargs)` (e.g. submit_and_wait) and record its latency and result code"""
+    started = time.perf_counter()
+    try:
+        response = submit(*args, **kwargs)
+    except Exception as e:
+        _record_submission(tx, started, None, e)
+        raise
+    _record_submission(tx, started, response, None)
+    return response
+
+
+async def observe_submission_async(tx, submission):
+    """Await the `submission` coroutine and record its latency and result code"""
+    started = time.perf_counter()
+    try:
+        response = await submission
+    except Exception as e:
+        _record_submission(tx, started, None, e)
+        raise
+    _record_submission(tx, started, response, None)
+    return response
+
+
+# -- trace log --------------------------------------------------------------
+
+class TraceLog:
+    """Appends one JSON line per observation; buffered and flushed in the background"""
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self._file = open(path, 'a')
+        self._lock = threading.Lock()
+        self._closed = False
+        self._flush_interval = flush_interval
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+
+    def write(self, name, labels, seconds, error):
+        line = json.dumps({'ts': time.time(), 'name': name, 'labels': labels,
+                           'ms': round(seconds * 1000, 3), 'error': error})
+        with self._lock:
+            if not self._closed:
+                self._file.write(line + '\n')
+
+    def _flush_loop(self):
+        while not self._closed:
+            time.sleep(self._flush_interval)
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._closed:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._file.close()
+
+
+def enable_trace(path):
+    """Log every observation to `path` as JSON lines"""
+    global _trace
+    disable_trace()
+    _trace = TraceLog(path)
+    return _trace
+
+
+def disable_trace():
+    global _trace
+    trace, _trace = _trace, None
+    if trace is not None:
+        trace.close()
+
+
+# -- reading ----------------------------------------------------------------
+
+def _quantile(buckets, total, fraction):
+    """Upper bound of the bucket holding the `fraction` quantile"""
+    rank = fraction * total
+    seen = 0
+    for bound, hits in zip(BUCKETS + (float('inf'),), buckets):
+        seen += hits
+        if seen >= rank:
+            return bound
+    return float('inf')
+
+
+def snapshot():
+    """Current histograms and counters as plain dicts"""
+    with _lock:
+        histograms = {key: list(series) for key, series in _histograms.items()}
+        counters = dict(_counters)
+    result = {'histograms': [], 'counters': []}
+    for (name, labels), series in sorted(histograms.items()):
+        total, seconds, errors, buckets = series[0], series[1], series[2], series[3:]
+        result['histograms'].append({
+            'name': name, 'labels': dict(labels), 'count': total, 'errors': errors,
+            'sum_seconds': seconds, 'mean_ms': seconds / total * 1000 if total else 0.0,
+            'p50_le_seconds': _quantile(buckets, total, 0.5),
+            'p90_le_seconds': _quantile(buckets, total, 0.9),
+            'p99_le_seconds': _quantile(buckets, total, 0.99),
+        })
+    for (name, labels), value in sorted(counters.items()):
+        result['counters'].append({'name': name, 'labels': dict(labels), 'value': value})
+    return result
+
+
+def _labels_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs) + '}'
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format"""
+    with _lock:
+        histograms = {key: list(series) for key, series in _histograms.items()}
+        counters = dict(_counters)
+    lines = []
+    for name in sorted({key[0] for key in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0
+            for bound, hits in zip(BUCKETS + ('+Inf',), series[3:]):
+                cumulative += hits
+                lines.append(f"{name}_bucket{_labels_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels_text(labels)} {series[1]}")
+            lines.append(f"{name}_count{_labels_text(labels)} {series[0]}")
+        errors_name = name.replace('_seconds', '') + '_errors_total'
+        lines.append(f"# TYPE {errors_name} counter")
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name == name:
+                lines.append(f"{errors_name}{_labels_text(labels)} {series[2]}")
+    for name in sorted({key[0] for key in counters}):
+        lines.append(f"# TYPE {name} counter")
+        for (series_name, labels), value in sorted(counters.items()):
+            if series_name == name:
+                lines.append(f"{name}{_labels_text(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path):
+    """Write prometheus_text() to `path` atomically (e.g. for a node_exporter textfile collector)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def _at_exit():
+    if os.environ.get('METRICS_FILE'):
+        write_prometheus(os.environ['METRICS_FILE'])
+    disable_trace()
+
+
+if os.environ.get('METRICS_TRACE_LOG'):
+    enable_trace(os.environ['METRICS_TRACE_LOG'])
+atexit.register(_at_exit)
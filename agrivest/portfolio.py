@@ -0,0 +1,88 @@
+import asyncio
+from decimal import Decimal
+
+from . import xrpl_client
+from . import wallet
+from . import tokens
+
+DROPS_PER_XRP = Decimal(1000000)
+
+
+def token_holdings(lines):
+    """Positive balances held on `account_lines` trust lines"""
+    holdings = []
+    for line in lines:
+        balance = Decimal(line['balance'])
+        if balance > 0:
+            holdings.append({'currency': line['currency'], 'issuer': line['account'], 'balance': balance})
+    return holdings
+
+
+async def get_holding_async(address):
+    """XRP balance and token holdings of one address (no seed needed)"""
+    try:
+        account_info, lines = await asyncio.gather(
+            wallet.get_account_info_async(address),
+            tokens.get_account_lines_async(address)
+        )
+    except KeyError:
+        # account_info/account_lines return no data for unfunded accounts
+        return {'address': address, 'exists': False, 'xrp': Decimal(0), 'tokens': []}
+    return {'address': address, 'exists': True, 'xrp': Decimal(account_info['Balance']) / DROPS_PER_XRP,
+            'tokens': token_holdings(lines)}
+
+
+async def get_holdings_async(addresses, max_concurrency=xrpl_client.DEFAULT_POOL_SIZE):
+    """Holdings of many addresses, fetched concurrently with bounded parallelism"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(address):
+        async with semaphore:
+            try:
+                return await get_holding_async(address)
+            except Exception as e:
+                return {'address': address, 'exists': None, 'xrp': None, 'tokens': [], 'error': str(e)}
+
+    return await asyncio.gather(*(fetch(address) for address in dict.fromkeys(addresses)))
+
+
+def get_holdings(addresses, max_concurrency=xrpl_client.DEFAULT_POOL_SIZE):
+    """Blocking wrapper for get_holdings_async; returns one holding dict per address"""
+    async def run():
+        try:
+            return await get_holdings_async(addresses, max_concurrency)
+        finally:
+            await xrpl_client.close_async_clients()
+    return asyncio.run(run())
+
+
+def consolidate(holdings, campaigns):
+    """Portfolio table: per-address rows plus per-campaign token totals.
+
+    `campaigns` are campaign records; a token counts toward a campaign when
+    its issuer is the campaign's farmer and its currency the campaign token.
+    """
+    by_token = {(c['farmer_address'], c['token_currency']): c for c in campaigns if c.get('token_currency')}
+    totals = {}
+    rows = []
+    for holding in holdings:
+        row = dict(holding, campaign_tokens={})
+        for token in holding['tokens']:
+            campaign = by_token.get((token['issuer'], token['currency']))
+            if campaign is None:
+                continue
+            row['campaign_tokens'][campaign['id']] = row['campaign_tokens'].get(campaign['id'], 0) + token['balance']
+            total = totals.setdefault(campaign['id'], {
+                'campaign_id': campaign['id'], 'project_title': campaign['project_title'],
+                'token_currency': campaign['token_currency'], 'issuer': campaign['farmer_address'],
+                'holders': 0, 'total': Decimal(0)
+            })
+            total['holders'] += 1
+            total['total'] += token['balance']
+        rows.append(row)
+    return {
+        'accounts': rows,
+        'campaigns': sorted(totals.values(), key=lambda t: t['campaign_id']),
+        'total_xrp': sum((r['xrp'] for r in rows if r['xrp'] is not None), Decimal(0)),
+        'errors': sum(1 for r in rows if r.get('error'))
+    }
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+
+from xrpl.models.requests import Ledger
+from .xrpl_client import get_client, get_async_client
+
+DEFAULT_MAX_ENTRIES = 4096
+# How long the latest validated ledger index is trusted before asking the
+# node again. Ledgers close every ~3-4 s, so one lookup serves many reads.
+DEFAULT_LEDGER_TTL = 1.0
+
+
+class LedgerReadCache:
+    """Read-through cache for account reads, keyed by (request, account, args, ledger_index).
+
+    Reads are pinned to the latest validated ledger, so an entry stays valid
+    until the next ledger validates and is then simply never hit again. The
+    cache is LRU-bounded, and `invalidate()` drops an account's entries and
+    forces a fresh ledger lookup after the platform submits a write for it.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ledger_ttl=DEFAULT_LEDGER_TTL):
+        self.max_entries = max_entries
+        self.ledger_ttl = ledger_ttl
+        self._entries = OrderedDict()
+        self._keys_by_account = {}
+        self._ledger_index = None
+        self._ledger_checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # -- validated ledger ---------------------------------------------------
+
+    def _known_ledger(self):
+        with self._lock:
+            if self._ledger_index is not None and time.monotonic() - self._ledger_checked_at < self.ledger_ttl:
+                return self._ledger_index
+        return None
+
+    def _set_ledger(self, ledger_index):
+        with self._lock:
+            self._ledger_index = ledger_index
+            self._ledger_checked_at = time.monotonic()
+        return ledger_index
+
+    def validated_ledger(self):
+        ledger_index = self._known_ledger()
+        if ledger_index is None:
+            response = get_client().request(Ledger(ledger_index="validated"))
+            ledger_index = self._set_ledger(response.result['ledger_index'])
+        return ledger_index
+
+    async def validated_ledger_async(self):
+        ledger_index = self._known_ledger()
+        if ledger_index is None:
+            response = await get_async_client().request(Ledger(ledger_index="validated"))
+            ledger_index = self._set_ledger(response.result['ledger_index'])
+        return ledger_index
+
+    # -- entries ------------------------------------------------------------
+
+    def _lookup(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def _store(self, key, value):
+        account = key[1]
+        with self._lock:
+            self._entries[key] = value
+            self._keys_by_account.setdefault(account, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._forget_key(old_key)
+        return value
+
+    def _forget_key(self, key):
+        keys = self._keys_by_account.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_account[key[1]]
+
+    def read(self, kind, account, fetch, args=()):
+        """Return `fetch(ledger_index)` for the current validated ledger, cached"""
+        key = (kind, account, args, self.validated_ledger())
+        found, value = self._lookup(key)
+        if found:
+            return value
+        return self._store(key, fetch(key[3]))
+
+    async def read_async(self, kind, account, fetch, args=()):
+        """Async counterpart of read; `fetch` is a coroutine function"""
+        key = (kind, account, args, await self.validated_ledger_async())
+        found, value = self._lookup(key)
+        if found:
+            return value
+        return self._store(key, await fetch(key[3]))
+
+    def invalidate(self, *accounts):
+        """Drop cached reads for accounts the platform just wrote to"""
+        with self._lock:
+            for account in accounts:
+                for key in self._keys_by_account.pop(account, ()):
+                    self._entries.pop(key, None)
+            # The write lands in a later ledger than the one we know about
+            self._ledger_checked_at = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_account.clear()
+            self._ledger_index = None
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'ledger_index': self._ledger_index}
+
+
+cache = LedgerReadCache()
+
+
+def invalidate_for(tx):
+    """Invalidate every account a transaction can change"""
+    accounts = [tx.account]
+    for field in ('destination', 'owner'):
+        if getattr(tx, field, None):
+            accounts.append(getattr(tx, field))
+    limit_amount = getattr(tx, 'limit_amount', None)
+    if limit_amount is not None:
+        accounts.append(limit_amount.issuer)
+    cache.invalidate(*accounts)
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+
+from xrpl.models.requests import AccountTx, Ledger
+from xrpl.utils import ripple_time_to_datetime
+from . import xrpl_client
+from .xrpl_client import get_async_client
+from .storage_engine import VersionConflict
+
+DEFAULT_STATE_FILE = os.path.join('storage', 'reconcile_state.json')
+DEFAULT_PAGE_SIZE = 400
+DEFAULT_CONCURRENCY = 8
+DROPS_PER_XRP = 1000000
+
+# Microloan statuses the ledger may move forward; anything else is final in storage
+OPEN_LOAN_STATUSES = ('pending', 'active', 'finishing', 'cancelling')
+
+
+def _empty_state():
+    return {'ledgers': {}, 'xrp_paid': {}, 'tokens_sent': {}, 'discrepancies': []}
+
+
+def _close_time(entry, tx):
+    """Ledger close time of a transaction as a naive local ISO timestamp, like datetime.now().isoformat()"""
+    if entry.get('close_time_iso'):
+        closed = datetime.fromisoformat(entry['close_time_iso'])
+    elif tx.get('date'):
+        closed = ripple_time_to_datetime(tx['date'])
+    else:
+        return datetime.now().isoformat()
+    return closed.astimezone().replace(tzinfo=None).isoformat()
+
+
+def _entry_fields(entry):
+    """(tx_json, meta, hash, ledger_index) from an account_tx entry (API v1 or v2)"""
+    tx = entry.get('tx_json') or entry.get('tx') or {}
+    meta = entry.get('meta') or {}
+    return tx, meta, entry.get('hash') or tx.get('hash'), entry.get('ledger_index') or tx.get('ledger_index')
+
+
+class LedgerReconciler:
+    """Brings microloan and investment records in line with validated ledger history.
+
+    Streams `account_tx` for every farmer and investor address, starting after
+    the last ledger each account was reconciled to, so a first run reads each
+    account's history once and later runs only read new ledgers. Escrow
+    creates, finishes and cancels move microloan statuses forward. Payments are
+    totalled per (investor, farmer) and compared with recorded investments.
+    Progress, payment totals and open discrepancies are persisted together in
+    one state file.
+    """
+
+    def __init__(self, storage, state_file=DEFAULT_STATE_FILE, page_size=DEFAULT_PAGE_SIZE,
+                 max_concurrency=DEFAULT_CONCURRENCY):
+        self.storage = storage
+        self.state_file = state_file
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.state = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return _empty_state()
+        with open(self.state_file, 'r') as f:
+            return dict(_empty_state(), **json.load(f))
+
+    def _save(self):
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_file)
+
+    # -- storage side ---------------------------------------------------------
+
+    def _index_storage(self):
+        """Addresses to stream plus microloan lookups, from one pass over storage"""
+        addresses = set()
+        self._loans_by_hash = {}
+        self._loans_by_escrow = {}
+        for loan in self.storage.scan('microloans', order_by='id'):
+            addresses.update((loan['farmer_address'], loan['investor_address']))
+            if loan.get('escrow_tx_hash'):
+                self._loans_by_hash[loan['escrow_tx_hash']] = loan['id']
+            if loan.get('escrow_sequence'):
+                self._loans_by_escrow[(loan['investor_address'], loan['escrow_sequence'])] = loan['id']
+        self._campaigns = {}
+        for campaign in self.storage.scan('campaigns', order_by='id'):
+            addresses.add(campaign['farmer_address'])
+            self._campaigns[campaign['id']] = campaign
+        for investment in self.storage.scan('investments', order_by='id'):
+            addresses.add(investment['investor_address'])
+        addresses.discard(None)
+        return sorted(addresses)
+
+    # -- ledger side ----------------------------------------------------------
+
+    async def _stream_account(self, client, address, validated, semaphore, report):
+        start = self.state['ledgers'].get(address, -1) + 1
+        if start > validated:
+            return
+        async with semaphore:
+            marker = None
+            while True:
+                response = await client.request(AccountTx(
+                    account=address,
+                    ledger_index_min=start if start > 0 else -1,
+                    ledger_index_max=validated,
+                    forward=True,
+                    limit=self.page_size,
+                    marker=marker
+                ))
+                if not response.is_successful():
+                    if response.result.get('error') == 'actNotFound':
+                        break  # never funded; nothing to reconcile
+                    raise RuntimeError(f"account_tx failed for {address}: {response.result}")
+                for entry in response.result.get('transactions', []):
+                    self._apply(address, entry, report)
+                marker = response.result.get('marker')
+                if marker is None:
+                    break
+        report['accounts'] += 1
+        self.state['ledgers'][address] = validated
+
+    def _apply(self, address, entry, report):
+        tx, meta, tx_hash, ledger_index = _entry_fields(entry)
+        report['transactions'] += 1
+        result = meta.get('TransactionResult')
+        tx_type = tx.get('TransactionType')
+        # Each transaction shows up in several accounts' histories; only the
+        # sender's stream counts payments and creates, only the owner's counts
+        # escrow settlement, so nothing is applied twice
+        if tx_type == 'Payment' and tx.get('Account') == address and result == 'tesSUCCESS':
+            self._add_payment(tx, meta)
+        elif tx_type == 'EscrowCreate' and tx.get('Account') == address:
+            loan_id = self._loans_by_hash.get(tx_hash)
+            if loan_id is not None:
+                status = 'active' if result == 'tesSUCCESS' else 'failed'
+                self._move_loan(loan_id, ('pending',), {'status': status}, report, flag=False)
+        elif tx_type in ('EscrowFinish', 'EscrowCancel') and tx.get('Owner') == address and result == 'tesSUCCESS':
+            loan_id = self._loans_by_escrow.get((address, tx.get('OfferSequence')))
+            if loan_id is None:
+                return
+            when = _close_time(entry, tx)
+            if tx_type == 'EscrowFinish':
+                changes = {'status': 'completed', 'completed_at': when}
+            else:
+                changes = {'status': 'cancelled', 'cancelled_at': when}
+            changes['settle_tx_hash'] = tx_hash
+            self._move_loan(loan_id, OPEN_LOAN_STATUSES, changes, report)
+
+    def _add_payment(self, tx, meta):
+        amount = meta.get('delivered_amount') or tx.get('DeliverMax') or tx.get('Amount')
+        if isinstance(amount, str):
+            key = f"{tx['Account']}|{tx['Destination']}"
+            self.state['xrp_paid'][key] = self.state['xrp_paid'].get(key, 0) + int(amount)
+        elif isinstance(amount, dict) and amount.get('issuer') == tx['Account']:
+            key = f"{tx['Account']}|{tx['Destination']}|{amount['currency']}"
+            total = Decimal(self.state['tokens_sent'].get(key, '0')) + Decimal(amount['value'])
+            self.state['tokens_sent'][key] = str(total)
+
+    def _move_loan(self, loan_id, from_statuses, changes, report, flag=True):
+        changes = dict(changes, pending_tx=None, reconciled_at=datetime.now().isoformat())
+        while True:
+            loan = self.storage.get('microloans', loan_id)
+            if loan is None or loan['status'] == changes['status']:
+                return
+            if loan['status'] not in from_statuses:
+                if flag:
+                    report['discrepancies'].append({
+                        'kind': 'microloan_status', 'microloan_id': loan_id,
+                        'stored': loan['status'], 'ledger': changes['status']
+                    })
+                return
+            try:
+                # The platform or scheduler may move the same loan meanwhile; re-check if so
+                self.storage.update('microloans', loan_id, changes, expected_version=loan.get('version', 0))
+                break
+            except VersionConflict:
+                continue
+        report['updated'] += 1
+
+    def _check_investments(self, report):
+        """Compare recorded investment totals with XRP paid and tokens received per campaign"""
+        recorded = {}
+        for investment in self.storage.scan('investments', order_by='id'):
+            key = (investment['investor_address'], investment['campaign_id'])
+            recorded[key] = recorded.get(key, 0) + investment['amount']
+        for (investor, campaign_id), amount in recorded.items():
+            campaign = self._campaigns.get(campaign_id)
+            if campaign is None:
+                continue
+            farmer = campaign['farmer_address']
+            paid = self.state['xrp_paid'].get(f"{investor}|{farmer}", 0) / DROPS_PER_XRP
+            if paid < amount:
+                report['discrepancies'].append({
+                    'kind': 'investment_xrp_missing', 'campaign_id': campaign_id,
+                    'investor_address': investor, 'recorded': amount, 'ledger': paid
+                })
+            currency = campaign.get('token_currency')
+            if currency:
+                received = Decimal(self.state['tokens_sent'].get(f"{farmer}|{investor}|{currency}", '0'))
+                if received < amount:
+                    report['discrepancies'].append({
+                        'kind': 'investment_tokens_missing', 'campaign_id': campaign_id,
+                        'investor_address': investor, 'recorded': amount, 'ledger': str(received)
+                    })
+
+    async def run_async(self):
+        """Reconcile up to the latest validated ledger; returns a report dict"""
+        addresses = self._index_storage()
+        client = get_async_client()
+        validated = (await client.request(Ledger(ledger_index="validated"))).result['ledger_index']
+        report = {'validated_ledger': validated, 'accounts': 0, 'transactions': 0,
+                  'updated': 0, 'discrepancies': []}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.gather(*(self._stream_account(client, address, validated, semaphore, report)
+                                   for address in addresses))
+        except Exception:
+            # Totals and per-account progress are only valid together; drop this run's partial state
+            self.state = self._load()
+            raise
+        self._check_investments(report)
+        # Investment checks are recomputed from the totals each run; microloan
+        # status conflicts stay flagged until the record is fixed
+        kept = [d for d in self.state['discrepancies'] if d['kind'] == 'microloan_status'
+                and self.storage.get('microloans', d['microloan_id'])
+                and self.storage.get('microloans', d['microloan_id'])['status'] == d['stored']]
+        seen = {json.dumps(d, sort_keys=True) for d in kept}
+        for discrepancy in report['discrepancies']:
+            if json.dumps(discrepancy, sort_keys=True) not in seen:
+                kept.append(discrepancy)
+        self.state['discrepancies'] = kept
+        report['discrepancies'] = kept
+        self._save()
+        return report
+
+    def run(self):
+        """Blocking wrapper for run_async"""
+        async def run():
+            try:
+                return await self.run_async()
+            finally:
+                await xrpl_client.close_async_clients()
+        return asyncio.run(run())
+
+    def discrepancies(self):
+        return list(self.state['discrepancies'])
@@ -0,0 +1,269 @@
+"""Compact record classes for campaigns, investments and microloans.
+
+Records read like the dicts they replace (record['status'], record.get(...),
+dict(record)), but keep their fields in __slots__, XRP amounts as integer
+drops and timestamps as integer microseconds since 1970-01-01 (wall clock,
+as stored). Addresses and statuses are interned so repeated values share one
+string. Fields outside a class's slots go to a small overflow dict.
+
+Only the storage engines mutate records; everything else treats them as
+read-only mappings. Files keep the original JSON layout (XRP, ISO strings).
+"""
+import copy
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+DROPS_PER_XRP = 1_000_000
+_EPOCH = datetime(1970, 1, 1)
+_MISSING = object()
+_PLAIN = object()
+_INTERN = object()
+# ISO forms written by datetime.isoformat() (seconds or microseconds) round-trip exactly
+_ISO_LENGTHS = (19, 26)
+
+
+def to_drops(xrp):
+    """XRP amount -> integer drops, or None when it is not a whole number of drops"""
+    if type(xrp) is int:
+        return xrp * DROPS_PER_XRP
+    if isinstance(xrp, (float, Decimal, str)):
+        try:
+            drops = Decimal(str(xrp)) * DROPS_PER_XRP
+        except ArithmeticError:
+            return None
+        if drops.is_finite() and drops == drops.to_integral_value():
+            return int(drops)
+    return None
+
+
+def from_drops(drops):
+    """Integer drops -> XRP, an int when whole and a Decimal otherwise"""
+    whole, rest = divmod(drops, DROPS_PER_XRP)
+    return whole if not rest else Decimal(drops) / DROPS_PER_XRP
+
+
+def to_micros(timestamp):
+    """Naive ISO timestamp -> integer microseconds since 1970-01-01, or None"""
+    if type(timestamp) is not str or len(timestamp) not in _ISO_LENGTHS or timestamp[10:11] != 'T':
+        return None
+    try:
+        delta = datetime.fromisoformat(timestamp) - _EPOCH
+    except ValueError:
+        return None
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(micros):
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+class Record(Mapping):
+    """Base for slotted records; subclasses list their fields in __slots__.
+
+    AMOUNTS are stored as drops, TIMES as microseconds and INTERNED strings
+    through sys.intern. Values that do not convert (None, odd formats) are
+    kept as given.
+    """
+    __slots__ = ('id', 'version', '_extra')
+    AMOUNTS = ()
+    TIMES = ()
+    INTERNED = ()
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls._fields = ('id',) + cls.__slots__ + ('version',)
+        kinds = {field: _PLAIN for field in cls._fields}
+        kinds.update({field: _INTERN for field in cls.INTERNED})
+        kinds.update({field: (to_drops, from_drops) for field in cls.AMOUNTS})
+        kinds.update({field: (to_micros, from_micros) for field in cls.TIMES})
+        cls._kinds = kinds
+
+    def __init__(self, fields=(), **kwargs):
+        self._extra = None
+        self.update(fields, **kwargs)
+
+    def _set(self, key, value):
+        kind = self._kinds.get(key)
+        if kind is None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+            return
+        if kind is _INTERN:
+            if type(value) is str:
+                value = sys.intern(value)
+        elif kind is not _PLAIN and type(value) is not bool:
+            encoded = kind[0](value)
+            if encoded is not None:
+                value = encoded
+        setattr(self, key, value)
+
+    def update(self, fields=(), **kwargs):
+        """Set fields from a mapping (storage engines only)"""
+        items = fields.items() if isinstance(fields, Mapping) else fields
+        for key, value in items:
+            self._set(key, value)
+        for key, value in kwargs.items():
+            self._set(key, value)
+
+    def clear(self):
+        """Drop every field (storage engines only)"""
+        for field in self._fields:
+            if hasattr(self, field):
+                delattr(self, field)
+        self._extra = None
+
+    def get(self, key, default=None):
+        kind = self._kinds.get(key)
+        if kind is None:
+            return self._extra.get(key, default) if self._extra is not None else default
+        value = getattr(self, key, _MISSING)
+        if value is _MISSING:
+            return default
+        if type(value) is int and type(kind) is tuple:
+            return kind[1](value)
+        return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self):
+        for field in self._fields:
+            if hasattr(self, field):
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def __copy__(self):
+        return type(self)(self)
+
+    def __deepcopy__(self, memo):
+        return type(self)(copy.deepcopy(dict(self), memo))
+
+    def raw(self, field):
+        """Stored value of a slot field: drops for amounts, microseconds for times"""
+        return getattr(self, field, None)
+
+    def to_dict(self):
+        return dict(self)
+
+
+class Campaign(Record):
+    __slots__ = ('farmer_name', 'project_title', 'description', 'funding_goal', 'farmer_wallet_seed',
+                 'farmer_address', 'token_currency', 'status', 'created_at', 'funded_at')
+    AMOUNTS = ('funding_goal',)
+    TIMES = ('created_at', 'funded_at')
+    INTERNED = ('farmer_name', 'farmer_address', 'token_currency', 'status')
+
+
+class Investment(Record):
+    __slots__ = ('campaign_id', 'investor_address', 'amount', 'token_id', 'created_at')
+    AMOUNTS = ('amount',)
+    TIMES = ('created_at',)
+    INTERNED = ('investor_address',)
+
+
+class Microloan(Record):
+    __slots__ = ('farmer_address', 'investor_address', 'loan_amount', 'repayment_days', 'status',
+                 'escrow_sequence', 'escrow_tx_hash', 'finish_after', 'cancel_after', 'pending_tx',
+                 'tx_result', 'settled_by', 'settle_tx_hash', 'created_at', 'completed_at', 'cancelled_at')
+    AMOUNTS = ('loan_amount',)
+    TIMES = ('created_at', 'completed_at', 'cancelled_at')
+    INTERNED = ('farmer_address', 'investor_address', 'status', 'tx_result', 'settled_by')
+
+
+RECORD_TYPES = {
+    'campaigns': Campaign,
+    'investments': Investment,
+    'microloans': Microloan,
+}
+
+
+def from_dict(table, fields):
+    """Typed record for a row of `table` (a dict as stored in JSON, or another record)"""
+    cls = RECORD_TYPES[table]
+    record = cls.__new__(cls)
+    record._extra = None
+    kinds = cls._kinds
+    for key, value in fields.items():
+        if kinds.get(key) is _PLAIN:
+            setattr(record, key, value)
+        else:
+            record._set(key, value)
+    return record
+
+
+def json_default(value):
+    """json.dump fallback that writes records in the original dict layout"""
+    if isinstance(value, Record):
+        return dict(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Columns:
+    """Column-per-field copy of a set of records for bulk scans.
+
+    Integer columns (ids, drops, microseconds) are packed into array('q');
+    the rest are lists of the record values. Built in one pass and not kept
+    in sync with storage, so build it for a scan and drop it afterwards.
+    """
+
+    def __init__(self, records, fields):
+        self.fields = tuple(fields)
+        values = {field: [] for field in self.fields}
+        for record in records:
+            for field in self.fields:
+                raw = record.raw(field) if field in record._kinds else record.get(field)
+                values[field].append(raw)
+        self._columns = {}
+        self._ascending = set()
+        for field, column in values.items():
+            if column and all(type(v) is int for v in column):
+                column = array('q', column)
+                # ids and creation times usually come out in order; ranges on those are binary searches
+                if all(a <= b for a, b in zip(column, islice(column, 1, None))):
+                    self._ascending.add(field)
+            self._columns[field] = column
+
+    def __len__(self):
+        return len(self._columns[self.fields[0]]) if self.fields else 0
+
+    def __getitem__(self, field):
+        return self._columns[field]
+
+    def sum_by(self, group_field, value_field):
+        """{group value: sum of value_field} over every row"""
+        totals = {}
+        get = totals.get
+        for group, value in zip(self._columns[group_field], self._columns[value_field]):
+            totals[group] = get(group, 0) + value
+        return totals
+
+    def select(self, field, low=None, high=None):
+        """Row numbers whose `field` is in [low, high)"""
+        column = self._columns[field]
+        if field in self._ascending:
+            start = 0 if low is None else bisect_left(column, low)
+            end = len(column) if high is None else bisect_left(column, high)
+            return range(start, end)
+        return [i for i, v in enumerate(column)
+                if (low is None or v >= low) and (high is None or v < high)]
@@ -0,0 +1,33 @@
+import asyncio
+
+import xrpl
+from .xrpl_client import get_async_client
+
+
+class SequenceManager:
+    """Hands out account sequence numbers locally.
+
+    The next sequence is fetched from the ledger once per account; after that
+    numbers are reserved in memory, so several transactions from the same
+    account can be signed and submitted back-to-back within one ledger
+    instead of waiting for each to validate.
+    """
+
+    def __init__(self):
+        self._next = {}
+        self._locks = {}
+
+    async def reserve(self, address, count=1):
+        """Reserve `count` consecutive sequence numbers and return the first"""
+        lock = self._locks.setdefault(address, asyncio.Lock())
+        async with lock:
+            if address not in self._next:
+                self._next[address] = await xrpl.asyncio.account.get_next_valid_seq_number(
+                    address, get_async_client())
+            first = self._next[address]
+            self._next[address] += count
+            return first
+
+    def reset(self, address):
+        """Forget the local sequence, e.g. after a submission that consumed none"""
+        self._next.pop(address, None)
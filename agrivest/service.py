@@ -0,0 +1,404 @@
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import re
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from . import metrics
+from .batch_runner import INT_FIELDS, OPERATIONS
+from .crowdfunding_platform import CrowdfundingPlatform
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+MAX_BODY = 1 << 20
+JOBS_KEPT = 1000
+# Query parameters each list endpoint passes on to the platform's query_* method
+LIST_FILTERS = {
+    'campaigns': ('status', 'farmer_address', 'farmer_name', 'investor_address'),
+    'microloans': ('status', 'farmer_address', 'investor_address'),
+}
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _public(record):
+    """Copy of a stored record without wallet seeds"""
+    if record is None:
+        return None
+    return {k: v for k, v in record.items() if not k.endswith('_seed')}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Coalescer:
+    """Shares one in-flight computation among identical concurrent requests"""
+
+    def __init__(self):
+        self._inflight = {}
+        self.shared = 0
+        self.started = 0
+
+    async def run(self, key, factory):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None))
+            self.started += 1
+        else:
+            self.shared += 1
+            metrics.count('service_coalesced_total', route=key[0])
+        # A client that disconnects must not cancel the work others are waiting on
+        return await asyncio.shield(task)
+
+
+class SubmissionPool:
+    """Bounded worker pool for ledger operations.
+
+    Operations on the same campaign, microloan or signing account run in
+    arrival order (the batch runner's keys); others run in parallel on
+    `workers` threads. Once `max_pending` operations are queued or running,
+    new ones are refused so callers back off instead of piling up.
+    """
+
+    def __init__(self, platform, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.platform = platform
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='submit')
+        self._tails = {}
+        self._ids = itertools.count(1)
+        self.jobs = OrderedDict()
+
+    def submit(self, op, args):
+        """Queue `op`; returns its job record, whose 'task' resolves when it finishes"""
+        if op not in OPERATIONS:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"unknown operation {op!r}")
+        if self.pending >= self.max_pending:
+            metrics.count('service_rejected_total', op=op)
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, 'submission queue is full', {'Retry-After': '1'})
+        handler, keys_fn = OPERATIONS[op]
+        try:
+            keys = keys_fn(args)
+        except KeyError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"missing field {e.args[0]!r}")
+        except Exception as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+        waits = [self._tails[key] for key in keys if key in self._tails]
+        job = {'id': next(self._ids), 'op': op, 'status': 'queued',
+               'submitted_at': datetime.now().isoformat()}
+        self.pending += 1
+        task = asyncio.ensure_future(self._run(job, handler, args, waits))
+        for key in keys:
+            self._tails[key] = task
+        task.add_done_callback(lambda t: self._release(keys, t))
+        job['task'] = task
+        self.jobs[job['id']] = job
+        while len(self.jobs) > JOBS_KEPT:
+            self.jobs.popitem(last=False)
+        return job
+
+    async def _run(self, job, handler, args, waits):
+        for wait in waits:
+            with contextlib.suppress(Exception):
+                await asyncio.shield(wait)
+        job['status'] = 'running'
+        loop = asyncio.get_running_loop()
+        try:
+            with metrics.timed('service_operation_seconds', op=job['op']):
+                result = await loop.run_in_executor(self._executor, handler, self.platform, args)
+        except Exception as e:
+            job.update(status='failed', error=str(e))
+        else:
+            if result is None:
+                job.update(status='failed', error='operation rejected (see service log)')
+            else:
+                job.update(status='done', result=_public(result) if isinstance(result, dict) else result)
+        job['finished_at'] = datetime.now().isoformat()
+        return job
+
+    def _release(self, keys, task):
+        self.pending -= 1
+        for key in keys:
+            if self._tails.get(key) is task:
+                del self._tails[key]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+class PlatformService:
+    """Long-lived HTTP/JSON front end for one CrowdfundingPlatform.
+
+    Storage stays open (and its indexes in memory) for the life of the
+    service. Identical concurrent GETs share one computation; ledger
+    operations go through a SubmissionPool. The HTTP/1.1 handling is the
+    minimal subset JSON clients need: keep-alive and Content-Length bodies.
+    """
+
+    def __init__(self, platform, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.platform = platform
+        self.coalescer = Coalescer()
+        self.pool = SubmissionPool(platform, workers, max_pending)
+        self._server = None
+        self._routes = [
+            ('GET', r'/health', self._health),
+            ('GET', r'/metrics', self._metrics),
+            ('GET', r'/campaigns', self._list_campaigns),
+            ('GET', r'/campaigns/(\d+)', self._get_campaign),
+            ('GET', r'/campaigns/(\d+)/cap-table', self._cap_table),
+            ('GET', r'/microloans', self._list_microloans),
+            ('GET', r'/microloans/(\d+)', self._get_microloan),
+            ('GET', r'/accounts/(r\w+)', self._account),
+            ('GET', r'/accounts/(r\w+)/investments', self._exposure),
+            ('GET', r'/portfolio', self._portfolio),
+            ('GET', r'/jobs/(\d+)', self._job),
+            ('POST', r'/campaigns', self._op('create_campaign')),
+            ('POST', r'/campaigns/(\d+)/approve', self._op('approve', 'campaign_id')),
+            ('POST', r'/campaigns/(\d+)/investments', self._op('invest', 'campaign_id')),
+            ('POST', r'/microloans', self._op('create_microloan')),
+            ('POST', r'/microloans/(\d+)/finish', self._op('finish_microloan', 'microloan_id')),
+            ('POST', r'/microloans/(\d+)/cancel', self._op('cancel_microloan', 'microloan_id')),
+        ]
+        self._routes = [(method, re.compile(pattern), handler) for method, pattern, handler in self._routes]
+
+    # -- reads ----------------------------------------------------------------
+
+    async def _health(self, match, query, body):
+        return HTTPStatus.OK, {'ok': True, 'pending': self.pool.pending,
+                               'coalesced': self.coalescer.shared}
+
+    async def _metrics(self, match, query, body):
+        return HTTPStatus.OK, metrics.prometheus_text()
+
+    def _page(self, query, records_fn, collection):
+        limit = min(int(query.get('limit', 20)), 500)
+        cursor = json.loads(query['cursor']) if query.get('cursor') else None
+        filters = {k: query[k] for k in LIST_FILTERS[collection] if k in query}
+        page, next_cursor = records_fn(limit=limit, cursor=cursor, **filters)
+        return HTTPStatus.OK, {'records': [_public(r) for r in page],
+                               'next_cursor': json.dumps(next_cursor) if next_cursor else None}
+
+    async def _list_campaigns(self, match, query, body):
+        status, page = self._page(query, self.platform.query_campaigns, 'campaigns')
+        page['records'] = [dict(r, funding=self.platform.funding_progress(r)) for r in page['records']]
+        return status, page
+
+    async def _list_microloans(self, match, query, body):
+        return self._page(query, self.platform.query_microloans, 'microloans')
+
+    def _record(self, table, record_id):
+        record = self.platform.storage.get(table, int(record_id))
+        if record is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"{table[:-1]} {record_id} not found")
+        return HTTPStatus.OK, _public(record)
+
+    async def _get_campaign(self, match, query, body):
+        status, campaign = self._record('campaigns', match.group(1))
+        return status, dict(campaign, funding=self.platform.funding_progress(campaign))
+
+    async def _exposure(self, match, query, body):
+        return HTTPStatus.OK, self.platform.investor_exposure(match.group(1))
+
+    async def _get_microloan(self, match, query, body):
+        return self._record('microloans', match.group(1))
+
+    async def _cap_table(self, match, query, body):
+        table = await asyncio.to_thread(self.platform.cap_table, int(match.group(1)))
+        if table is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, 'campaign not found or not approved yet')
+        return HTTPStatus.OK, {'campaign': _public(table['campaign']), 'holders': table['holders']}
+
+    async def _account(self, match, query, body):
+        from . import portfolio
+        return HTTPStatus.OK, await portfolio.get_holding_async(match.group(1))
+
+    async def _portfolio(self, match, query, body):
+        from . import portfolio
+        campaigns = list(self.platform.storage.scan('campaigns', order_by='id'))
+        addresses = query.get('address') or self.platform.known_addresses(campaigns)
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        holdings = await portfolio.get_holdings_async(addresses)
+        return HTTPStatus.OK, portfolio.consolidate(holdings, campaigns)
+
+    async def _job(self, match, query, body):
+        job = self.pool.jobs.get(int(match.group(1)))
+        if job is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, 'unknown job (finished jobs are kept for a while)')
+        return HTTPStatus.OK, {k: v for k, v in job.items() if k != 'task'}
+
+    # -- writes ---------------------------------------------------------------
+
+    def _op(self, op, path_field=None):
+        async def handler(match, query, body):
+            try:
+                args = json.loads(body) if body else {}
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, 'body must be a JSON object')
+            if not isinstance(args, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, 'body must be a JSON object')
+            if path_field:
+                args[path_field] = match.group(1)
+            for field in INT_FIELDS:
+                if isinstance(args.get(field), str) and args[field].isdigit():
+                    args[field] = int(args[field])
+            job = self.pool.submit(op, args)
+            if query.get('wait') in ('0', 'false', 'no'):
+                return HTTPStatus.ACCEPTED, {'job': job['id'], 'status': job['status']}
+            await asyncio.shield(job['task'])
+            status = HTTPStatus.OK if job['status'] == 'done' else HTTPStatus.UNPROCESSABLE_ENTITY
+            return status, {k: v for k, v in job.items() if k != 'task'}
+        return handler
+
+    # -- HTTP -----------------------------------------------------------------
+
+    async def dispatch(self, method, target, body):
+        """(status, payload, extra headers) for one request"""
+        url = urlsplit(target)
+        query = {k: v[0] if len(v) == 1 else v for k, v in parse_qs(url.query).items()}
+        allowed = []
+        for route_method, pattern, handler in self._routes:
+            match = pattern.fullmatch(url.path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            try:
+                with metrics.timed('service_request_seconds', route=pattern.pattern, method=method):
+                    if method == 'GET':
+                        key = (pattern.pattern, url.path, url.query)
+                        status, payload = await self.coalescer.run(key, lambda: handler(match, query, body))
+                    else:
+                        status, payload = await handler(match, query, body)
+                return status, payload, {}
+            except HTTPError as e:
+                return e.status, {'error': str(e)}, e.headers
+            except (ValueError, KeyError, TypeError) as e:
+                return HTTPStatus.BAD_REQUEST, {'error': str(e)}, {}
+            except Exception as e:
+                print(f"❌ {method} {url.path} failed: {e}")
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}, {}
+        if allowed:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'method not allowed'}, {'Allow': ', '.join(allowed)}
+        return HTTPStatus.NOT_FOUND, {'error': 'not found'}, {}
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'body too large'},
+                                        {}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                status, payload, extra = await self.dispatch(method, target, body)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # client went away or sent something that is not HTTP
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, extra, keep_alive):
+        if isinstance(payload, str):
+            data, content_type = payload.encode(), 'text/plain; version=0.0.4'
+        else:
+            data, content_type = json.dumps(payload, default=_json_default).encode(), 'application/json'
+        head = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(data)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{name}: {value}" for name, value in extra.items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    @property
+    def address(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        """Stop accepting connections, let queued operations finish and release clients"""
+        from . import xrpl_client
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(None, self.pool.shutdown)
+        await xrpl_client.close_async_clients()
+
+
+def serve_main(argv):
+    """Entry point for `agrivest serve`: run the HTTP/JSON service until interrupted"""
+    from .cli_handlers import create_escrow_scheduler, create_wallet_pool
+    parser = argparse.ArgumentParser(prog='agrivest serve', description='Serve the platform over HTTP/JSON')
+    parser.add_argument('--host', default=os.environ.get('SERVICE_HOST', DEFAULT_HOST))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('SERVICE_PORT', DEFAULT_PORT)))
+    parser.add_argument('-w', '--workers', type=int, default=int(os.environ.get('SERVICE_WORKERS', DEFAULT_WORKERS)))
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help='queued + running ledger operations before new ones get 503')
+    parser.add_argument('-q', '--quiet', action='store_true', help='hide per-operation output')
+    args = parser.parse_args(argv)
+
+    platform = CrowdfundingPlatform(wallet_pool=create_wallet_pool())
+    platform.escrow_scheduler = create_escrow_scheduler(platform.storage)
+    service = PlatformService(platform, workers=args.workers, max_pending=args.max_pending)
+
+    async def run():
+        await service.start(args.host, args.port)
+        print(f"🌐 Serving on {service.address} ({args.workers} ledger workers, Ctrl+C to stop)")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.stop()
+
+    log = open(os.devnull, 'w') if args.quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(log):
+            asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    if platform.escrow_scheduler is not None:
+        platform.escrow_scheduler.stop()
+    wallet_cache = sys.modules.get(__package__ + '.wallet_cache')
+    if wallet_cache is not None:
+        wallet_cache.wipe()
+    platform.storage.close()
+    print("👋 Service stopped")
+    return 0
@@ -0,0 +1,1254 @@
+import json
+import os
+import threading
+import time
+import atexit
+import contextlib
+import copy
+import heapq
+import sqlite3
+import sys
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one process per store
+    fcntl = None
+
+from . import binary_snapshot, metrics, records
+
+TABLES = ('campaigns', 'investments', 'microloans')
+
+
+def empty_data():
+    """Return a fresh, empty data set"""
+    data = {table: [] for table in TABLES}
+    for table in TABLES:
+        data[counter_key(table)] = 1
+    return data
+
+
+def counter_key(table):
+    """Name of the id counter for a table, e.g. 'next_campaign_id'"""
+    return f"next_{table[:-1]}_id"
+
+
+# Fields with a maintained value -> ids index, usable as scan() filters
+INDEXED_FIELDS = {
+    'campaigns': ('status', 'farmer_address', 'farmer_name'),
+    'investments': ('campaign_id', 'investor_address'),
+    'microloans': ('status', 'farmer_address', 'investor_address'),
+}
+
+# Running totals kept per group value on every write, so sums never rescan the
+# table: table -> {group field: (summed field, breakdown field)}
+TOTALS = {
+    'investments': {
+        'campaign_id': ('amount', 'investor_address'),
+        'investor_address': ('amount', 'campaign_id'),
+    },
+}
+TOTALS_FIELDS = {
+    table: {f for field, spec in TOTALS.get(table, {}).items() for f in (field,) + spec} for table in TABLES
+}
+
+# Records are inserted in creation order, so id order is created_at order
+ID_ORDERS = ('id', 'created_at')
+SCAN_CHUNK = 64
+
+
+def _sort_key(value):
+    """Orderable key that puts missing values last"""
+    return (1, 0) if value is None else (0, value)
+
+
+def cursor_for(record, order_by='created_at'):
+    """Opaque position just after `record` in a scan ordered by `order_by`"""
+    return [record.get(order_by), record['id']]
+
+
+def _total_view(count, total, by, breakdown):
+    """Public shape of a running total; `by` maps breakdown value -> (count, total)"""
+    view = {'count': count, 'total': total, 'distinct': len(by)}
+    if breakdown:
+        view['by'] = {part: part_total for part, (_, part_total) in by.items()}
+    return view
+
+
+def _add_total(groups, value, amount, part_value, sign=1):
+    """Add (or with sign=-1 remove) one record's amount to its group and breakdown part"""
+    group = groups.setdefault(value, [0, 0, {}])
+    amount = sign * (amount or 0)
+    group[0] += sign
+    group[1] += amount
+    part = group[2].setdefault(part_value, [0, 0])
+    part[0] += sign
+    part[1] += amount
+    if part[0] <= 0:
+        del group[2][part_value]
+    if group[0] <= 0:
+        del groups[value]
+
+
+def _in_range(record, since, until):
+    created = record.get('created_at') or ''
+    return (since is None or created >= since) and (until is None or created < until)
+
+
+def select_records(records, where=None, since=None, until=None, order_by='created_at',
+                   descending=False, cursor=None):
+    """The subset of `records` that scan() would yield, in the same order and after `cursor`"""
+    if order_by in ID_ORDERS:
+        key = lambda record: record['id']
+        position = cursor[1] if cursor else None
+    else:
+        key = lambda record: (_sort_key(record.get(order_by)), record['id'])
+        position = (_sort_key(cursor[0]), cursor[1]) if cursor else None
+    matching = [
+        record for record in records
+        if all(record.get(f) == v for f, v in (where or {}).items()) and _in_range(record, since, until)
+        and (position is None or (key(record) < position if descending else key(record) > position))
+    ]
+    return sorted(matching, key=key, reverse=descending)
+
+
+class VersionConflict(Exception):
+    """update() was given an expected_version the stored record no longer has"""
+
+    def __init__(self, table, record_id, expected, actual):
+        super().__init__(f"{table} #{record_id} is at version {actual}, expected {expected}")
+        self.table = table
+        self.record_id = record_id
+        self.expected = expected
+        self.actual = actual
+
+
+def _check_version(table, record, expected_version):
+    """Next version for `record`; raises VersionConflict if it moved past expected_version"""
+    version = record.get('version', 0)
+    if expected_version is not None and version != expected_version:
+        raise VersionConflict(table, record['id'], expected_version, version)
+    return version + 1
+
+
+def _file_identity(path):
+    """Changes whenever the file is replaced or rewritten; None if missing"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class ProcessLock:
+    """Reader/writer flock on `<store>.lock`, shared by every process using the store.
+
+    Re-entrant within a process. Callers hold their own thread lock around
+    it, so the depth bookkeeping needs no locking of its own.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'a')
+        self._depth = 0
+        self.exclusive = False
+
+    @contextlib.contextmanager
+    def hold(self, exclusive):
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.exclusive = exclusive
+        elif exclusive and not self.exclusive:
+            raise RuntimeError("Cannot upgrade a shared storage lock")
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0 and fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def close(self):
+        self._file.close()
+
+
+class MemoryStorage:
+    """In-memory tables with an id index; subclasses decide how to persist.
+
+    File-backed subclasses may be shared by several processes: writes run
+    under an exclusive ProcessLock after catching up with what other
+    processes wrote, and reads catch up first when the files changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._process_lock = None
+        self._reset(empty_data())
+
+    def _reset(self, data):
+        for table in TABLES:
+            data.setdefault(table, [])
+            data.setdefault(counter_key(table), 1)
+        for table in TABLES:
+            data[table] = [records.from_dict(table, r) for r in data[table]]
+            data[table].sort(key=lambda r: r['id'])
+        self.data = data
+        self._by_id = {table: {r['id']: r for r in data[table]} for table in TABLES}
+        self._ids = {table: [r['id'] for r in data[table]] for table in TABLES}
+        self._indexes = {table: {field: {} for field in INDEXED_FIELDS[table]} for table in TABLES}
+        self._sorted = {table: {} for table in TABLES}
+        self._totals = {table: {field: {} for field in TOTALS.get(table, {})} for table in TABLES}
+        for table in TABLES:
+            for record in data[table]:
+                self._index_add(table, record)
+                self._totals_add(table, record)
+
+    # -- indexes ----------------------------------------------------------
+
+    def _index_add(self, table, record, fields=None):
+        for field in fields or INDEXED_FIELDS[table]:
+            if field not in self._indexes[table]:
+                continue
+            ids = self._indexes[table][field].setdefault(record.get(field), [])
+            if ids and ids[-1] > record['id']:
+                insort(ids, record['id'])
+            else:
+                ids.append(record['id'])
+        for field, entries in self._sorted[table].items():
+            if fields is None or field in fields:
+                insort(entries, (_sort_key(record.get(field)), record['id']))
+
+    def _index_remove(self, table, record, fields=None):
+        for field in fields or INDEXED_FIELDS[table]:
+            if field not in self._indexes[table]:
+                continue
+            ids = self._indexes[table][field].get(record.get(field))
+            if ids:
+                pos = bisect_left(ids, record['id'])
+                if pos < len(ids) and ids[pos] == record['id']:
+                    del ids[pos]
+                if not ids:
+                    del self._indexes[table][field][record.get(field)]
+        for field, entries in self._sorted[table].items():
+            if fields is None or field in fields:
+                entry = (_sort_key(record.get(field)), record['id'])
+                pos = bisect_left(entries, entry)
+                if pos < len(entries) and entries[pos] == entry:
+                    del entries[pos]
+
+    def _totals_add(self, table, record, sign=1):
+        """Add (or with sign=-1 remove) a record's contribution to the running totals"""
+        for field, (summed, breakdown) in TOTALS.get(table, {}).items():
+            _add_total(self._totals[table][field], record.get(field), record.get(summed),
+                       record.get(breakdown), sign)
+
+    def _sorted_index(self, table, field):
+        """(key, id) entries ordered by `field`; built on first use, then maintained"""
+        entries = self._sorted[table].get(field)
+        if entries is None:
+            entries = sorted((_sort_key(r.get(field)), r['id']) for r in self.data[table])
+            self._sorted[table][field] = entries
+        return entries
+
+    # -- operations -------------------------------------------------------
+
+    def _apply(self, op):
+        """Apply one operation to memory. Operations are idempotent so a log can be replayed safely."""
+        kind = op['op']
+        if kind == 'replace':
+            self._reset(copy.deepcopy(op['data']))
+            return None
+        if kind == 'batch':
+            return [self._apply(inner) for inner in op['ops']]
+        table = op['table']
+        if kind == 'insert':
+            record = records.from_dict(table, op['record'])
+            existing = self._by_id[table].get(record['id'])
+            if existing is not None:
+                self._index_remove(table, existing)
+                self._totals_add(table, existing, -1)
+                existing.clear()
+                existing.update(record)
+                record = existing
+            else:
+                ids = self._ids[table]
+                if ids and ids[-1] > record['id']:
+                    pos = bisect_left(ids, record['id'])
+                    ids.insert(pos, record['id'])
+                    self.data[table].insert(pos, record)
+                else:
+                    ids.append(record['id'])
+                    self.data[table].append(record)
+                self._by_id[table][record['id']] = record
+            self._index_add(table, record)
+            self._totals_add(table, record)
+            key = counter_key(table)
+            self.data[key] = max(self.data[key], record['id'] + 1)
+            return record
+        if kind == 'update':
+            record = self._by_id[table].get(op['id'])
+            if record is not None:
+                changed = [f for f, v in op['changes'].items() if record.get(f) != v]
+                indexed = [f for f in changed if f in INDEXED_FIELDS[table] or f in self._sorted[table]]
+                totalled = any(f in TOTALS_FIELDS[table] for f in changed)
+                if indexed:
+                    self._index_remove(table, record, indexed)
+                if totalled:
+                    self._totals_add(table, record, -1)
+                record.update(op['changes'])
+                if indexed:
+                    self._index_add(table, record, indexed)
+                if totalled:
+                    self._totals_add(table, record)
+            return record
+        raise ValueError(f"Unknown storage operation: {kind}")
+
+    def _commit(self, op):
+        """Persist an operation that has already been applied to memory"""
+        raise NotImplementedError
+
+    def _execute(self, op):
+        with self._lock:
+            result = self._apply(op)
+            self._commit(op)
+            return result
+
+    # -- other processes ----------------------------------------------------
+
+    def _changed(self):
+        """Whether another process may have written since we last caught up"""
+        return False
+
+    def _catch_up(self):
+        """Bring memory up to date with the files; called under the process lock"""
+
+    @contextlib.contextmanager
+    def _writing(self):
+        with self._lock:
+            if self._process_lock is None:
+                yield
+                return
+            with self._process_lock.hold(exclusive=True):
+                self._catch_up()
+                yield
+
+    @contextlib.contextmanager
+    def _reading(self):
+        with self._lock:
+            if self._process_lock is not None and self._changed():
+                with self._process_lock.hold(exclusive=False):
+                    self._catch_up()
+            yield
+
+    # -- public API -------------------------------------------------------
+
+    @metrics.storage_timed('load')
+    def load(self):
+        """Return the whole data set (treat as read-only)"""
+        with self._reading():
+            return self.data
+
+    @metrics.storage_timed('replace')
+    def replace(self, data):
+        """Overwrite the whole data set"""
+        with self._writing():
+            self._execute({'op': 'replace', 'data': data})
+
+    @metrics.storage_timed('clear')
+    def clear(self):
+        """Delete every record and reset the id counters"""
+        self.replace(empty_data())
+
+    def get(self, table, record_id):
+        """Find a record by id, or None"""
+        with self._reading():
+            return self._by_id[table].get(record_id)
+
+    @metrics.storage_timed('insert')
+    def insert(self, table, record):
+        """Insert a record, assigning the next id and version 1, and return it"""
+        with self._writing():
+            record = {'id': self.data[counter_key(table)], **record, 'version': 1}
+            return self._execute({'op': 'insert', 'table': table, 'record': record})
+
+    @metrics.storage_timed('insert_many')
+    def insert_many(self, table, rows):
+        """Insert several records in one transaction and return them"""
+        with self._writing():
+            next_id = self.data[counter_key(table)]
+            ops = [
+                {'op': 'insert', 'table': table, 'record': {'id': next_id + i, **record, 'version': 1}}
+                for i, record in enumerate(rows)
+            ]
+            return self._execute({'op': 'batch', 'ops': ops})
+
+    @metrics.storage_timed('update')
+    def update(self, table, record_id, changes, expected_version=None):
+        """Update fields of a record, bumping its version, and return it.
+
+        With `expected_version`, the update only applies if the record is
+        still at that version (compare-and-swap); otherwise VersionConflict.
+        """
+        with self._writing():
+            record = self._by_id[table].get(record_id)
+            if record is None:
+                return None
+            changes = dict(changes, version=_check_version(table, record, expected_version))
+            return self._execute({'op': 'update', 'table': table, 'id': record_id, 'changes': changes})
+
+    def totals(self, table, field, value, breakdown=False):
+        """Running count, sum and distinct breakdown values of the records whose `field` is `value` (see TOTALS).
+
+        With `breakdown`, 'by' maps each breakdown value to its own sum.
+        """
+        with self._reading():
+            count, total, by = self._totals[table][field].get(value, (0, 0, {}))
+            return _total_view(count, total, by, breakdown)
+
+    def rebuild_totals(self):
+        """Recompute the running totals from the records"""
+        with self._reading():
+            self._totals = {table: {field: {} for field in TOTALS.get(table, {})} for table in TABLES}
+            for table in TOTALS:
+                for record in self.data[table]:
+                    self._totals_add(table, record)
+
+    @metrics.storage_timed('query')
+    def query(self, table, where=None, order_by=None, descending=False):
+        """Return records matching all `where` fields, optionally sorted"""
+        with self._reading():
+            rows = self.data[table]
+            if where:
+                rows = [r for r in rows if all(r.get(k) == v for k, v in where.items())]
+            else:
+                rows = list(rows)
+        if order_by:
+            rows.sort(key=lambda r: r[order_by], reverse=descending)
+        return rows
+
+    def scan(self, table, where=None, since=None, until=None, order_by='created_at',
+             descending=False, cursor=None):
+        """Yield records matching `where` and a created_at range, in order, after `cursor`.
+
+        Uses the smallest matching value index (see INDEXED_FIELDS) or the
+        sorted index for `order_by`, and walks it in chunks from the cursor,
+        so reading a page costs about O(page size) rather than a full sort.
+        Get the cursor for the next page with cursor_for(last_record, order_by).
+        """
+        where = dict(where or {})
+        bounded = since is not None or until is not None
+        with self._reading():
+            if order_by in ID_ORDERS:
+                candidates = [self._ids[table]]
+                for field in list(where):
+                    if field in INDEXED_FIELDS[table]:
+                        candidates.append(self._indexes[table][field].get(where[field], []))
+                keys = min(candidates, key=len)
+                position = cursor[1] if cursor else None
+            else:
+                keys = self._sorted_index(table, order_by)
+                position = (_sort_key(cursor[0]), cursor[1]) if cursor else None
+
+        while True:
+            with self._lock:
+                if position is None:
+                    chunk = keys[-SCAN_CHUNK:][::-1] if descending else keys[:SCAN_CHUNK]
+                elif descending:
+                    end = bisect_left(keys, position)
+                    chunk = keys[max(0, end - SCAN_CHUNK):end][::-1]
+                else:
+                    start = bisect_right(keys, position)
+                    chunk = keys[start:start + SCAN_CHUNK]
+                rows = [self._by_id[table].get(k if order_by in ID_ORDERS else k[1]) for k in chunk]
+            if not chunk:
+                return
+            position = chunk[-1]
+            for record in rows:
+                if record is None or (where and not all(record.get(f) == v for f, v in where.items())):
+                    continue
+                if bounded and not _in_range(record, since, until):
+                    if order_by == 'created_at' and ((descending and since and record['created_at'] < since)
+                                                     or (not descending and until and record['created_at'] >= until)):
+                        return
+                    continue
+                yield record
+
+    def flush(self):
+        """Make all committed operations durable"""
+
+    def close(self):
+        self.flush()
+
+
+class JsonStorage(MemoryStorage):
+    """Rewrites the whole JSON file on every change (the original behaviour).
+
+    Each rewrite goes to a temp file that replaces the store atomically, so
+    a crash never leaves a truncated file behind.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._process_lock = ProcessLock(path + '.lock')
+        with self._lock, self._process_lock.hold(exclusive=True):
+            self.created = not os.path.exists(path)
+            if self.created:
+                self._write_file()
+            else:
+                self._read_file()
+
+    def _read_file(self):
+        with open(self.path, 'r') as f:
+            self._reset(json.load(f))
+        self._identity = _file_identity(self.path)
+
+    def _write_file(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2, default=records.json_default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._identity = _file_identity(self.path)
+
+    def _changed(self):
+        return _file_identity(self.path) != self._identity
+
+    def _catch_up(self):
+        if self._changed():
+            self._read_file()
+
+    def _commit(self, op):
+        self._write_file()
+
+    def close(self):
+        with self._lock:
+            super().close()
+            self._process_lock.close()
+            self._process_lock = None
+
+
+class JournalStorage(MemoryStorage):
+    """Append-only operation log on top of a JSON snapshot.
+
+    Each change appends one JSON line to `<path>.log`, so a write costs
+    O(record). Log writes are fsynced in groups: once `sync_every` operations
+    are pending, or `sync_interval` seconds after the first unsynced one.
+    After `compact_every` operations the snapshot is rewritten and the log
+    truncated. Opening replays the snapshot plus the log tail.
+
+    Several processes can share one store: each append happens under the
+    exclusive process lock right after replaying whatever the others
+    appended, so ids stay unique and no update is lost.
+    """
+
+    def __init__(self, path, sync_every=64, sync_interval=0.05, compact_every=10000):
+        super().__init__()
+        self.path = path
+        self.log_path = path + '.log'
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self._snapshot_identity = None
+        self._log_offset = 0
+        self._ops_since_snapshot = 0
+
+        self._process_lock = ProcessLock(path + '.lock')
+        with self._lock, self._process_lock.hold(exclusive=True):
+            self.created = not os.path.exists(path)
+            if self.created:
+                self._write_snapshot()
+            self._catch_up()
+            self._log = open(self.log_path, 'a')
+
+        self._pending = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _log_size(self):
+        try:
+            return os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+
+    def _changed(self):
+        return (self._log_size() != self._log_offset
+                or _file_identity(self.path) != self._snapshot_identity)
+
+    def _catch_up(self):
+        identity = _file_identity(self.path)
+        if identity != self._snapshot_identity:
+            # Another process compacted: start over from its snapshot
+            self._read_snapshot()
+            self._snapshot_identity = identity
+            self._log_offset = 0
+            self._ops_since_snapshot = 0
+        elif self._log_size() < self._log_offset:
+            self._snapshot_identity = None
+            return self._catch_up()
+        self._replay()
+
+    def _replay(self):
+        """Apply the log from the last position read; returns the number of operations replayed"""
+        if not os.path.exists(self.log_path):
+            return 0
+        count = 0
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(op)
+                count += 1
+                self._log_offset += len(line)
+        self._ops_since_snapshot += count
+        if self._process_lock.exclusive and self._log_offset != self._log_size():
+            # Drop a torn write left at the tail by a crash; live writers
+            # hold the exclusive lock, so the tail cannot be in progress
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(self._log_offset)
+        return count
+
+    def _read_snapshot(self):
+        with open(self.path, 'r') as f:
+            self._reset(json.load(f))
+
+    def _write_snapshot(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2, default=records.json_default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._snapshot_identity = _file_identity(self.path)
+
+    def _commit(self, op):
+        if op['op'] == 'replace':
+            self.compact()
+            return
+        line = json.dumps(op, separators=(',', ':'), default=records.json_default) + '\n'
+        self._log.write(line)
+        # Other processes replay from the file, so hand the line to the OS
+        # before the process lock is released; fsync stays grouped
+        self._log.flush()
+        self._log_offset += len(line.encode())
+        self._pending += 1
+        self._ops_since_snapshot += 1
+        if self._ops_since_snapshot >= self.compact_every:
+            self.compact()
+        elif self._pending >= self.sync_every:
+            self._sync()
+        else:
+            self._wake.set()
+
+    def _sync(self):
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._pending = 0
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                return
+            time.sleep(self.sync_interval)
+            self.flush()
+
+    @metrics.storage_timed('flush')
+    def flush(self):
+        with self._lock:
+            if self._pending and not self._log.closed:
+                self._sync()
+
+    @metrics.storage_timed('compact')
+    def compact(self):
+        """Write a fresh snapshot and truncate the log"""
+        with self._writing():
+            self._write_snapshot()
+            self._log.close()
+            open(self.log_path, 'w').close()
+            # Append mode, so lines other processes add after this land after ours
+            self._log = open(self.log_path, 'a')
+            self._log_offset = 0
+            self._pending = 0
+            self._ops_since_snapshot = 0
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+            self._log.close()
+            self._process_lock.close()
+            self._process_lock = None
+        self._wake.set()
+
+
+def _walk(keys, position, descending):
+    """Keys of an ascending sequence past `position`, in scan direction"""
+    if descending:
+        end = len(keys) if position is None else bisect_left(keys, position)
+        return (keys[i] for i in range(end - 1, -1, -1))
+    start = 0 if position is None else bisect_right(keys, position)
+    return (keys[i] for i in range(start, len(keys)))
+
+
+class _BinaryTable:
+    """Id -> record lookups for one table of a BinaryStorage"""
+
+    def __init__(self, storage, table):
+        self._storage = storage
+        self._table = table
+
+    def get(self, record_id, default=None):
+        storage = self._storage
+        record = storage._dirty[self._table].get(record_id)
+        if record is None and storage._snapshot is not None:
+            record = storage._snapshot.get(self._table, record_id)
+        return default if record is None else record
+
+
+class BinaryStorage(JournalStorage):
+    """Operation log on top of a memory-mapped binary snapshot (see binary_snapshot).
+
+    Opening maps the snapshot and replays the log tail; nothing else is
+    read until it is asked for. Records from the snapshot are decoded on each
+    access, and records changed since the snapshot stay in memory until
+    compaction writes them into a new one. Id-ordered scans merge the
+    snapshot's id index (or the posting list of an indexed `where` field)
+    with the changed ids. Running totals are precomputed in the snapshot;
+    memory holds only the difference the changed records make.
+    """
+
+    def _reset(self, data):
+        self._snapshot = None
+        self.data = {counter_key(table): data.get(counter_key(table), 1) for table in TABLES}
+        self._dirty = {table: {} for table in TABLES}
+        for table in TABLES:
+            for row in data.get(table, ()):
+                record = records.from_dict(table, row)
+                self._dirty[table][record['id']] = record
+        self._dirty_ids = {table: sorted(self._dirty[table]) for table in TABLES}
+        self._by_id = {table: _BinaryTable(self, table) for table in TABLES}
+        self._recount()
+
+    def _read_snapshot(self):
+        snapshot = binary_snapshot.Snapshot(self.path)
+        self._reset(snapshot.counters)
+        self._snapshot = snapshot
+
+    def _write_snapshot(self):
+        data = dict(self.data)
+        for table in TABLES:
+            data[table] = list(self._records(table))
+        tmp_path = self.path + '.tmp'
+        binary_snapshot.write(tmp_path, data, INDEXED_FIELDS, TOTALS)
+        os.replace(tmp_path, self.path)
+        self._snapshot_identity = _file_identity(self.path)
+        self._read_snapshot()
+
+    def _records(self, table):
+        """Every record of `table` in id order"""
+        for record_id in self._merged(table, self._snapshot.ids(table) if self._snapshot else (), None, False):
+            yield self._by_id[table].get(record_id)
+
+    def _merged(self, table, keys, position, descending):
+        """Snapshot `keys` merged with the changed ids, each id once"""
+        changed = list(self._dirty_ids[table])
+        previous = None
+        for record_id in heapq.merge(_walk(keys, position, descending), _walk(changed, position, descending),
+                                     reverse=descending):
+            if record_id != previous:
+                previous = record_id
+                yield record_id
+
+    def _keep(self, table, record):
+        """Hold a record that now differs from the snapshot"""
+        dirty = self._dirty[table]
+        if record['id'] not in dirty:
+            ids = self._dirty_ids[table]
+            if ids and ids[-1] > record['id']:
+                insort(ids, record['id'])
+            else:
+                ids.append(record['id'])
+        dirty[record['id']] = record
+
+    def _apply(self, op):
+        kind = op['op']
+        if kind == 'replace':
+            self._reset(op['data'])
+            return None
+        if kind == 'batch':
+            return [self._apply(inner) for inner in op['ops']]
+        table = op['table']
+        if kind == 'insert':
+            record = records.from_dict(table, op['record'])
+            existing = self._by_id[table].get(record['id']) if table in TOTALS else None
+            if existing is not None:
+                self._totals_add(table, existing, -1)
+            self._totals_add(table, record)
+            self._keep(table, record)
+            key = counter_key(table)
+            self.data[key] = max(self.data[key], record['id'] + 1)
+            return record
+        if kind == 'update':
+            record = self._by_id[table].get(op['id'])
+            if record is not None:
+                totalled = any(f in TOTALS_FIELDS[table] and record.get(f) != v for f, v in op['changes'].items())
+                if totalled:
+                    self._totals_add(table, record, -1)
+                record.update(op['changes'])
+                if totalled:
+                    self._totals_add(table, record)
+                self._keep(table, record)
+            return record
+        raise ValueError(f"Unknown storage operation: {kind}")
+
+    def _totals_add(self, table, record, sign=1):
+        """Add (or with sign=-1 remove) a record's contribution to the totals delta against the snapshot"""
+        for field, (summed, breakdown) in TOTALS.get(table, {}).items():
+            group = self._totals[table][field].setdefault(record.get(field), [0, 0, {}])
+            amount = sign * (record.get(summed) or 0)
+            group[0] += sign
+            group[1] += amount
+            part = group[2].setdefault(record.get(breakdown), [0, 0])
+            part[0] += sign
+            part[1] += amount
+
+    def _recount(self):
+        """Rebuild the totals delta from the records changed since the snapshot"""
+        self._totals = {table: {field: {} for field in TOTALS.get(table, {})} for table in TABLES}
+        for table in TOTALS:
+            for record_id, record in self._dirty[table].items():
+                old = self._snapshot.get(table, record_id) if self._snapshot is not None else None
+                if old is not None:
+                    self._totals_add(table, old, -1)
+                self._totals_add(table, record)
+
+    @metrics.storage_timed('load')
+    def load(self):
+        """Return the whole data set, decoding every record"""
+        with self._reading():
+            data = dict(self.data)
+            for table in TABLES:
+                data[table] = list(self._records(table))
+            return data
+
+    def totals(self, table, field, value, breakdown=False):
+        with self._reading():
+            base = self._snapshot.totals(table, field, value) if self._snapshot is not None else (0, 0, {})
+            if base is None:
+                return self._scanned_total(table, field, value, breakdown)
+            count, total, by = base
+            delta = self._totals[table][field].get(value)
+            if delta is not None:
+                count += delta[0]
+                total += delta[1]
+                for part, (part_count, part_total) in delta[2].items():
+                    entry = by.setdefault(part, [0, 0])
+                    entry[0] += part_count
+                    entry[1] += part_total
+                by = {part: entry for part, entry in by.items() if entry[0] > 0}
+            return _total_view(count, total, by, breakdown)
+
+    def _scanned_total(self, table, field, value, breakdown):
+        """totals() for a snapshot without a totals section for `field` (values that do not fit int64)"""
+        groups = {}
+        summed, part_field = TOTALS[table][field]
+        for record in self.scan(table, {field: value}, order_by='id'):
+            _add_total(groups, value, record.get(summed), record.get(part_field))
+        count, total, by = groups.get(value, (0, 0, {}))
+        return _total_view(count, total, by, breakdown)
+
+    def rebuild_totals(self):
+        with self._reading():
+            self._recount()
+
+    @metrics.storage_timed('query')
+    def query(self, table, where=None, order_by=None, descending=False):
+        rows = list(self.scan(table, where, order_by='id'))
+        if order_by:
+            rows.sort(key=lambda r: r[order_by], reverse=descending)
+        return rows
+
+    def scan(self, table, where=None, since=None, until=None, order_by='created_at',
+             descending=False, cursor=None):
+        where = dict(where or {})
+        if order_by not in ID_ORDERS:
+            yield from self._scan_sorted(table, where, since, until, order_by, descending, cursor)
+            return
+        bounded = since is not None or until is not None
+        with self._reading():
+            keys = self._snapshot.ids(table) if self._snapshot else ()
+            for field, value in where.items():
+                if self._snapshot and field in INDEXED_FIELDS[table]:
+                    matching = self._snapshot.ids_where(table, field, value)
+                    if matching is not None and len(matching) < len(keys):
+                        keys = matching
+            merged = self._merged(table, keys, cursor[1] if cursor else None, descending)
+        while True:
+            with self._lock:
+                record_id = next(merged, None)
+                record = None if record_id is None else self._by_id[table].get(record_id)
+            if record_id is None:
+                return
+            if record is None or (where and not all(record.get(f) == v for f, v in where.items())):
+                continue
+            if bounded and not _in_range(record, since, until):
+                if order_by == 'created_at' and ((descending and since and record['created_at'] < since)
+                                                 or (not descending and until and record['created_at'] >= until)):
+                    return
+                continue
+            yield record
+
+    def _scan_sorted(self, table, where, since, until, order_by, descending, cursor):
+        """scan() on a field other than id: sorts the matching records"""
+        entries = sorted(((_sort_key(r.get(order_by)), r['id']), r) for r in self.query(table, where))
+        if descending:
+            entries.reverse()
+        position = (_sort_key(cursor[0]), cursor[1]) if cursor else None
+        for key, record in entries:
+            if position is not None and (key >= position if descending else key <= position):
+                continue
+            if _in_range(record, since, until):
+                yield record
+
+    def close(self):
+        super().close()
+        self._snapshot = None
+
+
+# Columns pulled out of each record so they can be indexed; the full record
+# is kept as JSON in the `data` column.
+SQLITE_COLUMNS = {
+    'campaigns': ('status', 'farmer_address', 'created_at'),
+    'investments': ('campaign_id', 'investor_address', 'created_at'),
+    'microloans': ('status', 'farmer_address', 'investor_address', 'created_at'),
+}
+
+
+class SqliteStorage:
+    """SQLite-backed storage (WAL mode) with indexes on the lookup columns.
+
+    SQLite does its own cross-process locking; writes take the database
+    write lock with BEGIN IMMEDIATE, and readers never block writers.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.created = not os.path.exists(path)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            new_totals = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'totals'").fetchone() is None
+            # One row per (group value, breakdown value) plus a group row with part = ''
+            # holding the group's count, sum and number of breakdown values; values are JSON
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS totals (tbl TEXT, field TEXT, value TEXT, part TEXT, "
+                "count INTEGER NOT NULL, total NUMERIC NOT NULL, parts INTEGER NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (tbl, field, value, part))"
+            )
+            for table, columns in SQLITE_COLUMNS.items():
+                column_defs = ''.join(f", {c}" for c in columns)
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY{column_defs}, data TEXT NOT NULL)"
+                )
+                for column in columns:
+                    self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+                    if column != 'created_at':
+                        # Lets filtered listings read pages straight off the index
+                        self.conn.execute(
+                            f"CREATE INDEX IF NOT EXISTS {table}_{column}_created ON {table} ({column}, created_at, id)"
+                        )
+                self.conn.execute("INSERT OR IGNORE INTO meta VALUES (?, 1)", (counter_key(table),))
+        if new_totals and not self.created:
+            self.rebuild_totals()
+
+    def _column(self, table, field):
+        """SQL expression for a record field"""
+        if field == 'id' or field in SQLITE_COLUMNS[table]:
+            return field
+        if not field.replace('_', '').isalnum():
+            raise ValueError(f"Invalid field name: {field}")
+        return f"json_extract(data, '$.{field}')"
+
+    def _add_total(self, table, record, sign=1):
+        for field, (summed, breakdown) in TOTALS.get(table, {}).items():
+            value = json.dumps(record.get(field))
+            part = json.dumps(record.get(breakdown))
+            amount = sign * (record.get(summed) or 0)
+            if isinstance(amount, Decimal):
+                amount = float(amount)
+            part_count = self.conn.execute(
+                "INSERT INTO totals (tbl, field, value, part, count, total) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET count = count + excluded.count, total = total + excluded.total "
+                "RETURNING count", (table, field, value, part, sign, amount)).fetchone()[0]
+            parts = 0
+            if part_count <= 0:
+                self.conn.execute("DELETE FROM totals WHERE tbl = ? AND field = ? AND value = ? AND part = ?",
+                                  (table, field, value, part))
+                parts = -1
+            elif part_count == 1 and sign > 0:
+                parts = 1
+            group_count = self.conn.execute(
+                "INSERT INTO totals (tbl, field, value, part, count, total, parts) VALUES (?, ?, ?, '', ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET count = count + excluded.count, total = total + excluded.total, "
+                "parts = parts + excluded.parts RETURNING count",
+                (table, field, value, sign, amount, parts)).fetchone()[0]
+            if group_count <= 0:
+                self.conn.execute("DELETE FROM totals WHERE tbl = ? AND field = ? AND value = ?",
+                                  (table, field, value))
+
+    def _write(self, table, record, old=None):
+        if table in TOTALS:
+            if old is not None:
+                self._add_total(table, old, -1)
+            self._add_total(table, record)
+        columns = ('id',) + SQLITE_COLUMNS[table] + ('data',)
+        values = [record['id']] + [record.get(c) for c in SQLITE_COLUMNS[table]]
+        values.append(json.dumps(record, default=records.json_default))
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            values
+        )
+
+    @metrics.storage_timed('load')
+    def load(self):
+        """Return the whole data set"""
+        with self._lock:
+            data = {table: self.query(table, order_by='id') for table in TABLES}
+            for key, value in self.conn.execute("SELECT key, value FROM meta"):
+                data[key] = value
+            return data
+
+    @metrics.storage_timed('replace')
+    def replace(self, data):
+        """Overwrite the whole data set"""
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("DELETE FROM totals")
+            for table in TABLES:
+                self.conn.execute(f"DELETE FROM {table}")
+                for record in data.get(table, []):
+                    self._write(table, record)
+                next_id = data.get(counter_key(table), 1)
+                self.conn.execute("UPDATE meta SET value = ? WHERE key = ?", (next_id, counter_key(table)))
+
+    @metrics.storage_timed('clear')
+    def clear(self):
+        """Delete every record and reset the id counters"""
+        self.replace(empty_data())
+
+    def get(self, table, record_id):
+        """Find a record by id, or None"""
+        with self._lock:
+            row = self.conn.execute(f"SELECT data FROM {table} WHERE id = ?", (record_id,)).fetchone()
+        return records.from_dict(table, json.loads(row[0])) if row else None
+
+    @metrics.storage_timed('insert')
+    def insert(self, table, record):
+        """Insert a record, assigning the next id, and return it"""
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            key = counter_key(table)
+            next_id = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+            record = {'id': next_id, **record, 'version': 1}
+            self._write(table, record)
+            self.conn.execute("UPDATE meta SET value = ? WHERE key = ?", (next_id + 1, key))
+        return records.from_dict(table, record)
+
+    @metrics.storage_timed('insert_many')
+    def insert_many(self, table, rows):
+        """Insert several records in one transaction and return them"""
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            key = counter_key(table)
+            next_id = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+            rows = [{'id': next_id + i, **row, 'version': 1} for i, row in enumerate(rows)]
+            for row in rows:
+                self._write(table, row)
+            self.conn.execute("UPDATE meta SET value = ? WHERE key = ?", (next_id + len(rows), key))
+        return [records.from_dict(table, row) for row in rows]
+
+    @metrics.storage_timed('update')
+    def update(self, table, record_id, changes, expected_version=None):
+        """Update fields of a record, bumping its version, and return it (see MemoryStorage.update)"""
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            old = self.get(table, record_id)
+            if old is None:
+                return None
+            version = _check_version(table, old, expected_version)
+            record = dict(old)
+            record.update(changes)
+            record['version'] = version
+            self._write(table, record, old)
+        return records.from_dict(table, record)
+
+    def totals(self, table, field, value, breakdown=False):
+        """Running totals of the records whose `field` is `value` (see MemoryStorage.totals)"""
+        with self._lock:
+            group = self.conn.execute(
+                "SELECT count, total, parts FROM totals WHERE tbl = ? AND field = ? AND value = ? AND part = ''",
+                (table, field, json.dumps(value))).fetchone()
+            count, total, parts = group or (0, 0, 0)
+            view = {'count': count, 'total': total, 'distinct': parts}
+            if breakdown:
+                rows = self.conn.execute(
+                    "SELECT part, total FROM totals WHERE tbl = ? AND field = ? AND value = ? AND part != ''",
+                    (table, field, json.dumps(value))).fetchall()
+                view['by'] = {json.loads(part): part_total for part, part_total in rows}
+        return view
+
+    def rebuild_totals(self):
+        """Recompute the running totals from the records"""
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute("DELETE FROM totals")
+            for table in TOTALS:
+                for (data,) in self.conn.execute(f"SELECT data FROM {table}").fetchall():
+                    self._add_total(table, json.loads(data))
+
+    @metrics.storage_timed('query')
+    def query(self, table, where=None, order_by=None, descending=False):
+        """Return records matching all `where` fields, optionally sorted"""
+        sql = f"SELECT data FROM {table}"
+        params = []
+        if where:
+            clauses = []
+            for field, value in where.items():
+                clauses.append(f"{self._column(table, field)} IS ?")
+                params.append(value)
+            sql += " WHERE " + " AND ".join(clauses)
+        if order_by:
+            sql += f" ORDER BY {self._column(table, order_by)} {'DESC' if descending else 'ASC'}"
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [records.from_dict(table, json.loads(row[0])) for row in rows]
+
+    def scan(self, table, where=None, since=None, until=None, order_by='created_at',
+             descending=False, cursor=None, page_size=200):
+        """Yield records matching `where` and a created_at range, in order, after `cursor`.
+
+        Pages are fetched with keyset pagination on (order_by, id), so each
+        page is an index range read. Get the cursor for the next page with
+        cursor_for(last_record, order_by).
+        """
+        sort = self._column(table, order_by)
+        direction = 'DESC' if descending else 'ASC'
+        compare = '<' if descending else '>'
+        clauses = []
+        params = []
+        for field, value in (where or {}).items():
+            clauses.append(f"{self._column(table, field)} IS ?")
+            params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+
+        while True:
+            page_clauses = list(clauses)
+            page_params = list(params)
+            if cursor is not None:
+                page_clauses.append(f"({sort}, id) {compare} (?, ?)")
+                page_params.extend(cursor)
+            sql = f"SELECT data FROM {table}"
+            if page_clauses:
+                sql += " WHERE " + " AND ".join(page_clauses)
+            sql += f" ORDER BY {sort} {direction}, id {direction} LIMIT ?"
+            with self._lock:
+                rows = self.conn.execute(sql, page_params + [page_size]).fetchall()
+            for row in rows:
+                record = records.from_dict(table, json.loads(row[0]))
+                yield record
+            if len(rows) < page_size:
+                return
+            cursor = cursor_for(record, order_by)
+
+    def flush(self):
+        """Make all committed operations durable"""
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def scan_columns(storage, table, fields, where=None):
+    """Columnar copy (records.Columns) of the matching records, for bulk scans"""
+    return records.Columns(storage.scan(table, where, order_by='id'), fields)
+
+
+def _open_path(path):
+    """Open an existing store, picking the engine from its extension"""
+    if path.endswith('.db'):
+        return SqliteStorage(path)
+    if path.endswith('.snap'):
+        return BinaryStorage(path)
+    return JournalStorage(path) if os.path.exists(path + '.log') else JsonStorage(path)
+
+
+def migrate(source_path, target_path):
+    """One-shot copy between stores; engines follow the extensions (.json, .db, .snap)"""
+    source = _open_path(source_path)
+    data = source.load()
+    target = _open_path(target_path)
+    target.replace(data)
+    counts = {table: len(data[table]) for table in TABLES}
+    source.close()
+    target.close()
+    return counts
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """One-shot copy of a JSON (or journaled JSON) store into SQLite"""
+    return migrate(json_path, db_path)
+
+
+ENGINES = {
+    'json': JsonStorage,
+    'journal': JournalStorage,
+    'sqlite': SqliteStorage,
+    'binary': BinaryStorage,
+}
+# File extension each engine keeps its store under
+EXTENSIONS = {'sqlite': '.db', 'binary': '.snap'}
+
+
+def open_storage(path, engine=None):
+    """Open a storage engine by name; defaults to $STORAGE_ENGINE or 'journal'"""
+    engine = engine or os.environ.get('STORAGE_ENGINE', 'journal')
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown storage engine: {engine}")
+    if engine in EXTENSIONS:
+        path = os.path.splitext(path)[0] + EXTENSIONS[engine]
+    return ENGINES[engine](path)
+
+
+if __name__ == "__main__":
+    # python -m agrivest.storage_engine migrate storage/storage.json storage/storage.db
+    # python -m agrivest.storage_engine migrate storage/storage.json storage/storage.snap
+    if len(sys.argv) != 4 or sys.argv[1] != 'migrate':
+        print("Usage: python -m agrivest.storage_engine migrate <source> <target>  (.json, .db or .snap)")
+        sys.exit(1)
+    counts = migrate(sys.argv[2], sys.argv[3])
+    print(f"✅ Migrated {counts} into {sys.argv[3]}")
@@ -0,0 +1,189 @@
+import threading
+
+import xrpl
+from xrpl.models.requests import Ledger, Tx
+from .xrpl_client import get_client
+from . import read_cache
+from . import metrics
+
+PENDING = 'pending'
+VALIDATED = 'validated'
+FAILED = 'failed'
+EXPIRED = 'expired'
+
+# Ledgers the tracker is willing to scan one by one; further behind it
+# falls back to one Tx lookup per pending hash.
+MAX_LEDGER_SCAN = 20
+
+
+class SubmissionHandle:
+    """A submitted transaction whose final outcome is not known yet"""
+
+    def __init__(self, tx_hash, account, sequence, last_ledger_sequence):
+        self.hash = tx_hash
+        self.account = account
+        self.sequence = sequence
+        self.last_ledger_sequence = last_ledger_sequence
+        self.tx_json = None
+        self.status = PENDING
+        self.result_code = None
+        self.response = None
+        self._done = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def done(self):
+        return self._done.is_set()
+
+    def succeeded(self):
+        return self.status == VALIDATED and self.result_code == 'tesSUCCESS'
+
+    def wait(self, timeout=None):
+        """Block until the outcome is known; returns False on timeout"""
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, callback):
+        """Call `callback(handle)` once resolved (immediately if already resolved)"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _resolve(self, status, result_code=None, response=None):
+        with self._lock:
+            if self._done.is_set():
+                return
+            self.status = status
+            self.result_code = result_code
+            self.response = response
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"❌ Submission callback for {self.hash} failed: {e}")
+
+
+def _record_outcome(handle):
+    tx_type = (handle.tx_json or {}).get('TransactionType', 'unknown')
+    metrics.count('xrpl_tracked_results_total', tx_type=tx_type, result=handle.result_code or handle.status)
+
+
+class SubmissionEngine:
+    """Signs and submits immediately, then confirms outcomes in the background.
+
+    `submit` returns a SubmissionHandle as soon as the node accepts the
+    transaction. A tracker thread walks each newly validated ledger once,
+    resolving every pending hash it contains, and expires handles whose
+    LastLedgerSequence has passed without inclusion.
+    """
+
+    def __init__(self, client=None, poll_interval=1.0):
+        self.client = client
+        self.poll_interval = poll_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._last_checked = None
+        self._thread = threading.Thread(target=self._track_loop, daemon=True)
+        self._thread.start()
+
+    def _client(self):
+        return self.client or get_client()
+
+    def submit(self, tx, wallet):
+        """Autofill, sign and submit `tx`; returns a SubmissionHandle"""
+        client = self._client()
+        signed = xrpl.transaction.autofill_and_sign(tx, client, wallet)
+        handle = SubmissionHandle(signed.get_hash(), wallet.address, signed.sequence,
+                                  signed.last_ledger_sequence)
+        handle.tx_json = signed.to_xrpl()
+        read_cache.invalidate_for(tx)
+        handle.add_done_callback(_record_outcome)
+        try:
+            response = metrics.observe_submission(tx, xrpl.transaction.submit, signed, client)
+        except xrpl.clients.XRPLRequestFailureException as e:
+            handle._resolve(FAILED, None, str(e))
+            return handle
+
+        engine_result = response.result.get('engine_result', '')
+        if engine_result.startswith(('tem', 'tef')):
+            handle._resolve(FAILED, engine_result, response.result)
+            return handle
+        return self._add(handle)
+
+    def track(self, tx_hash, last_ledger_sequence, account=None, sequence=None):
+        """Track a transaction submitted earlier, e.g. after a restart"""
+        return self._add(SubmissionHandle(tx_hash, account, sequence, last_ledger_sequence))
+
+    def _add(self, handle):
+        with self._lock:
+            self._pending[handle.hash] = handle
+        self._wake.set()
+        return handle
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    # -- tracker ------------------------------------------------------------
+
+    def _track_loop(self):
+        while not self._stopped:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stopped:
+                return
+            if not self.pending_count():
+                continue
+            try:
+                self._poll()
+            except Exception as e:
+                print(f"❌ Submission tracker error: {e}")
+
+    def _poll(self):
+        client = self._client()
+        latest = client.request(Ledger(ledger_index="validated")).result['ledger_index']
+        if self._last_checked is None or latest - self._last_checked > MAX_LEDGER_SCAN:
+            self._check_each_hash(client)
+        else:
+            for ledger_index in range(self._last_checked + 1, latest + 1):
+                self._check_ledger(client, ledger_index)
+        self._last_checked = latest
+
+        with self._lock:
+            expired = [h for h in self._pending.values() if h.last_ledger_sequence <= latest]
+            for handle in expired:
+                del self._pending[handle.hash]
+        for handle in expired:
+            handle._resolve(EXPIRED)
+
+    def _check_ledger(self, client, ledger_index):
+        """Resolve every pending hash included in one validated ledger"""
+        response = client.request(Ledger(ledger_index=ledger_index, transactions=True, expand=True))
+        for tx in response.result['ledger'].get('transactions', []):
+            meta = tx.get('meta') or tx.get('metaData') or {}
+            self._resolve_hash(tx.get('hash'), meta.get('TransactionResult'), tx)
+
+    def _check_each_hash(self, client):
+        """Fallback when too many ledgers went by: one Tx lookup per pending hash"""
+        with self._lock:
+            hashes = list(self._pending)
+        for tx_hash in hashes:
+            result = client.request(Tx(transaction=tx_hash)).result
+            if result.get('validated'):
+                self._resolve_hash(tx_hash, result.get('meta', {}).get('TransactionResult'), result)
+
+    def _resolve_hash(self, tx_hash, result_code, response):
+        with self._lock:
+            handle = self._pending.pop(tx_hash, None)
+        if handle is not None:
+            status = VALIDATED if result_code else FAILED
+            handle._resolve(status, result_code, response)
@@ -0,0 +1,242 @@
+import xrpl
+from decimal import Decimal
+from xrpl.models.requests import AccountLines
+from .xrpl_client import get_client, get_async_client
+from .wallet_cache import get_wallet
+from . import read_cache
+from . import metrics
+
+
+#####################
+# create_trust_line #
+#####################
+
+def _trust_line_tx(address, issuer, currency, amount, sequence=None):
+    return xrpl.models.transactions.TrustSet(
+        account=address,
+        limit_amount=xrpl.models.amounts.IssuedCurrencyAmount(
+            currency=currency,
+            issuer=issuer,
+            value=int(amount)
+        ),
+        sequence=sequence
+    )
+
+def create_trust_line(seed, issuer, currency, amount):
+    """create_trust_line"""
+# Get the client
+    receiving_wallet = get_wallet(seed)
+    client = get_client()
+# Define the trust line transaction
+    trustline_tx=_trust_line_tx(receiving_wallet.address, issuer, currency, amount)
+
+    try:
+        response =  metrics.observe_submission(trustline_tx, xrpl.transaction.submit_and_wait, trustline_tx,
+            client, receiving_wallet)
+    finally:
+        read_cache.invalidate_for(trustline_tx)
+    return response.result
+
+async def create_trust_line_async(seed, issuer, currency, amount, sequence=None):
+    """create_trust_line_async"""
+    receiving_wallet = get_wallet(seed)
+    client = get_async_client()
+    trustline_tx = _trust_line_tx(receiving_wallet.address, issuer, currency, amount, sequence)
+    try:
+        response = await metrics.observe_submission_async(trustline_tx, xrpl.asyncio.transaction.submit_and_wait(
+            trustline_tx, client, receiving_wallet))
+    finally:
+        read_cache.invalidate_for(trustline_tx)
+    return response.result
+
+#################
+# send_currency #
+#################
+
+def _send_currency_tx(address, destination, currency, amount, sequence=None):
+    return xrpl.models.transactions.Payment(
+        account=address,
+        amount=xrpl.models.amounts.IssuedCurrencyAmount(
+            currency=currency,
+            value=int(amount),
+            issuer=address
+        ),
+        destination=destination,
+        sequence=sequence
+    )
+
+def send_currency(seed, destination, currency, amount):
+    """send_currency"""
+# Get the client
+    sending_wallet=get_wallet(seed)
+    client=get_client()
+# Define the payment transaction.
+    send_currency_tx=_send_currency_tx(sending_wallet.address, destination, currency, amount)
+    try:
+        response=metrics.observe_submission(send_currency_tx, xrpl.transaction.submit_and_wait, send_currency_tx, client, sending_wallet)
+    finally:
+        read_cache.invalidate_for(send_currency_tx)
+    return response.result
+
+async def send_currency_async(seed, destination, currency, amount, sequence=None):
+    """send_currency_async"""
+    sending_wallet = get_wallet(seed)
+    client = get_async_client()
+    send_currency_tx = _send_currency_tx(sending_wallet.address, destination, currency, amount, sequence)
+    try:
+        response = await metrics.observe_submission_async(
+            send_currency_tx, xrpl.asyncio.transaction.submit_and_wait(send_currency_tx, client, sending_wallet))
+    finally:
+        read_cache.invalidate_for(send_currency_tx)
+    return response.result
+
+###############
+# get_balance #
+###############
+
+def get_balance(sb_account_seed, op_account_seed):
+    """get_balance (cached per validated ledger)"""
+    wallet = get_wallet(sb_account_seed)
+    def fetch(ledger_index):
+        client=get_client()
+        balance=xrpl.models.requests.GatewayBalances(
+            account=wallet.address,
+            ledger_index=ledger_index
+        )
+        response = client.request(balance)
+        return response.result
+    return read_cache.cache.read('gateway_balances', wallet.address, fetch)
+
+async def get_balance_async(sb_account_seed):
+    """get_balance_async (cached per validated ledger)"""
+    wallet = get_wallet(sb_account_seed)
+    async def fetch(ledger_index):
+        client = get_async_client()
+        balance = xrpl.models.requests.GatewayBalances(
+            account=wallet.address,
+            ledger_index=ledger_index
+        )
+        response = await client.request(balance)
+        return response.result
+    return await read_cache.cache.read_async('gateway_balances', wallet.address, fetch)
+
+#####################
+# configure_account #
+#####################
+
+def _configure_account_tx(address, default_setting):
+    if (default_setting):
+        return xrpl.models.transactions.AccountSet(
+            account=address,
+            set_flag=xrpl.models.transactions.AccountSetAsfFlag.ASF_DEFAULT_RIPPLE
+        )
+    return xrpl.models.transactions.AccountSet(
+        account=address,
+        clear_flag=xrpl.models.transactions.AccountSetAsfFlag.ASF_DEFAULT_RIPPLE
+    )
+
+def configure_account(seed, default_setting):
+    """configure_account"""
+# Get the client
+    wallet=get_wallet(seed)
+    client=get_client()
+# Create transaction
+    setting_tx=_configure_account_tx(wallet.classic_address, default_setting)
+    try:
+        response=metrics.observe_submission(setting_tx, xrpl.transaction.submit_and_wait, setting_tx,client,wallet)
+    finally:
+        read_cache.invalidate_for(setting_tx)
+    return response.result
+
+async def configure_account_async(seed, default_setting):
+    """configure_account_async"""
+    wallet = get_wallet(seed)
+    client = get_async_client()
+    setting_tx = _configure_account_tx(wallet.classic_address, default_setting)
+    try:
+        response = await metrics.observe_submission_async(
+            setting_tx, xrpl.asyncio.transaction.submit_and_wait(setting_tx, client, wallet))
+    finally:
+        read_cache.invalidate_for(setting_tx)
+    return response.result
+
+def _account_lines_request(account, ledger_index, marker=None, peer=None):
+    return AccountLines(
+        account=account,
+        peer=peer,
+        ledger_index=ledger_index,
+        limit=400,
+        marker=marker
+    )
+
+def _read_lines(client, account, ledger_index, peer=None):
+    """Every trust line of `account` (only those with `peer`, if given), following markers"""
+    lines, marker = [], None
+    while True:
+        result = client.request(_account_lines_request(account, ledger_index, marker, peer)).result
+        lines.extend(result["lines"])
+        marker = result.get("marker")
+        if marker is None:
+            return lines
+
+async def _read_lines_async(client, account, ledger_index, peer=None):
+    """Async counterpart of _read_lines"""
+    lines, marker = [], None
+    while True:
+        result = (await client.request(_account_lines_request(account, ledger_index, marker, peer))).result
+        lines.extend(result["lines"])
+        marker = result.get("marker")
+        if marker is None:
+            return lines
+
+def get_account_lines(account):
+    """Every trust line of `account`, following markers (cached per validated ledger)"""
+    return read_cache.cache.read('account_lines_all', account,
+                                 lambda ledger_index: _read_lines(get_client(), account, ledger_index))
+
+async def get_account_lines_async(account):
+    """Async counterpart of get_account_lines"""
+    async def fetch(ledger_index):
+        return await _read_lines_async(get_async_client(), account, ledger_index)
+    return await read_cache.cache.read_async('account_lines_all', account, fetch)
+
+def _line_balance(lines, issuer, currency):
+    for line in lines:
+        if line["currency"] == currency and line["account"] == issuer:
+            return line["balance"]
+    return "0"
+
+def get_token_balance(account: str, issuer: str, currency: str) -> str:
+    """Get token balance for a specific currency from a specific issuer"""
+    # `peer` narrows account_lines to the lines shared with the issuer
+    lines = read_cache.cache.read('account_lines', account,
+                                  lambda ledger_index: _read_lines(get_client(), account, ledger_index, issuer),
+                                  (issuer,))
+    return _line_balance(lines, issuer, currency)
+
+async def get_token_balance_async(account: str, issuer: str, currency: str) -> str:
+    """Async counterpart of get_token_balance"""
+    async def fetch(ledger_index):
+        return await _read_lines_async(get_async_client(), account, ledger_index, issuer)
+    lines = await read_cache.cache.read_async('account_lines', account, fetch, (issuer,))
+    return _line_balance(lines, issuer, currency)
+
+def _holder_index(issuer_lines):
+    """(holder, currency) -> balance held, from the issuer's side of its trust lines"""
+    index = {}
+    for line in issuer_lines:
+        # The issuer sees what it owes as a negative balance
+        owed = -Decimal(line["balance"])
+        index[(line["account"], line["currency"])] = str(owed) if owed else "0"
+    return index
+
+def get_issuer_balances(issuer: str) -> dict:
+    """(holder, currency) -> balance for every trust line of `issuer`, from one paged scan"""
+    return read_cache.cache.read('issuer_balances', issuer,
+                                 lambda ledger_index: _holder_index(_read_lines(get_client(), issuer, ledger_index)))
+
+async def get_issuer_balances_async(issuer: str) -> dict:
+    """Async counterpart of get_issuer_balances"""
+    async def fetch(ledger_index):
+        return _holder_index(await _read_lines_async(get_async_client(), issuer, ledger_index))
+    return await read_cache.cache.read_async('issuer_balances', issuer, fetch)
@@ -0,0 +1,80 @@
+import xrpl
+from .xrpl_client import get_client, get_async_client, get_faucet_host
+from .wallet_cache import get_wallet
+from . import read_cache
+from . import metrics
+
+def get_account(seed):
+    """get_account"""
+    client = get_client()
+    if (seed == ''):
+        with metrics.timed('wallet_faucet_seconds'):
+            new_wallet = xrpl.wallet.generate_faucet_wallet(client, faucet_host=get_faucet_host())
+    else:
+        new_wallet = get_wallet(seed)
+    return new_wallet
+
+async def get_account_async(seed):
+    """get_account_async"""
+    if (seed == ''):
+        with metrics.timed('wallet_faucet_seconds'):
+            return await xrpl.asyncio.wallet.generate_faucet_wallet(get_async_client(), faucet_host=get_faucet_host())
+    return get_wallet(seed)
+
+def get_account_info(accountId):
+    """get_account_info (cached per validated ledger)"""
+    def fetch(ledger_index):
+        client = get_client()
+        acct_info = xrpl.models.requests.account_info.AccountInfo(
+            account=accountId,
+            ledger_index=ledger_index
+        )
+        response = client.request(acct_info)
+        return response.result['account_data']
+    return read_cache.cache.read('account_info', accountId, fetch)
+
+async def get_account_info_async(accountId):
+    """get_account_info_async (cached per validated ledger)"""
+    async def fetch(ledger_index):
+        client = get_async_client()
+        acct_info = xrpl.models.requests.account_info.AccountInfo(
+            account=accountId,
+            ledger_index=ledger_index
+        )
+        response = await client.request(acct_info)
+        return response.result['account_data']
+    return await read_cache.cache.read_async('account_info', accountId, fetch)
+
+def _payment_tx(address, amount, destination, sequence=None):
+    return xrpl.models.transactions.Payment(
+        account=address,
+        amount=xrpl.utils.xrp_to_drops(int(amount)),
+        destination=destination,
+        sequence=sequence,
+    )
+
+def send_xrp(seed, amount, destination):
+    sending_wallet = get_wallet(seed)
+    client = get_client()
+    payment = _payment_tx(sending_wallet.address, amount, destination)
+    try:	
+        response = metrics.observe_submission(payment, xrpl.transaction.submit_and_wait, payment, client, sending_wallet)	
+    except xrpl.transaction.XRPLReliableSubmissionException as e:	
+        response = f"Submit failed: {e}"
+    read_cache.invalidate_for(payment)
+
+    return response
+
+async def send_xrp_async(seed, amount, destination, sequence=None):
+    """send_xrp_async; pass `sequence` to submit alongside other txs from the same account"""
+    sending_wallet = get_wallet(seed)
+    client = get_async_client()
+    payment = _payment_tx(sending_wallet.address, amount, destination, sequence)
+    try:
+        response = await metrics.observe_submission_async(
+            payment, xrpl.asyncio.transaction.submit_and_wait(payment, client, sending_wallet))
+    except xrpl.asyncio.transaction.XRPLReliableSubmissionException as e:
+        response = f"Submit failed: {e}"
+    read_cache.invalidate_for(payment)
+
+    return response
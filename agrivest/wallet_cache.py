@@ -0,0 +1,72 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from xrpl.wallet import Wallet
+
+DEFAULT_MAX_WALLETS = 256
+
+# Entries are keyed by a keyed hash of the seed so the cache's index never
+# holds seeds; the per-process key keeps hashes from being compared elsewhere.
+_hash_key = os.urandom(32)
+_max_wallets = DEFAULT_MAX_WALLETS
+_wallets = OrderedDict()
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def _cache_key(seed):
+    return hashlib.blake2b(seed.encode(), key=_hash_key, digest_size=32).digest()
+
+
+def get_wallet(seed):
+    """Wallet for `seed`, deriving the keys only on the first use"""
+    global _hits, _misses
+    key = _cache_key(seed)
+    with _lock:
+        cached = _wallets.get(key)
+        if cached is not None:
+            _wallets.move_to_end(key)
+            _hits += 1
+            return cached
+        _misses += 1
+
+    derived = Wallet.from_seed(seed)
+    with _lock:
+        _wallets[key] = derived
+        _wallets.move_to_end(key)
+        while len(_wallets) > _max_wallets:
+            _wallets.popitem(last=False)
+    return derived
+
+
+def set_max_wallets(max_wallets):
+    """Bound the number of cached wallets (least recently used are dropped)"""
+    global _max_wallets
+    with _lock:
+        _max_wallets = max_wallets
+        while len(_wallets) > _max_wallets:
+            _wallets.popitem(last=False)
+
+
+def forget(seed):
+    """Drop one wallet from the cache"""
+    with _lock:
+        _wallets.pop(_cache_key(seed), None)
+
+
+def wipe():
+    """Drop every cached wallet and its key material"""
+    global _hits, _misses
+    with _lock:
+        _wallets.clear()
+        _hits = 0
+        _misses = 0
+
+
+def stats():
+    """Cache size and hit/miss counters"""
+    with _lock:
+        return {'size': len(_wallets), 'max_size': _max_wallets, 'hits': _hits, 'misses': _misses}
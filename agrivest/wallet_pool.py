@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from . import wallet
+from .storage_engine import ProcessLock
+from .wallet_cache import get_wallet
+
+
+class WalletPool:
+    """Funded faucet wallets kept ready in a local pool file.
+
+    `take()` hands out a pre-funded wallet instantly. A background worker
+    (see `start()`) tops the pool back up to `target_size` whenever it drops
+    below `refill_threshold`. If the pool is empty, `take()` falls back to
+    the faucet and counts a miss.
+
+    Several processes may share one pool file: every read-modify-write of
+    it re-reads the file under an exclusive flock on `<pool_file>.lock`, so
+    a seed is handed out once and no process overwrites another's entries.
+    """
+
+    def __init__(self, pool_file, target_size=5, refill_threshold=2, retry_interval=30.0):
+        self.pool_file = pool_file
+        self.target_size = target_size
+        self.refill_threshold = refill_threshold
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self._metrics = {
+            'taken': 0,
+            'misses': 0,
+            'funded': 0,
+            'fund_errors': 0,
+            'last_fund_seconds': None,
+        }
+        self._process_lock = ProcessLock(pool_file + '.lock')
+        with self._process_lock.hold(exclusive=False):
+            self._entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.pool_file):
+            return []
+        with open(self.pool_file, 'r') as f:
+            return json.load(f)
+
+    def _save(self):
+        tmp_path = self.pool_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.pool_file)
+
+    def depth(self):
+        """Number of funded wallets ready to hand out"""
+        with self._lock, self._process_lock.hold(exclusive=False):
+            self._entries = self._load()
+            return len(self._entries)
+
+    def take(self):
+        """Return a funded Wallet, from the pool when possible"""
+        with self._lock, self._process_lock.hold(exclusive=True):
+            self._entries = self._load()
+            entry = self._entries.pop(0) if self._entries else None
+            if entry is not None:
+                self._save()
+                self._metrics['taken'] += 1
+            else:
+                self._metrics['misses'] += 1
+            low = len(self._entries) < self.refill_threshold
+        if low:
+            self._wake.set()
+        if entry is None:
+            return wallet.get_account('')
+        return get_wallet(entry['seed'])
+
+    def fund_one(self):
+        """Fund one wallet from the faucet and add it to the pool"""
+        started = time.perf_counter()
+        new_wallet = wallet.get_account('')
+        with self._lock, self._process_lock.hold(exclusive=True):
+            self._entries = self._load()
+            self._entries.append({
+                'seed': new_wallet.seed,
+                'address': new_wallet.address,
+                'funded_at': datetime.now().isoformat()
+            })
+            self._save()
+            self._metrics['funded'] += 1
+            self._metrics['last_fund_seconds'] = time.perf_counter() - started
+
+    def refill(self):
+        """Fund wallets until the pool reaches `target_size`"""
+        while not self._stopped and self.depth() < self.target_size:
+            try:
+                self.fund_one()
+            except Exception as e:
+                with self._lock:
+                    self._metrics['fund_errors'] += 1
+                print(f"❌ Wallet pool refill failed: {e}")
+                return False
+        return True
+
+    def _run(self):
+        while not self._stopped:
+            ok = self.refill()
+            self._wake.wait(None if ok else self.retry_interval)
+            self._wake.clear()
+
+    def start(self):
+        """Start the background refill worker"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def metrics(self):
+        """Pool depth plus take/refill counters"""
+        with self._lock:
+            return dict(self._metrics, depth=len(self._entries), target_size=self.target_size,
+                        refill_threshold=self.refill_threshold)
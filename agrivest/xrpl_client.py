@@ -0,0 +1,173 @@
+import os
+import asyncio
+import threading
+import time
+from json import JSONDecodeError
+
+import httpx
+from xrpl.clients import JsonRpcClient
+from xrpl.asyncio.clients import AsyncJsonRpcClient
+from xrpl.asyncio.clients.exceptions import XRPLRequestFailureException
+from xrpl.asyncio.clients.utils import json_to_response, request_to_json_rpc
+from . import metrics
+
+# The one place the node URL is set. Wallets are funded by the devnet faucet,
+# so every module must talk to devnet.
+DEFAULT_NODE_URL = "https://s.devnet.rippletest.net:51234/"
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 10.0
+
+_node_url = os.environ.get('XRPL_NODE_URL', DEFAULT_NODE_URL)
+# None lets xrpl-py pick the faucet that matches the node's network
+_faucet_host = os.environ.get('XRPL_FAUCET_HOST')
+_endpoint_settings = {}
+_clients = {}
+_async_clients = {}
+_lock = threading.Lock()
+
+
+def _observe_request(request, started, response):
+    """Record one RPC; failed transport and error responses both count as errors"""
+    metrics.observe('xrpl_request_seconds', time.perf_counter() - started,
+                    response is None or not response.is_successful(), method=request.method.value)
+
+
+class PooledJsonRpcClient(JsonRpcClient):
+    """JsonRpcClient that reuses keep-alive HTTP connections across requests"""
+
+    def __init__(self, url, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        super().__init__(url)
+        self.http = httpx.Client(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout
+        )
+
+    def _post(self, request):
+        started = time.perf_counter()
+        response = None
+        try:
+            http_response = self.http.post(self.url, json=request_to_json_rpc(request))
+            try:
+                response = json_to_response(http_response.json())
+            except JSONDecodeError:
+                raise XRPLRequestFailureException({
+                    "error": http_response.status_code,
+                    "error_message": http_response.text,
+                })
+            return response
+        finally:
+            _observe_request(request, started, response)
+
+    def request(self, request):
+        """Send a request without spinning up an event loop"""
+        return self._post(request)
+
+    async def _request_impl(self, request, *, timeout=None):
+        # Used by xrpl-py's sync helpers such as submit_and_wait
+        return self._post(request)
+
+    def close(self):
+        self.http.close()
+
+
+class AsyncPooledJsonRpcClient(AsyncJsonRpcClient):
+    """AsyncJsonRpcClient that reuses keep-alive HTTP connections; bound to one event loop"""
+
+    def __init__(self, url, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        super().__init__(url)
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout
+        )
+
+    async def _request_impl(self, request, *, timeout=None):
+        started = time.perf_counter()
+        response = None
+        try:
+            http_response = await self.http.post(self.url, json=request_to_json_rpc(request))
+            try:
+                response = json_to_response(http_response.json())
+            except JSONDecodeError:
+                raise XRPLRequestFailureException({
+                    "error": http_response.status_code,
+                    "error_message": http_response.text,
+                })
+            return response
+        finally:
+            _observe_request(request, started, response)
+
+    async def close(self):
+        await self.http.aclose()
+
+
+def get_node_url():
+    """URL of the node every helper talks to"""
+    return _node_url
+
+
+def set_node_url(url):
+    """Point every helper at a different node ($XRPL_NODE_URL sets the default)"""
+    global _node_url
+    _node_url = url
+
+
+def get_faucet_host():
+    """Faucet used to fund new wallets, or None for the network default"""
+    return _faucet_host
+
+
+def set_faucet_host(host):
+    """Use a different faucet, e.g. a local stand-in ($XRPL_FAUCET_HOST sets the default)"""
+    global _faucet_host
+    _faucet_host = host
+
+
+def configure_endpoint(url, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+    """Set the connection pool size and timeout used for one endpoint"""
+    with _lock:
+        _endpoint_settings[url] = {'pool_size': pool_size, 'timeout': timeout}
+        client = _clients.pop(url, None)
+    if client is not None:
+        client.close()
+
+
+def get_client(url=None):
+    """Shared pooled client for `url` (defaults to the configured node)"""
+    url = url or _node_url
+    with _lock:
+        client = _clients.get(url)
+        if client is None:
+            client = PooledJsonRpcClient(url, **_endpoint_settings.get(url, {}))
+            _clients[url] = client
+        return client
+
+
+def get_async_client(url=None):
+    """Shared pooled async client for `url` on the running event loop"""
+    url = url or _node_url
+    key = (url, asyncio.get_running_loop())
+    with _lock:
+        client = _async_clients.get(key)
+        if client is None:
+            client = AsyncPooledJsonRpcClient(url, **_endpoint_settings.get(url, {}))
+            _async_clients[key] = client
+        return client
+
+
+async def close_async_clients():
+    """Close the pooled async clients of the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        keys = [key for key in _async_clients if key[1] is loop]
+        clients = [_async_clients.pop(key) for key in keys]
+    for client in clients:
+        await client.close()
+
+
+def close_all():
+    """Close every pooled connection"""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
@@ -0,0 +1 @@
+"""Benchmarks run against a local mock rippled node (python -m benchmarks.run_benchmarks)"""
@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+import httpx
+import xrpl.asyncio.transaction.reliable_submission as reliable_submission
+from agrivest import storage_engine, xrpl_client
+from agrivest.crowdfunding_platform import CrowdfundingPlatform
+from agrivest.service import PlatformService
+from .mock_node import MockNodeServer
+from .run_benchmarks import MockFaucetPool, summarize
+
+# request kind -> share of the mix
+MIX = {'campaign': 0.6, 'account': 0.25, 'list': 0.1, 'invest': 0.05}
+
+
+class ServiceThread:
+    """Runs a PlatformService on its own event loop in a background thread"""
+
+    def __init__(self, service):
+        self.service = service
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.service.start(port=0), self.loop).result()
+        return self.service.address
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.service.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+def seed_platform(platform, campaigns, investors):
+    """Approved campaigns plus funded investors, created through the ledger"""
+    campaign_ids = []
+    for i in range(campaigns):
+        campaign_id = platform.create_campaign(f"Load {i}", f"Crop {i}", 'load test', 1_000_000)
+        platform.approve_campaign(campaign_id)
+        campaign_ids.append(campaign_id)
+    wallets = [platform.wallet_pool.take() for _ in range(investors)]
+    return campaign_ids, wallets
+
+
+async def client_loop(base_url, deadline, campaign_ids, wallets, rng, latencies, statuses):
+    kinds, weights = zip(*MIX.items())
+    hot_campaign, hot_account = campaign_ids[0], wallets[0].address
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            started = time.perf_counter()
+            if kind == 'campaign':
+                response = await client.get(f"/campaigns/{hot_campaign}")
+            elif kind == 'account':
+                response = await client.get(f"/accounts/{hot_account}")
+            elif kind == 'list':
+                response = await client.get('/campaigns', params={'status': 'approved', 'limit': 20})
+            else:
+                investor = rng.choice(wallets)
+                response = await client.post(f"/campaigns/{rng.choice(campaign_ids)}/investments",
+                                             json={'investor_seed': investor.seed, 'amount': 1})
+            latencies[kind].append(time.perf_counter() - started)
+            statuses[(kind, response.status_code)] += 1
+
+
+async def run_load(base_url, args, campaign_ids, wallets):
+    latencies = defaultdict(list)
+    statuses = Counter()
+    rng = random.Random(0)
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        client_loop(base_url, deadline, campaign_ids, wallets, random.Random(rng.random()), latencies, statuses)
+        for _ in range(args.clients)))
+    wall = time.perf_counter() - started
+    return latencies, statuses, wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the HTTP service against a local mock node')
+    parser.add_argument('--clients', type=int, default=50, help='concurrent keep-alive clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load')
+    parser.add_argument('--campaigns', type=int, default=5)
+    parser.add_argument('--investors', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=4, help='service ledger workers')
+    parser.add_argument('--max-pending', type=int, default=16)
+    parser.add_argument('--engine', default='journal', choices=sorted(storage_engine.ENGINES))
+    parser.add_argument('--close-interval', type=float, default=0.25, help='mock ledger close latency (s)')
+    parser.add_argument('--output', help='also write results as JSON')
+    args = parser.parse_args(argv)
+
+    server = MockNodeServer(close_interval=args.close_interval).start()
+    xrpl_client.set_node_url(server.url)
+    xrpl_client.set_faucet_host(server.url)
+    reliable_submission._LEDGER_CLOSE_TIME = args.close_interval
+
+    workdir = tempfile.mkdtemp(prefix='bench-service-')
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    os.makedirs('storage')
+    try:
+        storage = storage_engine.open_storage(os.path.join('storage', 'storage.json'), args.engine)
+        platform = CrowdfundingPlatform(storage=storage, wallet_pool=MockFaucetPool(server.ledger))
+        print(f"🌱 Seeding {args.campaigns} campaigns and {args.investors} investors...")
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            campaign_ids, wallets = seed_platform(platform, args.campaigns, args.investors)
+            service = PlatformService(platform, workers=args.workers, max_pending=args.max_pending)
+            runner = ServiceThread(service)
+            base_url = runner.start()
+            try:
+                latencies, statuses, wall = asyncio.run(run_load(base_url, args, campaign_ids, wallets))
+            finally:
+                runner.stop()
+        storage.close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        server.stop()
+        xrpl_client.close_all()
+
+    total = sum(len(v) for v in latencies.values())
+    report = {
+        'clients': args.clients,
+        'duration_s': round(wall, 2),
+        'throughput_req_s': round(total / wall, 1),
+        'coalesced': service.coalescer.shared,
+        'computed': service.coalescer.started,
+        'mock_requests': server.ledger.requests,
+        'statuses': {f"{kind} {code}": n for (kind, code), n in sorted(statuses.items())},
+        'requests': {kind: summarize(values, wall) for kind, values in latencies.items()},
+    }
+    print(f"🌐 {total} requests from {args.clients} clients in {report['duration_s']}s "
+          f"({report['throughput_req_s']} req/s)")
+    print(f"   {report['coalesced']} reads shared an in-flight result, {report['computed']} computed")
+    print(f"   {'request':<12}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for kind, stats in report['requests'].items():
+        print(f"   {kind:<12}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p99_ms']:>10}")
+    print(f"   statuses: {', '.join(f'{k}: {v}' for k, v in report['statuses'].items())}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
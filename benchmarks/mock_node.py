@@ -0,0 +1,436 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from xrpl.core.binarycodec import decode
+from xrpl.utils import datetime_to_ripple_time
+
+FAUCET_DROPS = 1000 * 1000000
+DEFAULT_CLOSE_INTERVAL = 1.0
+# Prefix rippled hashes a signed blob with to get its transaction id ("TXN\0")
+TXN_PREFIX = bytes.fromhex('54584E00')
+
+
+def tx_hash(tx_blob):
+    return hashlib.sha512(TXN_PREFIX + bytes.fromhex(tx_blob)).digest()[:32].hex().upper()
+
+
+class MockLedger:
+    """In-memory ledger state behind the mock node.
+
+    Transactions are applied to the open ledger on submit and become
+    validated when the next ledger closes, every `close_interval` seconds.
+    Supports what the platform submits: XRP and issued-currency payments,
+    TrustSet, AccountSet and time-based escrows. Signatures are not checked.
+    """
+
+    def __init__(self, close_interval=DEFAULT_CLOSE_INTERVAL):
+        self.close_interval = close_interval
+        self.ledger_index = 1000
+        # Seconds added to the wall clock, to make escrow times pass in benchmarks
+        self.time_offset = 0
+        self.accounts = {}
+        self.lines = {}  # (holder, issuer, currency) -> {'balance': Decimal, 'limit': Decimal}
+        self.escrows = {}  # (owner, sequence) -> Escrow ledger object
+        self.txs = {}  # hash -> {'tx_json', 'meta', 'ledger_index'}
+        self.account_txs = {}  # address -> [hash] in apply order
+        self.open_txs = []
+        self.closed = {}  # ledger_index -> [hash]
+        self.held = {}  # account -> {sequence: (hash, tx_json)} waiting for earlier sequences
+        self.requests = 0
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._closer = None
+
+    def ripple_now(self):
+        return datetime_to_ripple_time(datetime.now()) + self.time_offset
+
+    # -- ledger close -------------------------------------------------------
+
+    def close_ledger(self):
+        with self._lock:
+            self.ledger_index += 1
+            for h in self.open_txs:
+                self.txs[h]['ledger_index'] = self.ledger_index
+            self.closed[self.ledger_index] = self.open_txs
+            self.open_txs = []
+
+    def _close_loop(self):
+        while not self._stopped.wait(self.close_interval):
+            self.close_ledger()
+
+    def start(self):
+        if self._closer is None:
+            self._closer = threading.Thread(target=self._close_loop, daemon=True)
+            self._closer.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    # -- accounts -----------------------------------------------------------
+
+    def fund(self, address, drops=FAUCET_DROPS):
+        with self._lock:
+            account = self.accounts.get(address)
+            if account is None:
+                account = self.accounts[address] = {
+                    'Account': address, 'Balance': 0, 'Sequence': self.ledger_index,
+                    'OwnerCount': 0, 'Flags': 0, 'LedgerEntryType': 'AccountRoot'
+                }
+            account['Balance'] += drops
+        return account
+
+    # -- transactions -------------------------------------------------------
+
+    def submit(self, tx_blob):
+        tx_json = decode(tx_blob)
+        h = tx_hash(tx_blob)
+        tx_json['hash'] = h
+        with self._lock:
+            account = self.accounts.get(tx_json['Account'])
+            if account is None:
+                return 'terNO_ACCOUNT', tx_json
+            sequence = tx_json.get('Sequence', 0)
+            if sequence < account['Sequence']:
+                return 'tefPAST_SEQ', tx_json
+            if sequence > account['Sequence']:
+                self.held.setdefault(account['Account'], {})[sequence] = (h, tx_json)
+                return 'terQUEUED', tx_json
+            result = self._apply(h, tx_json)
+            # Held transactions from the same account may be next in line now
+            held = self.held.get(account['Account'], {})
+            while account['Sequence'] in held:
+                self._apply(*held.pop(account['Sequence']))
+            return result, tx_json
+
+    def _apply(self, h, tx_json):
+        account = self.accounts[tx_json['Account']]
+        account['Sequence'] += 1
+        account['Balance'] -= int(tx_json.get('Fee', '0'))
+        handler = getattr(self, '_apply_' + tx_json['TransactionType'], None)
+        result = handler(tx_json, account) if handler else 'tesSUCCESS'
+        self.txs[h] = {'tx_json': tx_json, 'meta': {'TransactionResult': result}, 'ledger_index': None}
+        self.open_txs.append(h)
+        affected = {tx_json['Account'], tx_json.get('Destination'), tx_json.get('Owner'),
+                    (tx_json.get('LimitAmount') or {}).get('issuer')}
+        for address in affected - {None}:
+            self.account_txs.setdefault(address, []).append(h)
+        return result
+
+    def _apply_Payment(self, tx, account):
+        amount = tx['Amount']
+        if isinstance(amount, str):
+            if account['Balance'] < int(amount):
+                return 'tecUNFUNDED_PAYMENT'
+            account['Balance'] -= int(amount)
+            self.fund(tx['Destination'], int(amount))
+            return 'tesSUCCESS'
+        value = Decimal(amount['value'])
+        if amount['issuer'] == tx['Account']:
+            line = self.lines.get((tx['Destination'], tx['Account'], amount['currency']))
+            if line is None or line['balance'] + value > line['limit']:
+                return 'tecPATH_DRY'
+            line['balance'] += value
+        else:
+            line = self.lines.get((tx['Account'], amount['issuer'], amount['currency']))
+            if line is None or line['balance'] < value:
+                return 'tecPATH_PARTIAL'
+            line['balance'] -= value
+        return 'tesSUCCESS'
+
+    def _apply_TrustSet(self, tx, account):
+        limit = tx['LimitAmount']
+        key = (tx['Account'], limit['issuer'], limit['currency'])
+        line = self.lines.get(key)
+        if line is None:
+            self.lines[key] = {'balance': Decimal(0), 'limit': Decimal(limit['value'])}
+            account['OwnerCount'] += 1
+        else:
+            line['limit'] = Decimal(limit['value'])
+        return 'tesSUCCESS'
+
+    def _apply_EscrowCreate(self, tx, account):
+        drops = int(tx['Amount'])
+        if account['Balance'] < drops:
+            return 'tecUNFUNDED'
+        account['Balance'] -= drops
+        account['OwnerCount'] += 1
+        escrow = {
+            'LedgerEntryType': 'Escrow',
+            'Account': tx['Account'],
+            'Destination': tx['Destination'],
+            'Amount': tx['Amount'],
+            'PreviousTxnID': tx['hash'],
+            'index': hashlib.sha256(f"{tx['Account']}:{tx['Sequence']}".encode()).hexdigest().upper()
+        }
+        for field in ('FinishAfter', 'CancelAfter', 'Condition'):
+            if field in tx:
+                escrow[field] = tx[field]
+        self.escrows[(tx['Account'], tx['Sequence'])] = escrow
+        return 'tesSUCCESS'
+
+    def _apply_EscrowFinish(self, tx, account):
+        key = (tx['Owner'], tx['OfferSequence'])
+        escrow = self.escrows.get(key)
+        if escrow is None:
+            return 'tecNO_TARGET'
+        now = self.ripple_now()
+        if now <= escrow.get('FinishAfter', 0) or ('CancelAfter' in escrow and now > escrow['CancelAfter']):
+            return 'tecNO_PERMISSION'
+        del self.escrows[key]
+        self.accounts[tx['Owner']]['OwnerCount'] -= 1
+        self.fund(escrow['Destination'], int(escrow['Amount']))
+        return 'tesSUCCESS'
+
+    def _apply_EscrowCancel(self, tx, account):
+        key = (tx['Owner'], tx['OfferSequence'])
+        escrow = self.escrows.get(key)
+        if escrow is None:
+            return 'tecNO_TARGET'
+        if 'CancelAfter' not in escrow or self.ripple_now() <= escrow['CancelAfter']:
+            return 'tecNO_PERMISSION'
+        del self.escrows[key]
+        owner = self.accounts[tx['Owner']]
+        owner['OwnerCount'] -= 1
+        owner['Balance'] += int(escrow['Amount'])
+        return 'tesSUCCESS'
+
+    # -- queries ------------------------------------------------------------
+
+    def account_lines(self, address, peer=None):
+        lines = []
+        for (holder, issuer, currency), line in self.lines.items():
+            if holder == address:
+                counterparty, balance = issuer, line['balance']
+            elif issuer == address:
+                counterparty, balance = holder, -line['balance']
+            else:
+                continue
+            if peer and counterparty != peer:
+                continue
+            lines.append({'account': counterparty, 'currency': currency, 'balance': str(balance),
+                          'limit': str(line['limit'] if holder == address else 0), 'limit_peer': '0'})
+        return lines
+
+    def account_escrows(self, address):
+        return [e for e in self.escrows.values() if address in (e['Account'], e['Destination'])]
+
+
+def _page(items, params, key):
+    """Marker pagination over a list: the marker is the next offset"""
+    start = int(params.get('marker') or 0)
+    limit = int(params.get('limit') or 200)
+    result = {key: items[start:start + limit]}
+    if start + limit < len(items):
+        result['marker'] = str(start + limit)
+    return result
+
+
+class MockNode:
+    """JSON-RPC methods the platform calls, answered from a MockLedger"""
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+
+    def handle(self, method, params):
+        self.ledger.requests += 1
+        handler = getattr(self, 'rpc_' + method, None)
+        if handler is None:
+            return error('unknownCmd', f"Unknown method {method}")
+        with self.ledger._lock:
+            return handler(params)
+
+    def rpc_server_info(self, params):
+        return {'info': {'build_version': '2.4.0', 'validated_ledger': {'seq': self.ledger.ledger_index}}}
+
+    def rpc_fee(self, params):
+        return {
+            'current_ledger_size': str(len(self.ledger.open_txs)),
+            'current_queue_size': '0',
+            'drops': {'base_fee': '10', 'median_fee': '5000', 'minimum_fee': '10', 'open_ledger_fee': '10'},
+            'expected_ledger_size': '1000',
+            'ledger_current_index': self.ledger.ledger_index + 1,
+            'max_queue_size': '20000'
+        }
+
+    def rpc_ledger(self, params):
+        index = params.get('ledger_index', 'validated')
+        if index == 'current':
+            return {'ledger_current_index': self.ledger.ledger_index + 1,
+                    'ledger': {'closed': False}, 'validated': False}
+        if index in ('validated', 'closed'):
+            index = self.ledger.ledger_index
+        index = int(index)
+        if index > self.ledger.ledger_index:
+            return error('lgrNotFound', 'ledgerNotFound')
+        ledger = {'ledger_index': index, 'closed': True, 'close_time': self.ledger.ripple_now()}
+        if params.get('transactions'):
+            hashes = self.ledger.closed.get(index, [])
+            if params.get('expand'):
+                ledger['transactions'] = [dict(self._tx_record(h), hash=h) for h in hashes]
+            else:
+                ledger['transactions'] = hashes
+        return {'ledger_index': index, 'ledger_hash': '%064X' % index, 'ledger': ledger, 'validated': True}
+
+    def rpc_account_info(self, params):
+        account = self.ledger.accounts.get(params['account'])
+        if account is None:
+            return error('actNotFound', 'Account not found.')
+        return {'account_data': {k: (str(v) if k == 'Balance' else v) for k, v in account.items()},
+                'ledger_index': self.ledger.ledger_index, 'validated': True}
+
+    def rpc_account_lines(self, params):
+        if params['account'] not in self.ledger.accounts:
+            return error('actNotFound', 'Account not found.')
+        result = _page(self.ledger.account_lines(params['account'], params.get('peer')), params, 'lines')
+        return dict(result, account=params['account'], ledger_index=self.ledger.ledger_index, validated=True)
+
+    def rpc_account_objects(self, params):
+        if params['account'] not in self.ledger.accounts:
+            return error('actNotFound', 'Account not found.')
+        objects = []
+        if params.get('type') in (None, 'escrow'):
+            objects = self.ledger.account_escrows(params['account'])
+        result = _page(objects, params, 'account_objects')
+        return dict(result, account=params['account'], ledger_index=self.ledger.ledger_index, validated=True)
+
+    def rpc_gateway_balances(self, params):
+        address = params['account']
+        if address not in self.ledger.accounts:
+            return error('actNotFound', 'Account not found.')
+        obligations = {}
+        assets = {}
+        for (holder, issuer, currency), line in self.ledger.lines.items():
+            if issuer == address and line['balance'] > 0:
+                obligations[currency] = str(Decimal(obligations.get(currency, 0)) + line['balance'])
+            elif holder == address and line['balance'] > 0:
+                assets.setdefault(issuer, []).append({'currency': currency, 'value': str(line['balance'])})
+        result = {'account': address, 'ledger_index': self.ledger.ledger_index, 'validated': True}
+        if obligations:
+            result['obligations'] = obligations
+        if assets:
+            result['assets'] = assets
+        return result
+
+    def rpc_submit(self, params):
+        engine_result, tx_json = self.ledger.submit(params['tx_blob'])
+        return {'engine_result': engine_result, 'engine_result_message': engine_result,
+                'accepted': engine_result.startswith(('tes', 'tec', 'terQUEUED')),
+                'tx_blob': params['tx_blob'], 'tx_json': tx_json}
+
+    def _tx_record(self, h):
+        record = self.ledger.txs[h]
+        index = record['ledger_index']
+        return {'tx_json': record['tx_json'], 'meta': record['meta'], 'ledger_index': index,
+                'validated': index is not None and index <= self.ledger.ledger_index}
+
+    def rpc_account_tx(self, params):
+        address = params['account']
+        if address not in self.ledger.accounts:
+            return error('actNotFound', 'Account not found.')
+        low = params.get('ledger_index_min', -1)
+        high = params.get('ledger_index_max', -1)
+        low = 0 if low in (None, -1) else low
+        high = self.ledger.ledger_index if high in (None, -1) else min(high, self.ledger.ledger_index)
+        entries = []
+        for h in self.ledger.account_txs.get(address, []):
+            record = self._tx_record(h)
+            if record['validated'] and low <= record['ledger_index'] <= high:
+                entries.append(dict(record, hash=h))
+        if not params.get('forward'):
+            entries.reverse()
+        result = _page(entries, params, 'transactions')
+        return dict(result, account=address, ledger_index_min=low, ledger_index_max=high, validated=True)
+
+    def rpc_tx(self, params):
+        h = params['transaction']
+        if h not in self.ledger.txs:
+            return error('txnNotFound', 'Transaction not found.')
+        return dict(self._tx_record(h), hash=h)
+
+
+def error(code, message):
+    return {'error': code, 'error_message': message, 'status': 'error'}
+
+
+def _handler_for(node):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if self.path.rstrip('/') == '/accounts':
+                status, payload = self._faucet(body)
+            else:
+                params = (body.get('params') or [{}])[0]
+                result = node.handle(body.get('method'), params)
+                result.setdefault('status', 'success')
+                status, payload = 200, {'result': result}
+            data = json.dumps(payload, default=str).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _faucet(self, body):
+            address = body.get('destination')
+            if not address:
+                return 400, {'error': 'destination required'}
+            node.ledger.fund(address)
+            return 200, {'account': {'address': address, 'classicAddress': address},
+                         'amount': FAUCET_DROPS // 1000000}
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class MockNodeServer:
+    """Mock rippled JSON-RPC endpoint plus faucet on one local port"""
+
+    def __init__(self, host='127.0.0.1', port=0, close_interval=DEFAULT_CLOSE_INTERVAL):
+        self.ledger = MockLedger(close_interval)
+        self.node = MockNode(self.ledger)
+        self.httpd = ThreadingHTTPServer((host, port), _handler_for(self.node))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.ledger.start()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.ledger.stop()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local rippled stand-in for benchmarks and offline runs')
+    parser.add_argument('--port', type=int, default=5005)
+    parser.add_argument('--close-interval', type=float, default=DEFAULT_CLOSE_INTERVAL,
+                        help='seconds between ledger closes')
+    args = parser.parse_args()
+    server = MockNodeServer(port=args.port, close_interval=args.close_interval).start()
+    print(f"✅ Mock node at {server.url} (faucet: {server.url}/accounts)")
+    print(f"   Use XRPL_NODE_URL={server.url} XRPL_FAUCET_HOST={server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,134 @@
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from agrivest import records
+
+LAYOUTS = ('dicts', 'records', 'columns')
+FIELDS = ('campaign_id', 'investor_address', 'amount', 'created_at')
+
+
+def investments_json(size, rng):
+    """JSON text of `size` investments, as the JSON/journal engines store them"""
+    start = datetime(2024, 1, 1)
+    investors = [f"rInvestor{i:025d}" for i in range(max(1, size // 10))]
+    rows = [{
+        'id': i + 1,
+        'campaign_id': rng.randint(1, max(1, size // 100)),
+        'investor_address': rng.choice(investors),
+        'amount': rng.randint(1, 500),
+        'token_id': None,
+        'created_at': (start + timedelta(seconds=i, microseconds=rng.randint(1, 999999))).isoformat(),
+        'version': 1,
+    } for i in range(size)]
+    return json.dumps(rows)
+
+
+def build(layout, text):
+    """The investments in one layout; everything else built on the way is freed"""
+    rows = json.loads(text)
+    if layout == 'dicts':
+        return rows
+    typed = [records.from_dict('investments', row) for row in rows]
+    if layout == 'records':
+        return typed
+    return records.Columns(typed, FIELDS)
+
+
+def retained_bytes(layout, text):
+    gc.collect()
+    tracemalloc.start()
+    data = build(layout, text)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, size
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 2)
+
+
+def scans(layout, data, low, high):
+    """Bulk operations the listing and report code runs, per layout"""
+    if layout == 'dicts':
+        def sum_by_campaign():
+            totals = {}
+            for row in data:
+                totals[row['campaign_id']] = totals.get(row['campaign_id'], 0) + row['amount']
+            return totals
+        return {
+            'sum_by_campaign': sum_by_campaign,
+            'sort_by_created': lambda: sorted(data, key=lambda r: datetime.fromisoformat(r['created_at'])),
+            'created_range': lambda: [r for r in data if low <= r['created_at'] < high],
+        }
+    if layout == 'records':
+        low_us, high_us = records.to_micros(low), records.to_micros(high)
+
+        def sum_by_campaign():
+            totals = {}
+            for row in data:
+                totals[row.campaign_id] = totals.get(row.campaign_id, 0) + row.amount
+            return totals
+        return {
+            'sum_by_campaign': sum_by_campaign,
+            'sort_by_created': lambda: sorted(data, key=lambda r: r.created_at),
+            'created_range': lambda: [r for r in data if low_us <= r.created_at < high_us],
+        }
+    created = data['created_at']
+    return {
+        'sum_by_campaign': lambda: data.sum_by('campaign_id', 'amount'),
+        'sort_by_created': lambda: sorted(range(len(data)), key=created.__getitem__),
+        'created_range': lambda: data.select('created_at', records.to_micros(low), records.to_micros(high)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Memory and scan speed of dict rows vs slotted records vs columns')
+    parser.add_argument('--size', type=int, default=200000, help='investments to hold in memory')
+    parser.add_argument('--repeat', type=int, default=3, help='best of N runs per scan')
+    parser.add_argument('--output', help='also write results as JSON')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.size)
+    text = investments_json(args.size, rng)
+    low = (datetime(2024, 1, 1) + timedelta(seconds=args.size // 4)).isoformat()
+    high = (datetime(2024, 1, 1) + timedelta(seconds=args.size // 2)).isoformat()
+
+    report = {'size': args.size, 'python': sys.version.split()[0], 'layouts': {}}
+    for layout in LAYOUTS:
+        data, size = retained_bytes(layout, text)
+        stats = {'bytes_per_record': round(size / args.size, 1)}
+        stats['build_ms'] = timed(lambda: build(layout, text), 1)
+        for name, scan in scans(layout, data, low, high).items():
+            stats[name + '_ms'] = timed(scan, args.repeat)
+        report['layouts'][layout] = stats
+        del data
+        gc.collect()
+
+    columns = list(report['layouts']['dicts'])
+    print(f"🧮 {args.size} investments (best of {args.repeat})")
+    print(f"   {'layout':<10}" + ''.join(f"{c:>22}" for c in columns))
+    for layout, stats in report['layouts'].items():
+        print(f"   {layout:<10}" + ''.join(f"{stats[c]:>22}" for c in columns))
+    base = report['layouts']['dicts']['bytes_per_record']
+    for layout in LAYOUTS[1:]:
+        print(f"   {layout}: {base / report['layouts'][layout]['bytes_per_record']:.1f}x less memory than dicts")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+import argparse
+import contextlib
+import json
+import os
+import platform as python_platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from xrpl.wallet import Wallet
+import xrpl.asyncio.transaction.reliable_submission as reliable_submission
+from agrivest import metrics, read_cache, storage_engine, wallet, xrpl_client
+from agrivest.crowdfunding_platform import CrowdfundingPlatform
+from .mock_node import MockNodeServer
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+DEFAULT_SIZES = '10,1000,100000'
+SEED_CHUNK = 10000
+STATUSES = {
+    'campaigns': ('pending', 'approved'),
+    'microloans': ('active', 'completed', 'cancelled'),
+}
+
+
+class MockFaucetPool:
+    """Wallet pool stand-in that funds new wallets directly in the mock ledger"""
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+
+    def take(self):
+        new_wallet = Wallet.create()
+        self.ledger.fund(new_wallet.address)
+        return new_wallet
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, wall_seconds):
+    """Latency percentiles (ms) and throughput for one operation"""
+    ordered = sorted(latencies)
+    return {
+        'count': len(ordered),
+        'throughput_ops_s': round(len(ordered) / wall_seconds, 2) if wall_seconds else None,
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p90_ms': round(percentile(ordered, 0.90) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def measure(operation, inputs):
+    """Time `operation(item)` for each input; output is silenced"""
+    latencies = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for item in inputs:
+            t = time.perf_counter()
+            operation(item)
+            latencies.append(time.perf_counter() - t)
+        wall = time.perf_counter() - started
+    return summarize(latencies, wall)
+
+
+def seed_storage(storage, size, rng):
+    """Fill each table with `size` synthetic records, oldest first"""
+    start = datetime(2024, 1, 1)
+    investors = [f"rInvestor{i:06d}" for i in range(max(1, size // 10))]
+    for table in storage_engine.TABLES:
+        for offset in range(0, size, SEED_CHUNK):
+            records = []
+            for i in range(offset, min(size, offset + SEED_CHUNK)):
+                created = (start + timedelta(seconds=i)).isoformat()
+                if table == 'campaigns':
+                    records.append({
+                        'farmer_name': f"Farmer {i % 500}", 'project_title': f"Project {i}",
+                        'description': 'seeded', 'funding_goal': 100 + i % 900,
+                        'farmer_wallet_seed': None, 'farmer_address': f"rFarmer{i % 500:06d}",
+                        'token_currency': None, 'status': rng.choice(STATUSES['campaigns']),
+                        'created_at': created
+                    })
+                elif table == 'investments':
+                    records.append({
+                        'campaign_id': rng.randint(1, size), 'investor_address': rng.choice(investors),
+                        'amount': rng.randint(1, 100), 'token_id': None, 'created_at': created
+                    })
+                else:
+                    records.append({
+                        'farmer_address': f"rFarmer{i % 500:06d}", 'investor_address': rng.choice(investors),
+                        'loan_amount': rng.randint(1, 100), 'repayment_days': 30,
+                        'status': rng.choice(STATUSES['microloans']), 'escrow_sequence': 0,
+                        'created_at': created
+                    })
+            storage.insert_many(table, records)
+    return investors
+
+
+def bench_ledger_ops(platform, server, iterations):
+    """create/approve/invest/microloan round trips against the mock node"""
+    results = {}
+    ids = list(range(iterations))
+    campaign_ids = []
+    results['create_campaign'] = measure(
+        lambda i: campaign_ids.append(platform.create_campaign(f"Bench {i}", f"Crop {i}", 'bench', 1000)), ids)
+    results['approve_campaign'] = measure(platform.approve_campaign, campaign_ids)
+
+    investors = [platform.wallet_pool.take() for _ in ids]
+    results['invest_in_campaign'] = measure(
+        lambda i: platform.invest_in_campaign(campaign_ids[i], investors[i].seed, 10), ids)
+
+    farmers = [platform.storage.get('campaigns', cid) for cid in campaign_ids]
+    microloan_ids = []
+    results['create_microloan'] = measure(
+        lambda i: microloan_ids.append(platform.create_microloan(farmers[i]['farmer_address'], investors[i].seed, 5, 1)),
+        ids)
+
+    server.ledger.time_offset = 2 * 24 * 60 * 60  # past FinishAfter, before CancelAfter
+    try:
+        results['finish_microloan'] = measure(
+            lambda i: platform.finish_microloan(microloan_ids[i], farmers[i]['farmer_wallet_seed']), ids)
+    finally:
+        server.ledger.time_offset = 0
+    results['check_balances'] = measure(lambda i: platform.check_balances(investors[i].seed), ids)
+    return results
+
+
+def bench_read_ops(platform, size, investors, iterations, rng):
+    """Lookups and listing pages against a storage of `size` records"""
+    results = {}
+    ids = [rng.randint(1, size) for _ in range(iterations)]
+    results['get_campaign'] = measure(lambda i: platform.storage.get('campaigns', i), ids)
+    results['list_campaigns_first_page'] = measure(lambda i: platform.query_campaigns(limit=20), ids)
+
+    cursors = []
+    for i in ids:
+        record = platform.storage.get('campaigns', i)
+        if record is not None:
+            cursors.append(storage_engine.cursor_for(record))
+    results['list_campaigns_deep_page'] = measure(lambda c: platform.query_campaigns(limit=20, cursor=c), cursors)
+    results['list_campaigns_by_status'] = measure(
+        lambda i: platform.query_campaigns(limit=20, status=STATUSES['campaigns'][i % 2]), ids)
+    results['list_campaigns_by_investor'] = measure(
+        lambda i: platform.query_campaigns(limit=20, investor_address=investors[i % len(investors)]), ids)
+    results['list_microloans_by_status'] = measure(
+        lambda i: platform.query_microloans(limit=20, status=STATUSES['microloans'][i % 3]), ids)
+    return results
+
+
+def run_size(size, args, server):
+    """Seed a fresh storage of `size` records per table and run every benchmark on it"""
+    rng = random.Random(size)
+    workdir = tempfile.mkdtemp(prefix=f"bench-{size}-")
+    cwd = os.getcwd()
+    # Platform side files (escrow sequence cache, storage) live under ./storage
+    os.chdir(workdir)
+    os.makedirs('storage')
+    try:
+        storage = storage_engine.open_storage(os.path.join('storage', 'storage.json'), args.engine)
+        t = time.perf_counter()
+        investors = seed_storage(storage, size, rng)
+        seed_seconds = time.perf_counter() - t
+        read_cache.cache.clear()
+        platform = CrowdfundingPlatform(storage=storage, wallet_pool=MockFaucetPool(server.ledger))
+        results = {'seed_seconds': round(seed_seconds, 3)}
+        results.update(bench_read_ops(platform, size, investors, args.read_iterations, rng))
+        if args.ledger_iterations:
+            results.update(bench_ledger_ops(platform, server, args.ledger_iterations))
+        if args.faucet:
+            results['faucet_wallet'] = measure(lambda i: wallet.get_account(''), range(args.faucet))
+        storage.close()
+        return results
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(report):
+    for size, operations in report['results'].items():
+        print(f"\n📊 {size} records per table ({report['engine']}, seeded in {operations['seed_seconds']}s)")
+        print(f"   {'operation':<30}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+        for name, stats in operations.items():
+            if name == 'seed_seconds':
+                continue
+            print(f"   {name:<30}{stats['p50_ms']:>10}{stats['p90_ms']:>10}{stats['p99_ms']:>10}"
+                  f"{stats['throughput_ops_s']:>10}")
+
+
+def compare(old_path, new_path):
+    """Print p50 changes between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"📈 {old['commit']} -> {new['commit']} (p50 ms)")
+    for size, operations in new['results'].items():
+        before = old['results'].get(size, {})
+        print(f"\n   {size} records per table")
+        for name, stats in operations.items():
+            if name == 'seed_seconds' or name not in before:
+                continue
+            was, now = before[name]['p50_ms'], stats['p50_ms']
+            change = f"{(now - was) / was * 100:+.1f}%" if was else 'n/a'
+            print(f"   {name:<30}{was:>10}{now:>10}{change:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark platform operations against a local mock node')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='records per table, e.g. 10,1000,1000000')
+    parser.add_argument('--engine', default='journal', choices=sorted(storage_engine.ENGINES))
+    parser.add_argument('--close-interval', type=float, default=0.25, help='mock ledger close latency (s)')
+    parser.add_argument('--ledger-iterations', type=int, default=10, help='0 skips the ledger operations')
+    parser.add_argument('--read-iterations', type=int, default=200)
+    parser.add_argument('--faucet', type=int, default=0, help='also time N real faucet round trips (slow)')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<time>-<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files and exit')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    server = MockNodeServer(close_interval=args.close_interval).start()
+    xrpl_client.set_node_url(server.url)
+    xrpl_client.set_faucet_host(server.url)
+    # xrpl-py polls for validation once per second; poll once per mock ledger instead
+    reliable_submission._LEDGER_CLOSE_TIME = args.close_interval
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': python_platform.python_version(),
+        'engine': args.engine,
+        'close_interval': args.close_interval,
+        'ledger_iterations': args.ledger_iterations,
+        'read_iterations': args.read_iterations,
+        'results': {}
+    }
+    try:
+        for size in [int(s) for s in args.sizes.split(',')]:
+            print(f"⏱️  Benchmarking {size} records per table...")
+            report['results'][str(size)] = run_size(size, args, server)
+    finally:
+        report['mock_requests'] = server.ledger.requests
+        report['metrics'] = metrics.snapshot()
+        server.stop()
+        xrpl_client.close_all()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{report['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_results(report)
+    print(f"\n✅ Results saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from agrivest import binary_snapshot, records, storage_engine
+
+ENGINES = ('journal', 'binary')
+STATUSES = {'campaigns': ('pending', 'approved', 'funded'), 'microloans': ('pending', 'active', 'completed')}
+
+
+def build_data(size, rng):
+    """load()-layout data set of `size` records: 5% campaigns, 5% microloans, the rest investments"""
+    start = datetime(2024, 1, 1)
+    counts = {'campaigns': max(1, size // 20), 'microloans': max(1, size // 20)}
+    counts['investments'] = max(1, size - counts['campaigns'] - counts['microloans'])
+    investors = [f"rInvestor{i:025d}" for i in range(max(1, size // 50))]
+    farmers = [f"rFarmer{i:027d}" for i in range(500)]
+    data = storage_engine.empty_data()
+    for table, count in counts.items():
+        rows = []
+        for i in range(count):
+            row = {'id': i + 1, 'created_at': (start + timedelta(seconds=i)).isoformat(), 'version': 1}
+            if table == 'campaigns':
+                row.update(farmer_name=f"Farmer {i % 500}", project_title=f"Project {i}", description='seeded',
+                           funding_goal=100 + i % 900, farmer_wallet_seed=None, farmer_address=farmers[i % 500],
+                           token_currency=None, status=rng.choice(STATUSES[table]))
+            elif table == 'investments':
+                row.update(campaign_id=rng.randint(1, counts['campaigns']), investor_address=rng.choice(investors),
+                           amount=rng.randint(1, 100), token_id=None)
+            else:
+                row.update(farmer_address=farmers[i % 500], investor_address=rng.choice(investors),
+                           loan_amount=rng.randint(1, 100), repayment_days=30, escrow_sequence=i,
+                           status=rng.choice(STATUSES[table]))
+            rows.append(row)
+        data[table] = rows
+        data[storage_engine.counter_key(table)] = count + 1
+    return data, counts
+
+
+def timed_ms(func):
+    started = time.perf_counter()
+    result = func()
+    return result, round((time.perf_counter() - started) * 1000, 2)
+
+
+def peak_rss_mb():
+    """Peak RSS of this process; ru_maxrss survives exec on Linux, VmHWM does not"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def child(engine, path, middle):
+    """Cold start in a fresh process: open, then the reads a CLI command or service request makes"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    storage, open_ms = timed_ms(lambda: storage_engine.open_storage(path, engine))
+    _, get_ms = timed_ms(lambda: (storage.get('campaigns', 1), storage.get('investments', middle)))
+    page = lambda: [r['id'] for _, r in zip(range(20), storage.scan('campaigns', {'status': 'approved'},
+                                                                       descending=True))]
+    _, page_ms = timed_ms(page)
+    _, totals_ms = timed_ms(lambda: storage.totals('investments', 'campaign_id', 1))
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    storage.close()
+    return {
+        'open_ms': open_ms, 'get_ms': get_ms, 'page_ms': page_ms, 'first_totals_ms': totals_ms,
+        'minor_faults': after.ru_minflt - usage.ru_minflt, 'max_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_child(engine, path, middle):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.snapshot_load', '--child', engine, path, str(middle)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cold start of the journal (JSON) vs binary snapshot engines')
+    parser.add_argument('--size', type=int, default=1000000, help='records in the store')
+    parser.add_argument('--repeat', type=int, default=3, help='best of N fresh processes per engine')
+    parser.add_argument('--output', help='also write results as JSON')
+    parser.add_argument('--child', nargs=3, metavar=('ENGINE', 'PATH', 'ID'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        print(json.dumps(child(args.child[0], args.child[1], int(args.child[2]))))
+        return 0
+
+    workdir = tempfile.mkdtemp(prefix='bench-snapshot-')
+    try:
+        print(f"🌱 Building {args.size} records...")
+        data, counts = build_data(args.size, random.Random(args.size))
+        json_path = os.path.join(workdir, 'storage.json')
+        snap_path = os.path.join(workdir, 'storage.snap')
+
+        def write_json():
+            with open(json_path, 'w') as f:
+                json.dump(data, f, indent=2, default=records.json_default)
+        _, json_write_ms = timed_ms(write_json)
+        _, snap_write_ms = timed_ms(lambda: binary_snapshot.write(snap_path, data, storage_engine.INDEXED_FIELDS,
+                                                                     storage_engine.TOTALS))
+
+        middle = counts['investments'] // 2
+        report = {'size': args.size, 'tables': counts, 'engines': {
+            'journal': {'file_mb': round(os.path.getsize(json_path) / 2 ** 20, 1), 'write_ms': json_write_ms},
+            'binary': {'file_mb': round(os.path.getsize(snap_path) / 2 ** 20, 1), 'write_ms': snap_write_ms},
+        }}
+        for engine in ENGINES:
+            runs = [run_child(engine, json_path, middle) for _ in range(args.repeat)]
+            report['engines'][engine].update(min(runs, key=lambda run: run['open_ms']))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    columns = list(report['engines']['binary'])
+    print(f"🚀 Cold start, {args.size} records (best of {args.repeat} processes, warm page cache)")
+    print(f"   {'engine':<10}" + ''.join(f"{c:>17}" for c in columns))
+    for engine, stats in report['engines'].items():
+        print(f"   {engine:<10}" + ''.join(f"{stats[c]:>17}" for c in columns))
+    journal, binary = report['engines']['journal'], report['engines']['binary']
+    print(f"   binary opens {journal['open_ms'] / max(binary['open_ms'], 0.01):.0f}x faster")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# Modules a storage-only command must not load
+NETWORK_MODULES = ('xrpl', 'httpx', 'cryptoconditions', 'agrivest.xrpl_client')
+COMMANDS = {
+    'list': ['list'],
+    'list-microloans': ['list', 'microloans'],
+}
+# Prints the network modules `agrivest <args>` leaves loaded
+PROBE = """
+import contextlib, io, json, sys
+from agrivest.main import main
+with contextlib.redirect_stdout(io.StringIO()):
+    main(sys.argv[1:])
+print(json.dumps(sorted(m for m in sys.modules if m in %r)))
+""" % (NETWORK_MODULES,)
+
+
+def _env():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    env['WALLET_POOL_SIZE'] = '0'
+    return env
+
+
+def time_command(args, runs, cwd):
+    """Median and min wall time (ms) of `python <args>` over `runs` fresh interpreters"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=cwd, env=_env(), check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {'p50_ms': round(statistics.median(samples), 1), 'min_ms': round(min(samples), 1)}
+
+
+def loaded_network_modules(args, cwd):
+    output = subprocess.run([sys.executable, '-c', PROBE] + args, cwd=cwd, env=_env(), check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time CLI startup and check storage-only commands skip xrpl')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', help='also write results as JSON')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='bench-startup-')
+    os.makedirs(os.path.join(workdir, 'storage'))
+    try:
+        report = {
+            'python': time_command(['-c', 'pass'], args.runs, workdir),
+            'import xrpl': time_command(['-c', 'import xrpl.transaction, xrpl.wallet'], args.runs, workdir),
+            'commands': {}
+        }
+        failed = False
+        for name, command in COMMANDS.items():
+            stats = time_command(['-m', 'agrivest'] + command, args.runs, workdir)
+            stats['network_modules'] = loaded_network_modules(command, workdir)
+            failed = failed or bool(stats['network_modules'])
+            report['commands'][name] = stats
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"⏱️  Startup ({args.runs} runs, p50 / min ms)")
+    print(f"   {'python -c pass':<28}{report['python']['p50_ms']:>10}{report['python']['min_ms']:>10}")
+    print(f"   {'import xrpl':<28}{report['import xrpl']['p50_ms']:>10}{report['import xrpl']['min_ms']:>10}")
+    for name, stats in report['commands'].items():
+        loaded = ', '.join(stats['network_modules']) or 'no network modules'
+        print(f"   {'agrivest ' + name:<28}{stats['p50_ms']:>10}{stats['min_ms']:>10}   {loaded}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if failed:
+        print("❌ A storage-only command imported the network stack")
+        return 1
+    print("✅ Storage-only commands start without importing xrpl")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())